@@ -1,8 +1,23 @@
-from typing import List, Dict, Optional
-from app.models.combat import BattleState, CharacterConfig, CharacterAction, BattleActionResponse, BattleStateForAI, CharacterForAI
+import logging
+import time
+from typing import List, Dict, Optional, Tuple
+from app.models.combat import BattleState, CharacterConfig, CharacterAction, BattleActionResponse, BattleStateForAI, CharacterForAI, ActionOutcome
 from app.utils.combat import calculate_manhattan_distance, calculate_action_costs
 from app.ai.combat.graph import run_graph  # LangGraph 실행 함수
-from app.ai.combat.states import LangGraphBattleState, Character, ActionPlan
+from app.ai.gateway import llm_gateway, collect_usage
+from app.ai.combat.recorder import DecisionRecorder
+from app.ai.combat.battle_log import BattleLog
+from app.ai.combat.states import LangGraphBattleState, Character, ActionPlan, Strategy
+from app.ai.combat.budget import DEGRADATION_LEVELS
+from app.ai.combat.targeting import assign_targets
+from app.ai.combat.shedding import load_controller
+from app.ai.combat.resolver import resolve_action
+from app.utils.environment import compile_environment
+from app.utils.battle_map import map_registry
+from app.config import settings
+from app.utils.metrics import COMBAT_DECISIONS, COMBAT_FALLBACKS
+
+logger = logging.getLogger(__name__)
 
 
 class CombatAI:
@@ -11,31 +26,130 @@ class CombatAI:
     LangGraph를 사용하여 전투 행동을 결정합니다.
     """
 
-    def __init__(self, config_map: Dict[str, CharacterConfig], terrain: str, weather: str):
+    def __init__(self, config_map: Dict[str, CharacterConfig], terrain: str, weather: str,
+                 decision_deadline: Optional[float] = None, map_id: Optional[str] = None,
+                 ai_tier: str = "full", recorder: Optional[DecisionRecorder] = None):
         self.config_map = config_map
         self.terrain = terrain
         self.weather = weather
-        self.battle_log: List[str] = []  # 전투 로그 추가
+        # 지형/날씨 효과 (전투 시작 시 이동 비용, 사거리, 명중률 보정을 한 번만 계산)
+        self.environment = compile_environment(terrain, weather)
+        # 등록된 전투 맵 (모든 타일 쌍 최단 거리가 미리 계산되어 있음)
+        self.map_id = map_id
+        self.battle_map = map_registry.get(map_id) if map_id else None
+        # 전투 로그 (최근 행동 링 버퍼 + 전투 전체 누적 요약)
+        self.battle_log = BattleLog()
+        # 전투 기본 AI 티어 (캐릭터 설정의 ai_tier 가 있으면 그 값을 우선 사용)
+        self.ai_tier = ai_tier
+        # 행동 결정 제한 시간 (초)
+        self.decision_deadline = decision_deadline if decision_deadline is not None else settings.COMBAT_DECISION_DEADLINE
+        # 캐릭터별 직전 전략 (제한 시간 부족 시 재사용)
+        self.strategy_cache: Dict[str, Strategy] = {}
+        # 몬스터 페이즈 단위 타겟 배정 결과 (몬스터 ID -> 타겟 ID)와 마지막으로 적용한 (사이클, 턴)
+        self.target_assignments: Dict[str, str] = {}
+        self._assignment_turn: Optional[Tuple[int, int]] = None
+        # 마지막 추측 실행의 (응답, 그래프 결과, 타겟 배정) - 실제로 사용될 때 commit_speculation 으로 반영
+        self._speculation: Optional[Tuple[BattleActionResponse, Dict, Optional[Tuple]]] = None
+        # 행동 결정 기록기 (설정된 경우 입력 상태, 행동, 노드 시간, 토큰 수를 바이너리 로그로 기록)
+        self.recorder = recorder
+
+    async def get_character_action(self, battle_state: BattleState, commit_log: bool = True) -> BattleActionResponse:
+        """전투 상태를 분석하고 행동 결정
+
+        commit_log=False 이면 전투 로그, 전략 캐시, 타겟 배정을 바꾸지 않음 (미리 계산하는 추측 실행용,
+        결과가 실제로 사용될 때 commit_speculation 으로 반영)
+        """
+        started = time.perf_counter()
+        with collect_usage() as usage:
+            response, result = await self._decide_action(battle_state, commit_log)
+        latency = time.perf_counter() - started
+        COMBAT_DECISIONS.labels(response.ai_tier, response.degradation).inc()
+        # 부하 컨트롤러에는 LLM 을 사용하는 티어의 실제 요청 시간만 반영 (추측 실행 제외)
+        if commit_log and response.ai_tier != "rule":
+            load_controller.observe(latency)
+
+        if self.recorder is not None:
+            self.recorder.record(self._trace_record(
+                battle_state, response, result, usage.as_dict(),
+                latency_ms=latency * 1000,
+                speculative=not commit_log
+            ))
+        return response
+
+    async def _decide_action(self, battle_state: BattleState, commit_log: bool):
+        """행동 결정 후 (응답, 그래프 결과) 반환. 폴백이면 그래프 결과는 None"""
+        tier = self.tier_for(battle_state.current_character_id)
+
+        # LLM 서킷 브레이커가 열려 있으면 타임아웃을 기다리지 않고 즉시 폴백 (rule 티어는 LLM 미사용)
+        if tier != "rule" and not llm_gateway.is_available():
+            logger.warning("LLM 서킷 브레이커 열림: 폴백 행동 사용")
+            COMBAT_FALLBACKS.labels("circuit_open").inc()
+            return self._fallback_decision(battle_state), None
+
+        # 추측 실행이 아닌 실제 요청 상태만 누적 요약(받은 피해, 쓰러진 캐릭터)에 반영
+        if commit_log:
+            self.battle_log.observe(battle_state)
 
-    async def get_character_action(self, battle_state: BattleState) -> BattleActionResponse:
-        """전투 상태를 분석하고 행동 결정"""
         try:
             # LangGraph 실행 시도
             langgraph_state = self._build_langgraph_state(battle_state, self.battle_log)
-            result = await run_graph(langgraph_state)
+            langgraph_state.assigned_target_id, assignment = self._assigned_target(langgraph_state)
+            langgraph_state.ai_tier = tier
+            # 서버 부하에 따라 생략할 LLM 노드 결정 (rule 티어는 LLM 미사용)
+            if tier != "rule":
+                langgraph_state.load_level = load_controller.current_mode()
+            result = await run_graph(langgraph_state, tier)
             
             # 결과 변환 및 로그 추가
             response = self._convert_output_to_action(result)
-            
-            # 행동 로그 추가
-            self._add_to_battle_log(response)
-            
-            return response
+            response.ai_tier = tier
+            # LLM 티어는 이번 결정에 적용한 단계, rule 티어는 현재 컨트롤러 단계 보고
+            response.load_mode = langgraph_state.load_level if tier != "rule" else load_controller.mode
+
+            # 전략 캐시, 타겟 배정, 행동 로그 반영 (추측 실행은 실제로 사용될 때 반영)
+            if commit_log:
+                self._commit_decision(response, result, assignment)
+            else:
+                self._speculation = (response, result, assignment)
+
+            return response, result
             
         except Exception as e:
             # LangGraph 실패 시 폴백 로직 실행
-            print(f"AI 판단 실패: {str(e)}")
-            return self._fallback_decision(battle_state)
+            logger.exception("AI 판단 실패: %s", e)
+            COMBAT_FALLBACKS.labels("error").inc()
+            return self._fallback_decision(battle_state), None
+
+    def _trace_record(self, battle_state: BattleState, response: BattleActionResponse, result: Optional[Dict],
+                      usage: Dict, latency_ms: float, speculative: bool) -> Dict:
+        """행동 결정 기록 레코드 구성"""
+        result = result if isinstance(result, dict) else {}
+        return {
+            "ts": time.time(),
+            "terrain": self.terrain,
+            "weather": self.weather,
+            "map_id": self.map_id,
+            "character_id": battle_state.current_character_id,
+            "tier": response.ai_tier,
+            "degradation": response.degradation,
+            "load_mode": response.load_mode,
+            "speculative": speculative,
+            "latency_ms": round(latency_ms, 2),
+            "state": battle_state.model_dump(mode="json"),
+            "configs": {
+                char_id: config.model_dump(mode="json") for char_id, config in self.config_map.items()
+            },
+            "action": response.action.model_dump(mode="json"),
+            "strategy": result.get("strategy"),
+            "node_timings": result.get("node_timings", {}),
+            "trace": result.get("trace"),
+            "tokens": usage,
+        }
+
+    def tier_for(self, character_id: str) -> str:
+        """캐릭터에게 적용할 AI 티어 (캐릭터별 설정 → 전투 기본 티어)"""
+        config = self.config_map.get(character_id)
+        return (config.ai_tier if config and config.ai_tier else None) or self.ai_tier
 
     def _convert_to_ai_state(self, state: BattleState) -> BattleStateForAI:
         """BattleState를 AI 판단용 BattleStateForAI로 변환"""
@@ -77,8 +191,8 @@ class CombatAI:
             weather=self.weather
         )
 
-    def _build_langgraph_state(self, state: BattleState, battle_log: List[str]) -> LangGraphBattleState:
-        """LangGraph 실행용 상태 구성"""
+    def _build_characters(self, state: BattleState) -> List[Character]:
+        """요청 상태와 캐릭터 설정을 합친 전투 능력치 포함 캐릭터 목록"""
         characters: List[Character] = []
 
         for char_state in state.characters:
@@ -90,11 +204,18 @@ class CombatAI:
                 char_type = "monster"
                 char_traits = []
                 char_skills = []
+                char_stats = {}
             else:
                 char_name = char_config.name
                 char_type = char_config.type
                 char_traits = char_config.traits
                 char_skills = char_config.skills
+                # 설정된 전투 능력치만 전달 (없으면 Character 기본값 사용)
+                char_stats = {
+                    stat: getattr(char_config, stat)
+                    for stat in ("attack", "defense", "critical_rate", "critical_damage")
+                    if getattr(char_config, stat) is not None
+                }
 
             characters.append(Character(
                 id=char_state.id,
@@ -106,19 +227,80 @@ class CombatAI:
                 hp=char_state.hp,
                 ap=char_state.ap,
                 mov=char_state.mov,
-                status_effects=char_state.status_effects
+                status_effects=char_state.status_effects,
+                **char_stats
             ))
+        return characters
 
+    def _build_langgraph_state(self, state: BattleState, battle_log: BattleLog) -> LangGraphBattleState:
+        """LangGraph 실행용 상태 구성"""
         return LangGraphBattleState(
             cycle=state.cycle,
             turn=state.turn,
             terrain=self.terrain,
             weather=self.weather,
+            map_id=self.map_id,
+            environment=self.environment,
             current_character_id=state.current_character_id,
-            characters=characters,
-            battle_log=battle_log
+            characters=self._build_characters(state),
+            battle_log=battle_log.recent(),
+            battle_summary=battle_log.summary(),
+            deadline=time.monotonic() + self.decision_deadline,
+            deadline_budget=self.decision_deadline,
+            cached_strategy=self.strategy_cache.get(state.current_character_id)
         )
 
+    def resolve(self, state: BattleState, response: BattleActionResponse,
+                upcoming_actors: Optional[List[str]] = None) -> ActionOutcome:
+        """결정된 행동의 결과 예측 (예상 HP 변화, 부여되는 상태 효과와 지속 시간, 다음 턴 상태)
+
+        다음 턴 상태의 현재 캐릭터는 행동 결과를 적용한 뒤 upcoming_actors 중 살아 있는 첫 캐릭터입니다.
+        """
+        return resolve_action(state, response, self._build_characters(state), self.config_map,
+                              self.environment, self.battle_map, upcoming_actors)
+
+    def _assigned_target(self, state: LangGraphBattleState) -> Tuple[Optional[str], Optional[Tuple]]:
+        """몬스터 페이즈 시작 시 팀 전체 타겟을 한 번 배정하고, 같은 페이즈의 이어지는 몬스터 턴에서는 재사용
+
+        플레이어 턴은 이 서버로 요청되지 않으므로 요청의 (사이클, 턴)으로 페이즈를 구분합니다.
+        사이클이 바뀌었거나 직전 몬스터 턴과 연속된 요청이 아니면(사이에 플레이어가 행동함),
+        또는 배정된 타겟이 쓰러졌으면 다시 배정합니다.
+
+        (타겟 ID, 저장할 (배정 결과, (사이클, 턴))) 반환 - 배정 결과는 _commit_decision 에서 저장
+        """
+        current = next((c for c in state.characters if c.id == state.current_character_id), None)
+        if current is None or current.type != "monster":
+            return None, None
+
+        alive_ids = {c.id for c in state.characters if c.hp > 0}
+        previous = self._assignment_turn
+        consecutive = (previous is not None and previous[0] == state.cycle
+                       and state.turn in (previous[1], previous[1] + 1))
+        assignments = self.target_assignments
+        if not consecutive or assignments.get(current.id) not in alive_ids:
+            monsters = [c for c in state.characters if c.type == "monster"]
+            players = [c for c in state.characters if c.type == "player"]
+            assignments = assign_targets(monsters, players, self.environment, self.battle_map)
+
+        return assignments.get(current.id), (assignments, (state.cycle, state.turn))
+
+    def _commit_decision(self, response: BattleActionResponse, result: Dict, assignment: Optional[Tuple]) -> None:
+        """결정된 행동을 전투 AI 상태(타겟 배정, 전략 캐시, 행동 로그)에 반영"""
+        if assignment is not None:
+            self.target_assignments, self._assignment_turn = assignment
+        self._update_strategy_cache(result)
+        self._add_to_battle_log(response)
+
+    def commit_speculation(self, state: BattleState, response: BattleActionResponse) -> None:
+        """미리 계산한 행동이 실제 요청에 사용될 때 요청 상태와 추측 실행 결과 반영"""
+        speculation, self._speculation = self._speculation, None
+        self.battle_log.observe(state)
+        if speculation is not None and speculation[0] is response:
+            self._commit_decision(*speculation)
+        else:
+            # 폴백 결과 등 그래프 결과가 없는 경우 행동 로그만 반영
+            self._add_to_battle_log(response)
+
     def _convert_output_to_action(self, state) -> BattleActionResponse:
         """LangGraph 결과를 BattleActionResponse로 변환"""
         # 딕셔너리 형태로 접근
@@ -128,6 +310,7 @@ class CombatAI:
             
             plan = state["action_plan"]
             current_character_id = state["current_character_id"]
+            degradation = state.get("degradation_level", "full")
         else:
             # 객체 형태로 접근 시도
             if not hasattr(state, "action_plan") or not state.action_plan:
@@ -135,6 +318,7 @@ class CombatAI:
             
             plan = state.action_plan
             current_character_id = state.current_character_id
+            degradation = state.degradation_level
         
         return BattleActionResponse(
             current_character_id=current_character_id,
@@ -146,8 +330,24 @@ class CombatAI:
                 dialogue=plan["dialogue"] if isinstance(plan, dict) else (plan.dialogue or ""),
                 remaining_ap=plan["remaining_ap"] if isinstance(plan, dict) else (plan.remaining_ap or 0),
                 remaining_mov=plan["remaining_mov"] if isinstance(plan, dict) else (plan.remaining_mov or 0)
-            )
+            ),
+            degradation=degradation
         )
+
+    def _update_strategy_cache(self, state) -> None:
+        """LLM으로 새로 결정된 전략을 캐릭터별로 저장"""
+        if isinstance(state, dict):
+            strategy_info = state.get("strategy_info")
+            degradation = state.get("degradation_level", "full")
+            current_character_id = state["current_character_id"]
+        else:
+            strategy_info = state.strategy_info
+            degradation = state.degradation_level
+            current_character_id = state.current_character_id
+
+        # 캐시된 전략을 사용한 경우에는 갱신하지 않음
+        if strategy_info and DEGRADATION_LEVELS.index(degradation) < DEGRADATION_LEVELS.index("cached_strategy"):
+            self.strategy_cache[current_character_id] = strategy_info
         
     def _fallback_decision(self, state: BattleState) -> BattleActionResponse:
         """AI 판단 실패시 사용할 간단한 기본 판단 로직"""
@@ -167,19 +367,17 @@ class CombatAI:
             remaining_mov=current_character.mov  # MOV 변화 없음
         )
         
-        print(f"폴백 결정: 캐릭터 ID={current_character_id}, 기본 대기 행동 수행")
+        logger.info("폴백 결정: 캐릭터 ID=%s, 기본 대기 행동 수행", current_character_id)
         
         return BattleActionResponse(
             current_character_id=current_character_id,
-            action=action
+            action=action,
+            degradation="fallback",
+            ai_tier=self.tier_for(current_character_id),
+            # 서킷 브레이커/오류 폴백에서도 현재 부하 단계를 보고
+            load_mode=load_controller.mode
         )
         
     def _add_to_battle_log(self, response: BattleActionResponse) -> None:
-        """전투 행동 로그 추가"""
-        action = response.action
-        log_entry = f"캐릭터 {response.current_character_id}: {action.skill} 사용 -> {action.target_character_id} (이유: {action.reason})"
-        self.battle_log.append(log_entry)
-        
-        # 로그 길이 제한 (최근 20개 항목만 유지)
-        if len(self.battle_log) > 20:
-            self.battle_log = self.battle_log[-20:]
+        """전투 행동 로그 추가 (링 버퍼이므로 오래된 항목은 자동으로 버려짐)"""
+        self.battle_log.add(response)
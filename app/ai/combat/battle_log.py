@@ -0,0 +1,97 @@
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Set
+
+from app.models.combat import BattleState, BattleActionResponse
+
+# 원문 그대로 보관하는 최근 행동 수 (오래된 항목은 자동으로 버려짐)
+BATTLE_LOG_SIZE = 20
+
+# 요약에 그대로 포함하는 최근 행동 수
+SUMMARY_RECENT_EVENTS = 3
+
+# 요약에 포함하는 누적 피해/타겟 항목 수 (상위 N개)
+SUMMARY_TOP_ITEMS = 5
+
+# 행동 로그에 남기는 행동 이유 최대 글자 수 (LLM 이 만든 긴 이유로 요약이 길어지지 않도록)
+EVENT_REASON_CHARS = 60
+
+
+class BattleLog:
+    """전투 하나의 행동 로그와 누적 요약
+
+    - 최근 행동은 고정 크기 링 버퍼(deque)에 보관
+    - 버퍼에서 밀려난 행동까지 포함한 전투 전체 흐름은 누적 카운터(행동 수, 스킬 사용,
+      타겟 빈도, 받은 피해, 쓰러진 캐릭터)로 갱신해 두므로 요약 길이는 전투 길이와 무관
+    """
+
+    def __init__(self, size: int = BATTLE_LOG_SIZE):
+        self.events: Deque[str] = deque(maxlen=size)
+        self.total_actions = 0
+        self.last_cycle: Optional[int] = None
+        self.skill_uses: Counter = Counter()
+        self.targeted: Counter = Counter()
+        self.damage_taken: Counter = Counter()
+        self.knocked_out: List[str] = []
+        self._knocked_out: Set[str] = set()
+        self._last_hp: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def observe(self, state: BattleState) -> None:
+        """요청으로 받은 전투 상태에서 직전 관측 이후의 HP 변화 반영"""
+        self.last_cycle = state.cycle
+        for character in state.characters:
+            previous = self._last_hp.get(character.id)
+            if previous is not None and character.hp < previous:
+                self.damage_taken[character.id] += previous - character.hp
+            self._last_hp[character.id] = character.hp
+            if character.hp <= 0 and character.id not in self._knocked_out:
+                self._knocked_out.add(character.id)
+                self.knocked_out.append(character.id)
+
+    def add(self, response: BattleActionResponse) -> None:
+        """결정된 행동 추가 (누적 카운터도 함께 갱신)"""
+        action = response.action
+        reason = (action.reason or "")[:EVENT_REASON_CHARS]
+        self.events.append(
+            f"캐릭터 {response.current_character_id}: {action.skill} 사용 -> {action.target_character_id} (이유: {reason})"
+        )
+        self.total_actions += 1
+        self.skill_uses[action.skill or "대기"] += 1
+        if action.skill and action.target_character_id and action.target_character_id != response.current_character_id:
+            self.targeted[action.target_character_id] += 1
+
+    def recent(self, count: Optional[int] = None) -> List[str]:
+        events = list(self.events)
+        return events[-count:] if count else events
+
+    def summary(self) -> str:
+        """프롬프트용 전투 요약 (앞쪽은 누적 정보, 뒤쪽은 최근 행동)
+
+        토큰 예산을 넘으면 앞에서부터 잘리므로(KEEP_TAIL) 최근 행동이 가장 뒤에 오도록 구성합니다.
+        """
+        if not self.total_actions and not self.damage_taken:
+            return "전투 시작 단계"
+
+        parts = []
+        if self.last_cycle is not None:
+            parts.append(f"사이클 {self.last_cycle}, 누적 행동 {self.total_actions}회.")
+        if self.knocked_out:
+            parts.append(f"쓰러진 캐릭터: {', '.join(self.knocked_out)}.")
+        if self.damage_taken:
+            parts.append("누적 피해: " + ", ".join(
+                f"{char_id} {damage}" for char_id, damage in self.damage_taken.most_common(SUMMARY_TOP_ITEMS)
+            ) + ".")
+        if self.targeted:
+            parts.append("집중 공격 대상: " + ", ".join(
+                f"{char_id} {count}회" for char_id, count in self.targeted.most_common(SUMMARY_TOP_ITEMS)
+            ) + ".")
+        if self.skill_uses:
+            parts.append("주요 스킬: " + ", ".join(
+                f"{skill} {count}회" for skill, count in self.skill_uses.most_common(SUMMARY_TOP_ITEMS)
+            ) + ".")
+        recent = self.recent(SUMMARY_RECENT_EVENTS)
+        if recent:
+            parts.append("최근 행동: " + " ".join(recent))
+        return " ".join(parts)
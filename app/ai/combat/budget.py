@@ -0,0 +1,72 @@
+import time
+from typing import Optional
+
+from app.ai.combat.states import LangGraphBattleState
+
+# 단계별 성능 저하 수준 (뒤로 갈수록 더 많이 생략)
+# - full: 전략/행동/대사 모두 LLM 사용
+# - no_dialogue: 대사 생성 생략
+# - cached_strategy: 전략 LLM 생략, 직전 전략(또는 기본 전략) 사용
+# - rule_based: 행동 계획 LLM 생략, 규칙 기반 행동 사용
+# - fallback: 판단 실패로 인한 대기 행동 (CombatAI._fallback_decision)
+DEGRADATION_LEVELS = ["full", "no_dialogue", "cached_strategy", "rule_based", "fallback"]
+
+# 부하 단계(shedding.LoadController 가 정하는 load_level)별로 LLM 호출을 생략하는 노드
+SHED_NODES = {
+    "full": frozenset(),
+    "no_dialogue": frozenset({"dialogue"}),
+    "cached_strategy": frozenset({"dialogue", "strategy"}),
+    "rule_based": frozenset({"dialogue", "strategy", "plan"}),
+}
+
+# 전체 제한 시간 중 각 LLM 노드에 배정되는 비율
+NODE_BUDGET_SHARE = {
+    "strategy": 0.3,
+    "plan": 0.5,
+    "dialogue": 0.2,
+}
+
+# 노드 실행 순서
+NODE_ORDER = ["strategy", "plan", "dialogue"]
+
+# 노드 중요도 (앞일수록 중요). 시간이 부족하면 덜 중요한 노드부터 생략되도록
+# 각 노드는 뒤에 실행될 더 중요한 노드의 몫을 남겨두고 시간을 사용합니다.
+NODE_PRIORITY = ["plan", "strategy", "dialogue"]
+
+# LLM 호출을 시도할 최소 시간 (초). 이보다 적게 남으면 바로 성능 저하 단계로 전환
+MIN_LLM_TIMEOUT = 0.3
+
+
+def remaining_time(state: LangGraphBattleState) -> Optional[float]:
+    """남은 제한 시간 (초). 제한 시간이 없으면 None"""
+    if state.deadline is None:
+        return None
+    return state.deadline - time.monotonic()
+
+
+def node_timeout(state: LangGraphBattleState, node: str) -> Optional[float]:
+    """노드가 LLM 호출에 사용할 수 있는 시간 (초)
+
+    남은 시간에서 이후에 실행될 더 중요한 노드들의 몫을 제외한 만큼을 사용합니다.
+    제한 시간이 없으면 None, 시간이 부족하거나 현재 부하 단계에서 생략하는 노드이면 0을 반환합니다.
+    """
+    if node in SHED_NODES.get(state.load_level, ()):
+        return 0
+
+    remaining = remaining_time(state)
+    if remaining is None:
+        return None
+
+    downstream = NODE_ORDER[NODE_ORDER.index(node) + 1:]
+    priority = NODE_PRIORITY.index(node)
+    reserved = sum(
+        NODE_BUDGET_SHARE[n] for n in downstream if NODE_PRIORITY.index(n) < priority
+    ) * (state.deadline_budget or 0)
+    timeout = remaining - reserved
+    return timeout if timeout >= MIN_LLM_TIMEOUT else 0
+
+
+def degrade(state: LangGraphBattleState, level: str) -> None:
+    """현재보다 높은 성능 저하 수준일 때만 갱신"""
+    if DEGRADATION_LEVELS.index(level) > DEGRADATION_LEVELS.index(state.degradation_level):
+        state.degradation_level = level
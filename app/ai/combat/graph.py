@@ -1,16 +1,47 @@
-from typing import List, Dict, Any, Optional
+import inspect
+import logging
+import time
+from typing import Callable, List, Dict, Any, Optional
 from langchain.schema import BaseMessage
 from langgraph.graph import StateGraph, END
 from app.ai.combat.states import LangGraphBattleState
+from app.utils.metrics import COMBAT_NODE_DURATION
+from app.utils.profiling import record_span
+from app.ai.gateway import CircuitOpenError
 from app.ai.combat.nodes import (
     analyze_situation,
     decide_strategy,
     plan_attack,
     plan_flee,
     generate_dialogue,
-    create_response
+    create_response,
+    decide_rule_based,
+    decide_fused,
+    tactical_search
 )
 
+# AI 티어 (연산량 순): rule → fused → full → tactical
+AI_TIERS = ["rule", "fused", "full", "tactical"]
+
+# 티어별 컴파일된 그래프 (처음 사용할 때 한 번만 컴파일)
+_compiled_graphs: Dict[str, Any] = {}
+
+logger = logging.getLogger(__name__)
+
+def timed(name: str, node: Callable) -> Callable:
+    """노드 실행 시간(ms)을 state.node_timings 에 기록하는 래퍼"""
+    async def wrapper(state: LangGraphBattleState) -> LangGraphBattleState:
+        started = time.perf_counter()
+        result = node(state)
+        if inspect.isawaitable(result):
+            result = await result
+        elapsed = time.perf_counter() - started
+        result.node_timings[name] = round(elapsed * 1000, 2)
+        COMBAT_NODE_DURATION.labels(name).observe(elapsed)
+        record_span("node", name, started, elapsed)
+        return result
+    return wrapper
+
 def should_route_to_attack_or_flee(state: LangGraphBattleState) -> str:
     """전략 타입에 따라 공격 또는 도망 노드로 라우팅"""
     # 구조화된 전략 정보를 기반으로 라우팅 결정
@@ -29,18 +60,33 @@ def should_route_to_attack_or_flee(state: LangGraphBattleState) -> str:
     #         # 기본값은 공격
     #         return "attack"
 
-def create_combat_graph() -> StateGraph:
-    """전투 AI 그래프 생성"""
+def create_combat_graph(tier: str = "full") -> StateGraph:
+    """전투 AI 그래프 생성
+
+    - rule: 상황 분석 → 규칙 기반 결정 → 응답
+    - fused: 상황 분석 → 통합 결정 (LLM 1회) → 응답
+    - full: 상황 분석 → 전략 → 공격/도주 계획 → 대사 → 응답
+    - tactical: full 그래프의 계획 뒤에 전술 탐색 추가
+    """
     # 상태 그래프 생성
     workflow = StateGraph(LangGraphBattleState)
+    workflow.add_node("analyze_situation", timed("analyze_situation", analyze_situation))
+    workflow.add_node("create_response", timed("create_response", create_response))
+    workflow.set_entry_point("analyze_situation")
+    workflow.add_edge("create_response", END)
+
+    if tier in ("rule", "fused"):
+        decide_node = decide_rule_based if tier == "rule" else decide_fused
+        workflow.add_node("decide", timed("decide", decide_node))
+        workflow.add_edge("analyze_situation", "decide")
+        workflow.add_edge("decide", "create_response")
+        return workflow
     
     # 노드 추가
-    workflow.add_node("analyze_situation", analyze_situation)
-    workflow.add_node("decide_strategy", decide_strategy)
-    workflow.add_node("plan_attack", plan_attack)
-    workflow.add_node("plan_flee", plan_flee)
-    workflow.add_node("generate_dialogue", generate_dialogue)
-    workflow.add_node("create_response", create_response)
+    workflow.add_node("decide_strategy", timed("decide_strategy", decide_strategy))
+    workflow.add_node("plan_attack", timed("plan_attack", plan_attack))
+    workflow.add_node("plan_flee", timed("plan_flee", plan_flee))
+    workflow.add_node("generate_dialogue", timed("generate_dialogue", generate_dialogue))
     
     # 엣지 연결 (기본 흐름)
     workflow.add_edge("analyze_situation", "decide_strategy")
@@ -55,33 +101,45 @@ def create_combat_graph() -> StateGraph:
         }
     )
     
-    # 행동 계획 수립 후 대사 생성
-    workflow.add_edge("plan_attack", "generate_dialogue")
-    workflow.add_edge("plan_flee", "generate_dialogue")
+    # 행동 계획 수립 후 (tactical 티어는 전술 탐색을 거쳐) 대사 생성
+    if tier == "tactical":
+        workflow.add_node("tactical_search", timed("tactical_search", tactical_search))
+        workflow.add_edge("plan_attack", "tactical_search")
+        workflow.add_edge("plan_flee", "tactical_search")
+        workflow.add_edge("tactical_search", "generate_dialogue")
+    else:
+        workflow.add_edge("plan_attack", "generate_dialogue")
+        workflow.add_edge("plan_flee", "generate_dialogue")
     
     workflow.add_edge("generate_dialogue", "create_response")
-    workflow.add_edge("create_response", END)
-    
-    # 시작 노드 설정
-    workflow.set_entry_point("analyze_situation")
     
     return workflow
 
-async def run_graph(state: LangGraphBattleState) -> LangGraphBattleState:
-    """전투 AI 그래프 실행"""
+def get_compiled_graph(tier: str = "full"):
+    """티어별 그래프를 한 번만 컴파일하여 재사용"""
+    if tier not in AI_TIERS:
+        raise ValueError(f"알 수 없는 AI 티어입니다: {tier}")
+    compiled_graph = _compiled_graphs.get(tier)
+    if compiled_graph is None:
+        compiled_graph = create_combat_graph(tier).compile()
+        _compiled_graphs[tier] = compiled_graph
+    return compiled_graph
+
+async def run_graph(state: LangGraphBattleState, tier: str = "full") -> LangGraphBattleState:
+    """전투 AI 그래프 실행 (tier 에 해당하는 그래프 사용)"""
     try:
-        # 그래프 생성
-        graph = create_combat_graph()
-        
-        # 그래프 컴파일
-        compiled_graph = graph.compile()
+        # 티어별 컴파일된 그래프
+        compiled_graph = get_compiled_graph(tier)
         
         # 비동기 실행 (LangGraph 1.0.0+)
         result = await compiled_graph.ainvoke(state)
         
         # 최종 상태 반환
         return result
+    except CircuitOpenError:
+        # 서킷 브레이커가 열리면 CombatAI 폴백으로 바로 전달
+        raise
     except Exception as e:
-        print(f"그래프 실행 오류: {str(e)}")
+        logger.exception("그래프 실행 오류: %s", e)
         # 오류 발생 시 원래 상태 반환
         return state
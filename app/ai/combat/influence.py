@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.ai.combat.states import Character
+from app.ai.combat.targeting import attack_profile
+from app.utils.battle_map import BattleMap, reachable_positions
+from app.utils.environment import BattleEnvironment
+from app.utils.metrics import CACHE_REQUESTS
+
+# 안전 타일 점수 가중치
+ALLY_DISTANCE_WEIGHT = 0.1   # 가장 가까운 아군까지 거리 1칸당 비용
+
+# 도주 노드에 전달할 안전 타일 수
+MAX_SAFE_TILES = 3
+
+# 같은 적 배치에 대한 위협 지도를 재사용하기 위한 캐시 크기
+THREAT_MAP_CACHE_SIZE = 64
+
+
+class InfluenceMap:
+    """적 진영의 다음 턴 공격 가능 범위를 격자로 래스터화한 위협 지도
+
+    각 적은 (이동력 + 최대 스킬 사거리) 이내의 모든 타일에 1회 최대 예상 피해량만큼 위협을 더합니다.
+    격자는 적의 위협 범위를 모두 덮도록 만들어지므로 격자 밖 타일의 위협은 0입니다.
+    """
+
+    def __init__(self, enemies: List[Character], environment: Optional[BattleEnvironment] = None):
+        self.environment = environment
+        self.enemy_positions = np.array([e.position for e in enemies], dtype=int).reshape(-1, 2)
+        if not enemies:
+            self.origin = np.zeros(2, dtype=int)
+            self.threat = np.zeros((0, 0))
+            return
+
+        profiles = [attack_profile(e, environment) for e in enemies]
+        reach = np.array([self._movement(e.mov) + p["range"] for e, p in zip(enemies, profiles)], dtype=int)
+        damage = np.array([max(p["damage"], 1.0) for p in profiles], dtype=float)
+
+        self.origin = (self.enemy_positions - reach[:, None]).min(axis=0)
+        upper = (self.enemy_positions + reach[:, None]).max(axis=0)
+        width, height = upper - self.origin + 1
+
+        xs, ys = np.meshgrid(
+            np.arange(width) + self.origin[0], np.arange(height) + self.origin[1], indexing="ij"
+        )
+        # [적 수 × 가로 × 세로] 거리 → 범위 안이면 해당 적의 피해량을 합산
+        distance = (np.abs(xs[None] - self.enemy_positions[:, 0, None, None])
+                    + np.abs(ys[None] - self.enemy_positions[:, 1, None, None]))
+        self.threat = ((distance <= reach[:, None, None]) * damage[:, None, None]).sum(axis=0)
+
+    def _movement(self, mov: int) -> int:
+        return self.environment.movement(mov) if self.environment else mov
+
+    def threat_at(self, positions: np.ndarray) -> np.ndarray:
+        """[N × 2] 위치 배열의 위협값 (격자 밖은 0)"""
+        positions = np.asarray(positions, dtype=int).reshape(-1, 2)
+        index = positions - self.origin
+        inside = (index >= 0).all(axis=1) & (index < np.array(self.threat.shape)).all(axis=1)
+        values = np.zeros(len(positions))
+        values[inside] = self.threat[index[inside, 0], index[inside, 1]]
+        return values
+
+    def safe_tiles(self, character: Character, allies: Iterable[Character],
+                   occupied: Set[Tuple[int, int]], k: int = MAX_SAFE_TILES,
+                   battle_map: Optional[BattleMap] = None) -> List[Tuple[Tuple[int, int], float]]:
+        """이동 가능한 타일 중 안전한 순서로 상위 k개 (위치, 위협값)
+
+        점수 = 위협 합계 + 가장 가까운 아군까지 거리 × 가중치 (낮을수록 안전)
+        같으면 가장 가까운 적과 더 먼 타일을 우선합니다.
+        battle_map 이 주어지면 막힌 타일을 피해 실제로 이동 가능한 타일만 후보로 사용합니다.
+        """
+        reachable = [
+            pos for pos in reachable_positions(character.position, self._movement(character.mov), battle_map)
+            if pos == character.position or pos not in occupied
+        ]
+        positions = np.array(sorted(reachable), dtype=int)
+        threat = self.threat_at(positions)
+
+        ally_positions = np.array([a.position for a in allies], dtype=int).reshape(-1, 2)
+        if len(ally_positions):
+            ally_distance = np.abs(positions[:, None, :] - ally_positions[None]).sum(axis=2).min(axis=1)
+        else:
+            ally_distance = np.zeros(len(positions))
+
+        if len(self.enemy_positions):
+            enemy_distance = np.abs(positions[:, None, :] - self.enemy_positions[None]).sum(axis=2).min(axis=1)
+        else:
+            enemy_distance = np.zeros(len(positions))
+
+        score = threat + ALLY_DISTANCE_WEIGHT * ally_distance
+        order = np.lexsort((-enemy_distance, score))[:k]
+        return [(tuple(int(v) for v in positions[i]), float(threat[i])) for i in order]
+
+
+_threat_maps: "OrderedDict[Tuple, InfluenceMap]" = OrderedDict()
+
+
+def threat_map(enemies: List[Character], environment: Optional[BattleEnvironment] = None) -> InfluenceMap:
+    """적 배치에 대한 위협 지도 (같은 턴에 도주하는 캐릭터들은 같은 지도를 재사용)"""
+    env_key = (environment.terrain, environment.weather) if environment else None
+    key = (env_key,) + tuple(
+        (e.id, tuple(e.position), e.mov, e.ap, e.attack, tuple(e.skills), tuple(e.traits), tuple(e.status_effects))
+        for e in enemies
+    )
+    influence: Optional[InfluenceMap] = _threat_maps.get(key)
+    if influence is None:
+        CACHE_REQUESTS.labels("threat_map", "miss").inc()
+        influence = InfluenceMap(enemies, environment)
+        _threat_maps[key] = influence
+        while len(_threat_maps) > THREAT_MAP_CACHE_SIZE:
+            _threat_maps.popitem(last=False)
+    else:
+        CACHE_REQUESTS.labels("threat_map", "hit").inc()
+        _threat_maps.move_to_end(key)
+    return influence
@@ -1,26 +1,53 @@
-from typing import Dict, List, Tuple, Optional
-from langchain_openai import ChatOpenAI
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.prompts import PromptTemplate
-from langchain.prompts import FewShotPromptTemplate
-
-from app.ai.combat.states import LangGraphBattleState, Character, ActionPlan, Strategy
-from app.utils.combat import calculate_manhattan_distance, calculate_action_costs, filter_usable_skills
+import asyncio
+import logging
+from typing import Dict, List, Tuple, Optional, Set
+
+from app.config import settings
+from app.ai.gateway import llm_gateway, CircuitOpenError, Messages
+from app.ai.prompts import CompiledPrompt, output_parser
+from app.ai.combat.prompts import (
+    STRATEGY_PROMPT, ATTACK_PLAN_PROMPT, FLEE_PLAN_PROMPT, FUSED_PLAN_PROMPT, DIALOGUE_PROMPT,
+)
+from app.ai.combat.states import LangGraphBattleState, Character, ActionPlan, Strategy, FusedDecision
+from app.ai.combat.budget import node_timeout, degrade
+from app.ai.combat.scoring import ActionScores, score_actions, MAX_SKILL_CANDIDATES
+from app.ai.combat.influence import threat_map
+from app.ai.combat.tactics import TacticalSearch, SEARCH_MARGIN
+from app.utils.combat import calculate_manhattan_distance, calculate_action_costs, filter_usable_skills, calculate_reachable_positions
 from app.utils.loader import skill_info_all
+from app.utils.environment import BattleEnvironment, compile_environment
+from app.utils.battle_map import BattleMap, map_registry, reachable_positions
+from app.utils.log import log_state
 from dotenv import load_dotenv
 # 환경 변수 로드
 load_dotenv()
 
-# LLM 인스턴스 생성
-# llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.5)
-llm = ChatOpenAI(model_name="gpt-4.1-nano", temperature=0.5)
+# 전투 노드에서 사용하는 LLM 모델 (호출은 llm_gateway 를 통해 수행)
+# COMBAT_MODEL = "gpt-4o-mini"
+COMBAT_MODEL = "gpt-4.1-nano"
+
+# rule 티어에서 도주 전략을 선택하는 HP 기준
+RULE_FLEE_HP = 30
+
+# 도주로 라우팅되는 전략 유형
+FLEE_STRATEGIES = ["방어 우선", "도망 우선"]
+
+# 처치 우선 전략에서 팀 배정 타겟 대신 다른 적을 노리는 최소 이번 턴 처치 확률
+KILL_OVERRIDE_PROBABILITY = 0.5
+
+logger = logging.getLogger(__name__)
+
+
+def battle_environment(state: LangGraphBattleState) -> BattleEnvironment:
+    """전투 시작 시 컴파일해 상태에 담아 둔 지형/날씨 효과 (직접 구성한 상태이면 그때 컴파일)"""
+    return state.environment or compile_environment(state.terrain, state.weather)
 
 
 def analyze_situation(state: LangGraphBattleState) -> LangGraphBattleState:
     """
     상황 분석 노드: 현재 전투 상황을 분석하고 캐릭터 간 거리, 위험도 등 계산
     """
-    print("[상황 분석 노드] 시작")
+    logger.debug("[상황 분석 노드] 시작")
     # 현재 캐릭터 찾기
     current_character = next((c for c in state.characters if c.id == state.current_character_id), None)
     if not current_character:
@@ -33,11 +60,12 @@ def analyze_situation(state: LangGraphBattleState) -> LangGraphBattleState:
         "mov": current_character.mov
     }
     
-    # 전투 요약 생성 (최근 로그 기반)
+    # 전투 요약 (CombatAI 가 누적 요약을 넘겨준 경우 그대로 사용, 없으면 최근 로그 기반으로 생성)
     battle_summary = "현재 전투 상황: "
-    if state.battle_log:
-        recent_logs = state.battle_log[-3:] if len(state.battle_log) > 3 else state.battle_log
-        battle_summary += " ".join(recent_logs)
+    if state.battle_summary:
+        battle_summary += state.battle_summary
+    elif state.battle_log:
+        battle_summary += " ".join(state.battle_log[-3:])
     else:
         battle_summary += "전투 시작 단계"
     
@@ -47,50 +75,27 @@ def analyze_situation(state: LangGraphBattleState) -> LangGraphBattleState:
     
     # 트레이스 기록 시작
     state.trace = ["상황 분석 완료"]
-    print("[상황 분석 노드] 상태\n", state)
+    log_state(logger, "[상황 분석 노드] 상태", state)
     
     return state
 
-def decide_strategy(state: LangGraphBattleState) -> LangGraphBattleState:
+async def decide_strategy(state: LangGraphBattleState) -> LangGraphBattleState:
     """
     전략 결정 노드: 캐릭터 특성과 상황을 기반으로 행동 전략 결정 (LLM 호출)
     """
-    print("[전략 결정 노드] 시작")
+    logger.debug("[전략 결정 노드] 시작")
     # 현재 캐릭터 찾기
     current_character = next((c for c in state.characters if c.id == state.current_character_id), None)
+
+    # 제한 시간이 부족하면 LLM 호출 없이 직전 전략 재사용
+    timeout = node_timeout(state, "strategy")
+    if timeout == 0:
+        logger.info("[전략 결정 노드] 제한 시간 부족 - 캐시된 전략 사용")
+        return use_cached_strategy(state)
     
-    # PydanticOutputParser 설정
-    parser = PydanticOutputParser(pydantic_object=Strategy)
-    
-    # 프롬프트 템플릿 설정
-    prompt_template = PromptTemplate(
-        template="""당신은 '{character_name}'이라는 {character_type} 캐릭터입니다.
-캐릭터 특성: {character_traits}
-현재 HP: {hp}, AP: {ap}, MOV: {mov}
-상태 이상: {status_effects}
-
-전투 환경:
-- 지형: {terrain}
-- 날씨: {weather}
-
-전투 상황:
-{battle_summary}
-
-다음 중 하나의 전략을 선택하고 그 이유를 간략히 설명하세요:
-1. 공격 우선 (근접한 적에게 최대 피해)
-2. 처치 우선 (가장 약한 적에게 최대 피해)
-3. 방어 우선 (회피 및 생존 중심)
-4. 지원 우선 (아군 지원에 집중)
-5. 도망 우선 (안전한 위치로 후퇴) - 체력이 50% 이하일 때만 고려
-
-{format_instructions}""",
-        input_variables=["character_name", "character_type", "character_traits", "hp", "ap", "mov", 
-                        "status_effects", "terrain", "weather", "battle_summary"],
-        partial_variables={"format_instructions": parser.get_format_instructions()}
-    )
-    
-    # 프롬프트 구성
-    prompt = prompt_template.format(
+    # 프롬프트 구성 (컴파일된 템플릿 사용, 토큰 예산 초과 시 전투 요약부터 축소)
+    prompt = STRATEGY_PROMPT.render(
+        budget=settings.COMBAT_PROMPT_TOKEN_BUDGET,
         character_name=current_character.name,
         character_type=current_character.type,
         character_traits=', '.join(current_character.traits),
@@ -108,15 +113,18 @@ def decide_strategy(state: LangGraphBattleState) -> LangGraphBattleState:
     
     # LLM에 프롬프트 전송
     try:
-        response = llm.invoke(prompt).content
-        print(f"[전략 결정 노드] 응답\n{response}")
+        response = await asyncio.wait_for(
+            llm_gateway.chat("strategy", prompt, model=COMBAT_MODEL, temperature=0.5),
+            timeout
+        )
+        logger.debug("[전략 결정 노드] 응답: %s", response)
         
         # Pydantic 파서로 파싱
-        strategy_info = parser.parse(response)
+        strategy_info = output_parser(Strategy).parse(response)
         
         # 체력 제한 강제 적용 (체력이 50% 초과인데 도망 전략 선택한 경우 공격 전략으로 변경)
         if strategy_info.type != "공격 우선" and current_character.hp > 50:
-            print(f"체력이 충분함에도 도망 전략 선택됨 - 공격 우선으로 변경")
+            logger.debug("체력이 충분함에도 도망 전략 선택됨 - 공격 우선으로 변경")
             strategy_info.type = "공격 우선"
             strategy_info.reason = "체력이 충분하여 공격 전략으로 자동 변경 (체력 50 초과)"
         
@@ -125,8 +133,13 @@ def decide_strategy(state: LangGraphBattleState) -> LangGraphBattleState:
         # 기존 문자열 형태의 전략도 저장 (호환성 유지)
         state.strategy = f"{strategy_info.type}, {strategy_info.reason}"
         
+    except CircuitOpenError:
+        raise
+    except asyncio.TimeoutError:
+        logger.info("[전략 결정 노드] 제한 시간 초과 - 캐시된 전략 사용")
+        return use_cached_strategy(state)
     except Exception as e:
-        print(f"LLM 호출 또는 파싱 실패: {str(e)}")
+        logger.warning("[전략 결정 노드] LLM 호출 또는 파싱 실패: %s", e)
         # 폴백: 기본 전략
         state.strategy = "공격 우선 (LLM 오류)"
         state.strategy_info = Strategy(type="공격 우선", reason="LLM 오류로 인한 기본 전략")
@@ -139,20 +152,53 @@ def decide_strategy(state: LangGraphBattleState) -> LangGraphBattleState:
     
     return state
 
-def plan_attack(state: LangGraphBattleState) -> LangGraphBattleState:
+async def plan_attack(state: LangGraphBattleState) -> LangGraphBattleState:
     """
     공격 계획 수립 노드: 공격 위주의 행동 계획 수립 (LLM 호출)
     """
-    print("[공격 계획 수립 노드] 시작")
+    logger.debug("[공격 계획 수립 노드] 시작")
     
     # 캐릭터 및 타겟 정보 가져오기
     current_character, targets_info = get_current_and_target_characters(state)
     current_position = current_character.position
     
-    # 전략에 따라 타겟 선택
+    # 살아 있는 상대 전체에 대한 (스킬, 타겟) 예상 피해량/처치 확률
+    opponents = [
+        c for c in state.characters
+        if c.type != current_character.type and c.hp > 0
+    ]
+    environment = battle_environment(state)
+    battle_map = map_registry.get(state.map_id) if state.map_id else None
+    scores = score_actions(current_character, opponents, environment=environment, battle_map=battle_map)
+    
+    # 팀 단위로 배정된 타겟이 있으면 우선 사용, 없으면 전략에 따라 타겟 선택
     selected_target = None
-    if state.strategy_info:
-        if state.strategy_info.type == "처치 우선":
+    assigned_target = next(
+        (c for c in state.characters if c.id == state.assigned_target_id and c.hp > 0), None
+    ) if state.assigned_target_id else None
+    # 처치 우선 전략이고 이번 턴에 처치할 가능성이 높은 다른 적이 있으면 팀 배정보다 우선
+    if assigned_target and kill_override_target(state.strategy_info, assigned_target, scores):
+        assigned_target = None
+    if assigned_target:
+        selected_target = {
+            "character": assigned_target,
+            "id": assigned_target.id,
+            "position": assigned_target.position,
+            "name": assigned_target.name,
+            "hp": assigned_target.hp
+        }
+    elif state.strategy_info:
+        if state.strategy_info.type == "처치 우선" and scores:
+            # 이번 턴 처치 확률(같으면 예상 피해량)이 가장 높은 적 타겟으로 선택
+            best_target = scores.best_kill_target()
+            selected_target = {
+                "character": best_target,
+                "id": best_target.id,
+                "position": best_target.position,
+                "name": best_target.name,
+                "hp": best_target.hp
+            }
+        elif state.strategy_info.type == "처치 우선":
             # 가장 약한 적 타겟으로 선택
             selected_target = targets_info["weakest_target"]
         else:
@@ -176,23 +222,21 @@ def plan_attack(state: LangGraphBattleState) -> LangGraphBattleState:
                (target_type in ["nearest_target", "weakest_target"] and target["id"] != target_id):
                 additional_targets_info += f"\n추가 타겟: {target['name']} (ID: {target['id']}, 위치: {target['position']}, HP: {target['hp']})"
     
-    # 모든 타겟 정보 결합
-    all_targets_info = f"{target_info}{additional_targets_info}"
-    
-    # 스킬 설명 준비
-    skill_descriptions = prepare_skill_descriptions(current_character, current_position, target_position)
+    # 스킬 설명 준비 (예상 피해량 기준 상위 후보만 포함)
+    skill_descriptions = prepare_skill_descriptions(current_character, current_position, target_position,
+                                                    scores=scores, target_id=target_id, environment=environment,
+                                                    battle_map=battle_map)
     
     # 현재 위치에서 타겟까지의 거리
     current_distance = calculate_manhattan_distance(current_position, target_position)
     
-    # 공격용 프롬프트 접미사
-    attack_prompt_suffix = f"""현재 위치에서 주요 타겟을 향해 어떻게 움직이고, 어떤 공격 스킬을 사용할지 결정하세요.
-이동은 한 턴에 최대 MOV값 만큼 가능합니다.
-스킬 사용 시 스킬 범위 내에 타겟이 있어야 합니다.
-공격적인 접근과 최대 데미지를 주는 방법을 선택하세요.
-
-타겟 정보:
-{all_targets_info}"""
+    # 추천 행동 (처치 확률, 예상 피해량 순)
+    recommended_actions = "".join(
+        f"\n- {skill} → {target.name} (ID: {target.id}): 예상 피해 {damage:.1f}, 처치 확률 {kill:.0%}"
+        for skill, target, damage, kill in scores.top_actions()
+    )
+    if recommended_actions:
+        recommended_actions = f"\n\n추천 행동:{recommended_actions}"
     
     # 프롬프트 생성
     prompt = create_action_plan_prompt(
@@ -201,20 +245,25 @@ def plan_attack(state: LangGraphBattleState) -> LangGraphBattleState:
         position=current_position,
         hp=current_character.hp,
         ap=current_character.ap,
-        mov=current_character.mov,
+        mov=environment.movement(current_character.mov),
         strategy=state.strategy,
         target_id=target_id,
         target_position=target_position,
         current_distance=current_distance,
         skill_descriptions=skill_descriptions,
-        prompt_suffix=attack_prompt_suffix
+        prompt=ATTACK_PLAN_PROMPT,
+        environment=environment.describe(),
+        target_info=target_info,
+        additional_targets=additional_targets_info,
+        recommended_actions=recommended_actions
     )
     
     # # LLM 호출 로깅
     # print("[공격 계획 수립 노드] 프롬프트\n", prompt)
     
-    # LLM 호출 및 응답 처리
-    action_plan = handle_llm_response(prompt, current_character, current_position)
+    # LLM 호출 및 응답 처리 (제한 시간 부족 시 규칙 기반 행동)
+    action_plan = await plan_with_budget(state, prompt, current_character, selected_target["character"], flee=False,
+                                         environment=environment, battle_map=battle_map)
     
     # 상태 업데이트
     state = update_state_with_action_plan(state, action_plan, target_id)
@@ -223,11 +272,11 @@ def plan_attack(state: LangGraphBattleState) -> LangGraphBattleState:
     
     return state
 
-def plan_flee(state: LangGraphBattleState) -> LangGraphBattleState:
+async def plan_flee(state: LangGraphBattleState) -> LangGraphBattleState:
     """
     도주 계획 수립 노드: 도망 위주의 행동 계획 수립 (LLM 호출)
     """
-    print("[도주 계획 수립 노드] 시작")
+    logger.debug("[도주 계획 수립 노드] 시작")
     
     # 캐릭터 및 타겟 정보 가져오기
     current_character, targets_info = get_current_and_target_characters(state)
@@ -249,24 +298,30 @@ def plan_flee(state: LangGraphBattleState) -> LangGraphBattleState:
                (target_type in ["nearest_target", "weakest_target"] and target["id"] != target_id):
                 additional_threats_info += f"\n추가 위협: {target['name']} (ID: {target['id']}, 위치: {target['position']}, HP: {target['hp']})"
     
-    # 모든 위협 정보 결합
-    all_threats_info = f"{target_info}{additional_threats_info}"
+    # 적의 다음 턴 공격 범위 기준 안전한 이동 후보 (위협 지도는 같은 적 배치에서 재사용)
+    enemies = [c for c in state.characters if c.type != current_character.type and c.hp > 0]
+    allies = [
+        c for c in state.characters
+        if c.type == current_character.type and c.id != current_character.id and c.hp > 0
+    ]
+    occupied = {c.position for c in state.characters if c.id != current_character.id}
+    environment = battle_environment(state)
+    battle_map = map_registry.get(state.map_id) if state.map_id else None
+    safe_tiles = threat_map(enemies, environment).safe_tiles(current_character, allies, occupied,
+                                                             battle_map=battle_map)
+    safe_tiles_info = ""
+    if safe_tiles:
+        safe_tiles_info = "\n\n안전한 이동 후보 (위협이 낮은 순):" + "".join(
+            f"\n- {pos}: 위협 {threat:.1f}" for pos, threat in safe_tiles
+        )
     
     # 스킬 설명 준비
-    skill_descriptions = prepare_skill_descriptions(current_character, current_position, target_position)
+    skill_descriptions = prepare_skill_descriptions(current_character, current_position, target_position,
+                                                    environment=environment, battle_map=battle_map)
     
     # 현재 위치에서 타겟까지의 거리
     current_distance = calculate_manhattan_distance(current_position, target_position)
     
-    # 도주용 프롬프트 접미사
-    flee_prompt_suffix = f"""현재 위치에서 주요 위협과 추가 위협으로부터 멀어지고, 안전하게 대피할 방법을 결정하세요.
-이동은 한 턴에 최대 MOV값 만큼 가능합니다.
-방어 또는 회피 스킬을 사용하거나, 안전한 위치로 후퇴하는 것을 우선시하세요.
-타겟과의 거리를 최대한 늘리고 생존에 집중하세요.
-
-위협 정보:
-{all_threats_info}"""
-    
     # 프롬프트 생성
     prompt = create_action_plan_prompt(
         character_name=current_character.name,
@@ -274,20 +329,26 @@ def plan_flee(state: LangGraphBattleState) -> LangGraphBattleState:
         position=current_position,
         hp=current_character.hp,
         ap=current_character.ap,
-        mov=current_character.mov,
+        mov=environment.movement(current_character.mov),
         strategy=state.strategy,
         target_id=target_id,
         target_position=target_position,
         current_distance=current_distance,
         skill_descriptions=skill_descriptions,
-        prompt_suffix=flee_prompt_suffix
+        prompt=FLEE_PLAN_PROMPT,
+        environment=environment.describe(),
+        threat_info=target_info,
+        additional_threats=additional_threats_info,
+        safe_tiles=safe_tiles_info
     )
     
     # # LLM 호출 로깅
     # print("[도주 계획 수립 노드] 프롬프트\n", prompt)
     
-    # LLM 호출 및 응답 처리
-    action_plan = handle_llm_response(prompt, current_character, current_position)
+    # LLM 호출 및 응답 처리 (제한 시간 부족 시 규칙 기반 행동)
+    action_plan = await plan_with_budget(state, prompt, current_character, nearest_target["character"], flee=True,
+                                         safe_tiles=[pos for pos, _ in safe_tiles], environment=environment,
+                                         battle_map=battle_map)
     
     # 상태 업데이트
     state = update_state_with_action_plan(state, action_plan, target_id)
@@ -296,82 +357,24 @@ def plan_flee(state: LangGraphBattleState) -> LangGraphBattleState:
     
     return state
 
-def generate_dialogue(state: LangGraphBattleState) -> LangGraphBattleState:
+async def generate_dialogue(state: LangGraphBattleState) -> LangGraphBattleState:
     """
     대사 생성 노드: 캐릭터 행동에 맞는 대사 생성 (LLM 호출)
     """
-    print("[대사 생성 노드] 시작")
+    logger.debug("[대사 생성 노드] 시작")
+
+    # 제한 시간이 부족하면 대사 생성 생략
+    timeout = node_timeout(state, "dialogue")
+    if timeout == 0:
+        logger.info("[대사 생성 노드] 제한 시간 부족 - 대사 생략")
+        return skip_dialogue(state)
+
     # 현재 캐릭터와 타겟 찾기
     current_character = next((c for c in state.characters if c.id == state.current_character_id), None)
     target_character = next((c for c in state.characters if c.id == state.target_character_id), None)
     
-    # few-shot 예제 설정
-    few_shot_examples = [
-        {
-            'name': '골렘',
-            'traits': '냉정함, 강인함',
-            'strategy': '전투 태세를 유지하며 침착하게 대응하는 것이 적합하며, 냉정하고 신중한 성격으로 인해 무리하지 않고 질서를 유지하려는 판단을 내립니다.',
-            'skill': '타격',
-            'dialogue': '위반 감지. 대응 절차 개시.'
-        },
-        {
-            'name': '앤트',
-            'traits': '신중함',
-            'strategy': '신중한 성격으로 인해 자연의 힘을 활용하여 전장의 균형을 맞추려는 판단을 내립니다.',
-            'skill': '대지 가르기',
-            'dialogue': '땅이.. 너희를 기억하지 않기를 바란다..'
-        },
-        {
-            'name': '리자드맨',
-            'traits': '충동적, 잔인함',
-            'strategy': '적에게 망설임 없이 공격을 감행하는 것이 효과적이며, 충동적인 성격 때문에 즉각적이고 강력한 공격으로 적을 빠르게 제압하는 것이 적합하다고 판단됩니다.',
-            'skill': '날카로운 발톱',
-            'dialogue': '사람 피.. 더! 씹어..! 찢어..!'
-        }
-    ]
-    
-    # 예제 프롬프트 템플릿 설정
-    example_prompt = PromptTemplate(
-        input_variables=["name", "traits", "strategy", "skill", "dialogue"],
-        template="""캐릭터: {name}
-특성: {traits}
-전략: {strategy}
-스킬: {skill}
-대사: {dialogue}"""
-    )
-    
-    # FewShotPromptTemplate 설정
-    few_shot_prompt = FewShotPromptTemplate(
-        examples=few_shot_examples,
-        example_prompt=example_prompt,
-        prefix="""당신은 판타지 게임 세계관의 캐릭터 대사를 생성하는 AI입니다.
-주어진 캐릭터 정보와 상황에 적합한 한 줄의 대사를 생성해 주세요.
-
-###지시사항:
-1. 캐릭터의 특성과 종족에 따른 독특한 말투 사용
-2. 짧지만 강렬하고 기억에 남는 대사 작성
-3. 현재 HP와 전투 상황에 맞는 감정 표현
-4. 사용하는 스킬의 특성이 대사에 반영되도록 함
-5. 판타지 세계관에 맞는 고어체나 특수한 표현 사용
-
-###각 몬스터 유형별 말투 특징:
-- 골렘: 기계적, 단조로운 어조, 짧은 문장, 1인칭 사용 희박
-- 앤트: 느리고 묵직한 말투, 자연과 생명 언급 잦음, 의인화된 자연체 느낌, 호흡 길고 문장 완성도 높음
-- 리자드맨: 짧고 끊어지는 말투, 'ㅅ', 'ㅆ' 발음 강조, 육식동물 같은 표현
-- 고블린: 거친 말투, 비문법적 표현, 3인칭으로 자신 지칭""",
-        suffix="""
-아래 정보를 바탕으로 판타지 RPG 세계관의 {character_name}의 성격을 최대한 반영하여 상황에 어울리는 짧은 대사를 한 문장으로 작성하세요:
-캐릭터: {character_name}
-특성: {character_traits}
-전략: {strategy}
-스킬: {skill_name}
-대사:
-""",
-        input_variables=["character_name", "character_traits", "strategy", "skill_name", "target_name"]
-    )
-    
     # 최종 프롬프트 구성
-    prompt = few_shot_prompt.format(
+    prompt = DIALOGUE_PROMPT.render(
         character_name=current_character.name,
         character_traits=', '.join(current_character.traits),
         strategy=state.strategy,
@@ -381,15 +384,22 @@ def generate_dialogue(state: LangGraphBattleState) -> LangGraphBattleState:
         
     # LLM 호출 로깅
     # print("[대사 생성 노드] 프롬프트\n", prompt)
-    print(f"LLM 호출 [대사 생성] - 캐릭터: {current_character.name}, 스킬: {state.action_plan.skill if state.action_plan else '없음'}")
+    logger.debug("LLM 호출 [대사 생성] - 캐릭터: %s, 스킬: %s",
+                 current_character.name, state.action_plan.skill if state.action_plan else "없음")
     
     # LLM에 프롬프트 전송
     try:
-        response = llm.invoke(prompt).content
+        response = await asyncio.wait_for(
+            llm_gateway.chat("dialogue", prompt, model=COMBAT_MODEL, temperature=0.5),
+            timeout
+        )
         dialogue = response.strip().strip('"\'')
-        print(f"LLM 응답 [대사 생성] - '{dialogue}'")
+        logger.debug("LLM 응답 [대사 생성] - '%s'", dialogue)
+    except asyncio.TimeoutError:
+        logger.info("[대사 생성 노드] 제한 시간 초과 - 대사 생략")
+        return skip_dialogue(state)
     except Exception as e:
-        print(f"LLM 호출 실패: {str(e)}")
+        logger.warning("[대사 생성 노드] LLM 호출 실패: %s", e)
         # 폴백: 기본 대사
         dialogue = f"{current_character.name}의 차례!"
     
@@ -415,7 +425,7 @@ def create_response(state: LangGraphBattleState) -> LangGraphBattleState:
     # 최종 트레이스 업데이트
     if state.trace:
         state.trace.append("응답 생성 완료")
-        print(f"[응답 생성 노드] 상태\n{state}")
+        log_state(logger, "[응답 생성 노드] 상태", state)
     
     # 여기서는 단순히 상태를 반환
     # 실제 API 응답 변환은 _convert_output_to_action 함수에서 수행
@@ -493,90 +503,74 @@ def get_current_and_target_characters(state: LangGraphBattleState) -> Tuple[Char
     return current_character, targets_info
 
 def prepare_skill_descriptions(current_character: Character, current_position: Tuple[int, int], 
-                              target_position: Tuple[int, int]) -> List[str]:
+                              target_position: Tuple[int, int], scores: Optional[ActionScores] = None,
+                              target_id: Optional[str] = None,
+                              environment: Optional[BattleEnvironment] = None,
+                              battle_map: Optional[BattleMap] = None) -> List[str]:
     """
     사용 가능한 스킬 설명 준비
+    scores 가 주어지면 공격 스킬에 타겟 대상 예상 피해량/처치 확률을 표시하고,
+    공격 스킬은 예상 피해량 상위 MAX_SKILL_CANDIDATES 개만 포함
+    environment 가 주어지면 지형/날씨 보정을 반영한 이동력과 사거리 사용
+    battle_map 이 주어지면 막힌 타일을 피해 이동 가능한 위치 기준으로 판정
     """
+    skill_info_map = environment.skill_info if environment else skill_info_all
+    mov = environment.movement(current_character.mov) if environment else current_character.mov
+    
     # 사용 가능한 스킬 필터링
     usable_skills = filter_usable_skills(
         current_position=current_position,
         target_position=target_position,
-        mov=current_character.mov,
+        mov=mov,
         skills=current_character.skills,
-        skill_info_map=skill_info_all
+        skill_info_map=skill_info_map,
+        reachable_positions=reachable_positions(current_position, mov, battle_map)
     )
     
+    # 타겟 대상 스킬별 (예상 피해량, 처치 확률)
+    skill_scores = scores.target_damage(target_id) if scores is not None and target_id else {}
+    if skill_scores:
+        ranked = sorted(skill_scores, key=lambda s: skill_scores[s], reverse=True)
+        dropped = set(ranked[MAX_SKILL_CANDIDATES:])
+    else:
+        dropped = set()
+    
+    def describe(skill: str, usage: str) -> str:
+        skill_info = skill_info_map.get(skill, {})
+        description = skill_info.get('description', '설명 없음')
+        ap_cost = skill_info.get('ap', 1)
+        skill_range = skill_info.get('range', 1)
+        expected = ""
+        if skill in skill_scores:
+            damage, kill = skill_scores[skill]
+            expected = f", 예상 피해: {damage:.1f}, 처치 확률: {kill:.0%}"
+        return f"- {skill} (AP: {ap_cost}, 범위: {skill_range}, {usage}{expected}): {description}"
+    
     # 스킬 설명 구성
     skill_descriptions = []
     
     # 즉시 사용 가능한 스킬 먼저 추가
     for skill in usable_skills['immediately_usable']:
-        skill_info = skill_info_all.get(skill, {})
-        description = skill_info.get('description', '설명 없음')
-        ap_cost = skill_info.get('ap', 1)
-        skill_range = skill_info.get('range', 1)
-        skill_descriptions.append(f"- {skill} (AP: {ap_cost}, 범위: {skill_range}, 즉시 사용 가능): {description}")
+        if skill not in dropped:
+            skill_descriptions.append(describe(skill, "즉시 사용 가능"))
     
     # 이동 후 사용 가능한 스킬 추가
     for skill in usable_skills['reachable_usable']:
-        skill_info = skill_info_all.get(skill, {})
-        description = skill_info.get('description', '설명 없음')
-        ap_cost = skill_info.get('ap', 1)
-        skill_range = skill_info.get('range', 1)
-        skill_descriptions.append(f"- {skill} (AP: {ap_cost}, 범위: {skill_range}, 이동 후 사용 가능): {description}")
+        if skill not in dropped:
+            skill_descriptions.append(describe(skill, "이동 후 사용 가능"))
     
     return skill_descriptions
 
 def create_action_plan_prompt(character_name: str, character_type: str, position: Tuple[int, int],
                              hp: int, ap: int, mov: int, strategy: str, target_id: str,
                              target_position: Tuple[int, int], current_distance: int,
-                             skill_descriptions: List[str], prompt_suffix: str = "") -> str:
+                             skill_descriptions: List[str], prompt: CompiledPrompt = ATTACK_PLAN_PROMPT,
+                             **sections) -> Messages:
     """
-    행동 계획 프롬프트 생성
+    행동 계획 프롬프트 생성 (prompt 로 노드별 템플릿 지정, sections 는 노드별 타겟/위협 정보 값)
     """
-    # PydanticOutputParser 설정
-    parser = PydanticOutputParser(pydantic_object=ActionPlan)
-    
-    # 이동 가능 범위 계산 및 설명 추가
-    movement_explanation = f"""
-이동 관련 중요 정보:
-- 현재 이동력(MOV): {mov}
-- 현재 위치: {position}
-- 타겟 위치: {target_position}
-- 맨해튼 거리: {current_distance}
-- 이동 가능 여부: {"가능" if mov >= current_distance else "불가능"}
-
-- 이동 시 반드시 현재 MOV({mov}) 이하의 거리만 이동 가능합니다.
-- 목표로 이동이 불가능한 경우 목표와 최대한 가까운 위치로 이동합니다.
-"""
-    
-    # 프롬프트 템플릿 설정
-    prompt_template = PromptTemplate(
-        template="""캐릭터: {character_name} ({character_type})
-위치: {position}
-자원: HP {hp}, AP {ap}, MOV {mov}
-
-전략: {strategy}
-
-현재 타겟 ID: {target_id}
-현재 타겟까지의 거리: {current_distance}
-
-{movement_explanation}
-
-사용 가능한 스킬 정보:
-{skill_descriptions}
-
-{prompt_suffix}
-
-{format_instructions}""",
-        input_variables=["character_name", "character_type", "position", "hp", "ap", "mov", 
-                        "strategy", "target_id", "current_distance", "movement_explanation",
-                        "skill_descriptions", "prompt_suffix"],
-        partial_variables={"format_instructions": parser.get_format_instructions()}
-    )
-    
-    # 프롬프트 구성
-    prompt = prompt_template.format(
+    return prompt.render(
+        budget=settings.COMBAT_PROMPT_TOKEN_BUDGET,
         character_name=character_name,
         character_type=character_type,
         position=position,
@@ -585,13 +579,12 @@ def create_action_plan_prompt(character_name: str, character_type: str, position
         mov=mov,
         strategy=strategy,
         target_id=target_id,
+        target_position=target_position,
         current_distance=current_distance,
-        movement_explanation=movement_explanation,
+        movable="가능" if mov >= current_distance else "불가능",
         skill_descriptions="\n".join(skill_descriptions) if skill_descriptions else "사용 가능한 스킬이 없습니다.",
-        prompt_suffix=prompt_suffix
+        **sections
     )
-    
-    return prompt
 
 def validate_action_plan(action_plan: ActionPlan, current_character: Character, 
                        current_position: Tuple[int, int]) -> ActionPlan:
@@ -604,7 +597,7 @@ def validate_action_plan(action_plan: ActionPlan, current_character: Character,
         
         # AP 비용만 검증
         if current_character.ap < skill_ap_cost:
-            print(f"행동 불가: AP 부족 (필요: {skill_ap_cost}, 현재: {current_character.ap})")
+            logger.debug("행동 불가: AP 부족 (필요: %s, 현재: %s)", skill_ap_cost, current_character.ap)
             # AP 부족 시 대기 행동으로 변경
             action_plan = ActionPlan(
                 move_to=current_position,
@@ -627,25 +620,30 @@ def validate_action_plan(action_plan: ActionPlan, current_character: Character,
     
     return action_plan
 
-def handle_llm_response(prompt: str, current_character: Character, current_position: Tuple[int, int]) -> ActionPlan:
+async def handle_llm_response(prompt: Messages, current_character: Character, current_position: Tuple[int, int],
+                              timeout: Optional[float] = None) -> ActionPlan:
     """
-    LLM 호출 및 응답 처리
+    LLM 호출 및 응답 처리 (제한 시간 초과 시 asyncio.TimeoutError 발생)
     """
     try:
         # LLM 호출 및 파싱
-        response = llm.invoke(prompt).content
-        print(f"LLM 응답 [행동 계획 생성]: {response[:500]}...")
+        response = await asyncio.wait_for(
+            llm_gateway.chat("plan", prompt, model=COMBAT_MODEL, temperature=0.5),
+            timeout
+        )
+        logger.debug("LLM 응답 [행동 계획 생성]: %s", response)
         
         # Pydantic 파서로 파싱
-        parser = PydanticOutputParser(pydantic_object=ActionPlan)
-        action_plan = parser.parse(response)
+        action_plan = output_parser(ActionPlan).parse(response)
         
         # 행동 유효성 검증 및 자원 감소 계산
         validated_action_plan = validate_action_plan(action_plan, current_character, current_position)
         
         return validated_action_plan
+    except (CircuitOpenError, asyncio.TimeoutError):
+        raise
     except Exception as e:
-        print(f"LLM 호출 또는 파싱 실패: {str(e)}")
+        logger.warning("[행동 계획] LLM 호출 또는 파싱 실패: %s", e)
         # 폴백: 기본 행동
         return ActionPlan(
             move_to=current_position,
@@ -669,4 +667,341 @@ def update_state_with_action_plan(state: LangGraphBattleState, action_plan: Acti
     if state.trace:
         state.trace.append(f"행동 계획: {action_plan.skill} -> {action_plan.target_character_id}")
     
-    return state
\ No newline at end of file
+    return state
+
+async def plan_with_budget(state: LangGraphBattleState, prompt: Messages, current_character: Character,
+                           target: Character, flee: bool,
+                           safe_tiles: Optional[List[Tuple[int, int]]] = None,
+                           environment: Optional[BattleEnvironment] = None,
+                           battle_map: Optional[BattleMap] = None) -> ActionPlan:
+    """
+    제한 시간 내에서 LLM 행동 계획 수립, 시간이 부족하거나 초과되면 규칙 기반 행동 사용
+    """
+    timeout = node_timeout(state, "plan")
+    if timeout != 0:
+        try:
+            return await handle_llm_response(prompt, current_character, current_character.position, timeout)
+        except asyncio.TimeoutError:
+            logger.info("[행동 계획] 제한 시간 초과 - 규칙 기반 행동 사용")
+    else:
+        logger.info("[행동 계획] 제한 시간 부족 - 규칙 기반 행동 사용")
+
+    degrade(state, "rule_based")
+    occupied = {c.position for c in state.characters if c.id != current_character.id}
+    return create_rule_based_plan(current_character, target, occupied, flee=flee, safe_tiles=safe_tiles,
+                                  environment=environment, battle_map=battle_map)
+
+def create_rule_based_plan(current_character: Character, target: Character,
+                           occupied: Set[Tuple[int, int]], flee: bool = False,
+                           safe_tiles: Optional[List[Tuple[int, int]]] = None,
+                           environment: Optional[BattleEnvironment] = None,
+                           battle_map: Optional[BattleMap] = None) -> ActionPlan:
+    """
+    규칙 기반 행동 계획 (LLM 없이 즉시 계산)
+    - 공격: 피해 배율이 가장 높은 스킬부터, 가장 적게 이동해서 사거리에 들어가는 위치를 선택
+    - 도주: 위협 지도의 가장 안전한 타일로 이동 (없으면 위협과 가장 먼 위치)
+    """
+    current_position = current_character.position
+    mov = environment.movement(current_character.mov) if environment else current_character.mov
+    skill_info_map = environment.skill_info if environment else skill_info_all
+    reachable = [
+        pos for pos in reachable_positions(current_position, mov, battle_map)
+        if pos == current_position or pos not in occupied
+    ]
+
+    if flee or target.id == current_character.id:
+        if flee and safe_tiles:
+            move_to = safe_tiles[0]
+            reason = "규칙 기반 행동: 가장 안전한 위치로 후퇴"
+        elif flee:
+            move_to = max(reachable, key=lambda pos: (
+                calculate_manhattan_distance(pos, target.position),
+                -calculate_manhattan_distance(pos, current_position)
+            ))
+            reason = "규칙 기반 행동: 위협으로부터 후퇴"
+        else:
+            move_to = current_position
+            reason = "규칙 기반 행동: 대상 없음"
+        action_plan = ActionPlan(
+            move_to=move_to,
+            skill=None,
+            target_character_id=current_character.id,
+            reason=reason,
+            remaining_ap=current_character.ap,
+            remaining_mov=current_character.mov
+        )
+        return validate_action_plan(action_plan, current_character, current_position)
+
+    # AP로 사용 가능한 공격 스킬 (피해 배율 높은 순)
+    attack_skills = sorted(
+        (s for s in current_character.skills
+         if skill_info_all.get(s, {}).get('dmg_mult', 0) > 0
+         and skill_info_all.get(s, {}).get('ap', 1) <= current_character.ap),
+        key=lambda s: skill_info_all[s]['dmg_mult'],
+        reverse=True
+    )
+
+    for skill in attack_skills:
+        skill_range = skill_info_map[skill].get('range', 1)
+        in_range = [pos for pos in reachable if calculate_manhattan_distance(pos, target.position) <= skill_range]
+        if in_range:
+            move_to = min(in_range, key=lambda pos: calculate_manhattan_distance(pos, current_position))
+            action_plan = ActionPlan(
+                move_to=move_to,
+                skill=skill,
+                target_character_id=target.id,
+                reason=f"규칙 기반 행동: {skill} 사용",
+                remaining_ap=current_character.ap,
+                remaining_mov=current_character.mov
+            )
+            return validate_action_plan(action_plan, current_character, current_position)
+
+    # 사거리에 들어갈 수 없으면 타겟에게 최대한 접근
+    move_to = min(reachable, key=lambda pos: calculate_manhattan_distance(pos, target.position))
+    action_plan = ActionPlan(
+        move_to=move_to,
+        skill=None,
+        target_character_id=target.id,
+        reason="규칙 기반 행동: 타겟에게 접근",
+        remaining_ap=current_character.ap,
+        remaining_mov=current_character.mov
+    )
+    return validate_action_plan(action_plan, current_character, current_position)
+
+def use_cached_strategy(state: LangGraphBattleState) -> LangGraphBattleState:
+    """
+    직전 턴의 전략(없으면 기본 공격 전략)을 현재 전략으로 사용
+    """
+    strategy_info = state.cached_strategy or Strategy(type="공격 우선", reason="제한 시간 부족으로 인한 기본 전략")
+    state.strategy_info = strategy_info
+    state.strategy = f"{strategy_info.type}, {strategy_info.reason}"
+    degrade(state, "cached_strategy")
+
+    if state.trace:
+        state.trace.append(f"전략 결정 (캐시): {state.strategy}")
+
+    return state
+
+def skip_dialogue(state: LangGraphBattleState) -> LangGraphBattleState:
+    """
+    대사 생성 생략
+    """
+    state.dialogue = None
+    degrade(state, "no_dialogue")
+
+    if state.trace:
+        state.trace.append("대사 생성 생략")
+
+    return state
+
+def kill_override_target(strategy_info: Optional[Strategy], assigned: Character,
+                         scores: ActionScores) -> Optional[Character]:
+    """
+    처치 우선 전략에서 팀 배정 타겟 대신 노릴 적 (이번 턴 처치 확률이 KILL_OVERRIDE_PROBABILITY 이상인 다른 적, 없으면 None)
+    """
+    if not strategy_info or strategy_info.type != "처치 우선" or not scores:
+        return None
+    best = scores.best_kill_target()
+    if best.id == assigned.id or scores.kill_chance(best.id) < KILL_OVERRIDE_PROBABILITY:
+        return None
+    return best
+
+def select_default_target(state: LangGraphBattleState, current_character: Character,
+                          opponents: List[Character], scores: ActionScores) -> Optional[Character]:
+    """
+    LLM 전략 없이 타겟 선택: 처치 우선 전략의 처치 가능 적 → 팀 배정 타겟 → 처치 확률이 가장 높은 적 → 가장 가까운 적
+    """
+    if not opponents:
+        return None
+    assigned = next((c for c in opponents if c.id == state.assigned_target_id), None)
+    if assigned:
+        return kill_override_target(state.strategy_info, assigned, scores) or assigned
+    if scores:
+        return scores.best_kill_target()
+    return min(opponents, key=lambda c: calculate_manhattan_distance(current_character.position, c.position))
+
+def decide_rule_strategy(current_character: Character, scores: ActionScores) -> Strategy:
+    """
+    규칙 기반 전략: HP가 낮으면 도주, 이번 턴 처치 가능한 적이 있으면 처치 우선, 아니면 공격 우선
+    """
+    if current_character.hp <= RULE_FLEE_HP:
+        return Strategy(type="도망 우선", reason=f"규칙 기반 전략: HP {RULE_FLEE_HP} 이하")
+    if scores and scores.kill_probability.max() > 0:
+        return Strategy(type="처치 우선", reason="규칙 기반 전략: 이번 턴 처치 가능한 적 존재")
+    return Strategy(type="공격 우선", reason="규칙 기반 전략: 기본 공격")
+
+def apply_rule_decision(state: LangGraphBattleState, strategy_info: Optional[Strategy] = None) -> LangGraphBattleState:
+    """
+    규칙 기반 전략과 행동 계획을 상태에 적용 (strategy_info 가 주어지면 해당 전략 사용)
+    """
+    current_character = next(c for c in state.characters if c.id == state.current_character_id)
+    opponents = [c for c in state.characters if c.type != current_character.type and c.hp > 0]
+    environment = battle_environment(state)
+    battle_map = map_registry.get(state.map_id) if state.map_id else None
+    scores = score_actions(current_character, opponents, environment=environment, battle_map=battle_map)
+
+    strategy_info = strategy_info or decide_rule_strategy(current_character, scores)
+    state.strategy_info = strategy_info
+    state.strategy = f"{strategy_info.type}, {strategy_info.reason}"
+
+    target = select_default_target(state, current_character, opponents, scores) or current_character
+    occupied = {c.position for c in state.characters if c.id != current_character.id}
+    flee = strategy_info.type in FLEE_STRATEGIES and target.id != current_character.id
+    safe_tiles = None
+    if flee:
+        allies = [
+            c for c in state.characters
+            if c.type == current_character.type and c.id != current_character.id and c.hp > 0
+        ]
+        safe_tiles = [pos for pos, _ in threat_map(opponents, environment).safe_tiles(
+            current_character, allies, occupied, battle_map=battle_map
+        )]
+    action_plan = create_rule_based_plan(current_character, target, occupied, flee=flee, safe_tiles=safe_tiles,
+                                         environment=environment, battle_map=battle_map)
+    return update_state_with_action_plan(state, action_plan, target.id)
+
+def decide_rule_based(state: LangGraphBattleState) -> LangGraphBattleState:
+    """
+    규칙 기반 결정 노드 (rule 티어): LLM 호출 없이 전략과 행동 결정
+    """
+    logger.debug("[규칙 기반 결정 노드] 시작")
+    state = apply_rule_decision(state)
+    if state.trace:
+        state.trace.insert(1, f"전략 결정 (규칙): {state.strategy}")
+    return state
+
+async def decide_fused(state: LangGraphBattleState) -> LangGraphBattleState:
+    """
+    통합 결정 노드 (fused 티어): 전략, 행동 계획, 대사를 한 번의 LLM 호출로 결정
+    """
+    logger.debug("[통합 결정 노드] 시작")
+    current_character = next(c for c in state.characters if c.id == state.current_character_id)
+    opponents = [c for c in state.characters if c.type != current_character.type and c.hp > 0]
+    environment = battle_environment(state)
+    battle_map = map_registry.get(state.map_id) if state.map_id else None
+    scores = score_actions(current_character, opponents, environment=environment, battle_map=battle_map)
+    target = select_default_target(state, current_character, opponents, scores) or current_character
+
+    timeout = node_timeout(state, "plan")
+    if timeout == 0:
+        logger.info("[통합 결정 노드] 제한 시간 부족 - 규칙 기반 행동 사용")
+        degrade(state, "rule_based")
+        return apply_rule_decision(state)
+
+    # 타겟/추천 행동/안전 타일 정보
+    targets_info = "".join(
+        f"\n- {c.name} (ID: {c.id}, 위치: {c.position}, HP: {c.hp})" for c in opponents
+    )
+    recommended_actions = "".join(
+        f"\n- {skill} → {t.name} (ID: {t.id}): 예상 피해 {damage:.1f}, 처치 확률 {kill:.0%}"
+        for skill, t, damage, kill in scores.top_actions()
+    )
+    allies = [
+        c for c in state.characters
+        if c.type == current_character.type and c.id != current_character.id and c.hp > 0
+    ]
+    occupied = {c.position for c in state.characters if c.id != current_character.id}
+    safe_tiles = threat_map(opponents, environment).safe_tiles(current_character, allies, occupied,
+                                                               battle_map=battle_map)
+    safe_tiles_info = "".join(f"\n- {pos}: 위협 {threat:.1f}" for pos, threat in safe_tiles)
+
+    prompt = create_action_plan_prompt(
+        character_name=current_character.name,
+        character_type=current_character.type,
+        position=current_character.position,
+        hp=current_character.hp,
+        ap=current_character.ap,
+        mov=environment.movement(current_character.mov),
+        strategy="직접 선택",
+        target_id=target.id,
+        target_position=target.position,
+        current_distance=calculate_manhattan_distance(current_character.position, target.position),
+        skill_descriptions=prepare_skill_descriptions(current_character, current_character.position, target.position,
+                                                      scores=scores, target_id=target.id,
+                                                      environment=environment, battle_map=battle_map),
+        prompt=FUSED_PLAN_PROMPT,
+        character_traits=', '.join(current_character.traits) or '없음',
+        status_effects=', '.join(current_character.status_effects) or '없음',
+        terrain=state.terrain or '정보 없음',
+        weather=state.weather or '정보 없음',
+        environment=environment.describe(),
+        battle_summary=state.battle_summary,
+        targets_info=targets_info,
+        recommended_actions=recommended_actions or ' 없음',
+        safe_tiles=safe_tiles_info or ' 없음'
+    )
+
+    try:
+        response = await asyncio.wait_for(
+            llm_gateway.chat("plan", prompt, model=COMBAT_MODEL, temperature=0.5),
+            timeout
+        )
+        logger.debug("LLM 응답 [통합 결정]: %s", response)
+        decision = output_parser(FusedDecision).parse(response)
+    except CircuitOpenError:
+        raise
+    except asyncio.TimeoutError:
+        logger.info("[통합 결정 노드] 제한 시간 초과 - 규칙 기반 행동 사용")
+        degrade(state, "rule_based")
+        return apply_rule_decision(state)
+    except Exception as e:
+        logger.warning("[통합 결정 노드] LLM 호출 또는 파싱 실패: %s", e)
+        degrade(state, "rule_based")
+        return apply_rule_decision(state)
+
+    strategy_info = decision.strategy
+    # 체력이 충분한데 도주 전략을 선택한 경우 공격 전략으로 변경
+    if strategy_info.type in FLEE_STRATEGIES and current_character.hp > 50:
+        strategy_info = Strategy(type="공격 우선", reason="체력이 충분하여 공격 전략으로 자동 변경 (체력 50 초과)")
+    state.strategy_info = strategy_info
+    state.strategy = f"{strategy_info.type}, {strategy_info.reason}"
+
+    dialogue = decision.action_plan.dialogue
+    action_plan = validate_action_plan(decision.action_plan, current_character, current_character.position)
+    action_plan.dialogue = dialogue
+    state.dialogue = dialogue
+    state = update_state_with_action_plan(state, action_plan, action_plan.target_character_id or target.id)
+    if state.trace:
+        state.trace.insert(1, f"전략 결정 (통합): {state.strategy}")
+    return state
+
+def tactical_search(state: LangGraphBattleState) -> LangGraphBattleState:
+    """
+    전술 탐색 노드 (tactical 티어): 가능한 모든 (이동, 스킬, 타겟) 조합을 평가해
+    LLM 행동 계획보다 확실히 나은 조합이 있거나 LLM 계획이 불가능하면 교체
+    """
+    logger.debug("[전술 탐색 노드] 시작")
+    if not state.action_plan:
+        return state
+
+    current_character = next(c for c in state.characters if c.id == state.current_character_id)
+    opponents = [c for c in state.characters if c.type != current_character.type and c.hp > 0]
+    environment = battle_environment(state)
+    battle_map = map_registry.get(state.map_id) if state.map_id else None
+    occupied = {c.position for c in state.characters if c.id != current_character.id}
+    flee = bool(state.strategy_info and state.strategy_info.type in FLEE_STRATEGIES)
+
+    search = TacticalSearch(current_character, opponents, occupied, threat_map(opponents, environment),
+                            environment=environment, battle_map=battle_map)
+    best = search.best(flee=flee)
+    current_value = search.evaluate(state.action_plan, flee=flee)
+    if best is None or best.value < current_value + SEARCH_MARGIN:
+        if state.trace:
+            state.trace.append("전술 탐색: 기존 계획 유지")
+        return state
+
+    action_plan = ActionPlan(
+        move_to=best.move_to,
+        skill=best.skill,
+        target_character_id=best.target_id or current_character.id,
+        reason=f"전술 탐색: {best.skill or '이동'} (평가 {best.value:.1f}, 기존 {current_value:.1f})",
+        remaining_ap=current_character.ap,
+        remaining_mov=current_character.mov
+    )
+    action_plan = validate_action_plan(action_plan, current_character, current_character.position)
+    state.action_plan = action_plan
+    state.target_character_id = action_plan.target_character_id
+    if state.trace:
+        state.trace.append(f"전술 탐색: {action_plan.skill} -> {action_plan.target_character_id}")
+    return state
+
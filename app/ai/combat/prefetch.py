@@ -0,0 +1,127 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from app.ai.combat.shedding import load_controller
+from app.models.combat import BattleState, BattleActionResponse
+from app.utils.combat import calculate_manhattan_distance
+from app.utils.metrics import CACHE_REQUESTS
+
+# 예측 상태와 실제 상태를 같은 상황으로 볼 허용 오차
+POSITION_TOLERANCE = 1      # 행동하지 않은 캐릭터의 위치 차이 (맨해튼 거리)
+HP_TOLERANCE = 0.2          # HP 상대 오차
+
+
+def states_match(predicted: BattleState, actual: BattleState) -> bool:
+    """실제 요청 상태가 예측 상태와 충분히 가까운지 판단"""
+    if predicted.current_character_id != actual.current_character_id:
+        return False
+
+    predicted_map = {c.id: c for c in predicted.characters if c.hp > 0}
+    actual_map = {c.id: c for c in actual.characters if c.hp > 0}
+    if predicted_map.keys() != actual_map.keys():
+        return False
+
+    for char_id, actual_char in actual_map.items():
+        predicted_char = predicted_map[char_id]
+        if char_id == actual.current_character_id:
+            # 행동할 캐릭터는 위치와 자원이 정확히 일치해야 함
+            if (tuple(predicted_char.position) != tuple(actual_char.position)
+                    or predicted_char.ap != actual_char.ap
+                    or predicted_char.mov != actual_char.mov
+                    or set(predicted_char.status_effects) != set(actual_char.status_effects)):
+                return False
+            continue
+
+        if calculate_manhattan_distance(predicted_char.position, actual_char.position) > POSITION_TOLERANCE:
+            return False
+        base_hp = max(abs(predicted_char.hp), 1)
+        if abs(predicted_char.hp - actual_char.hp) / base_hp > HP_TOLERANCE:
+            return False
+
+    return True
+
+
+class DecisionPrefetcher:
+    """다음 몬스터 행동을 미리 계산해두는 추측 실행기 (전투 시작 시 prefetch 옵션으로 활성화)
+
+    행동 결정 직후 결과(이동, 예상 피해, 상태 효과)를 상태 사본에 적용하고,
+    행동 순서 스케줄러가 예측한 다음 캐릭터가 몬스터라면 백그라운드에서 행동을 미리 결정합니다.
+    다음 요청이 예측과 충분히 가까우면 미리 계산한 결과를 반환합니다.
+    """
+
+    def __init__(self, combat_ai):
+        self.combat_ai = combat_ai
+        self.predicted: Optional[BattleState] = None
+        self.task: Optional[asyncio.Task] = None
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.shed = 0
+
+    def schedule(self, state: BattleState, response: BattleActionResponse, upcoming_actors: List[str]) -> None:
+        """방금 반환한 행동을 기반으로 다음 캐릭터의 행동을 백그라운드에서 미리 결정"""
+        self.discard()
+        if not upcoming_actors:
+            return
+
+        # 결정된 행동을 적용한 다음 턴 예측 상태 (예상 피해와 상태 효과 포함, 쓰러진 캐릭터는 순서에서 제외)
+        predicted = self.combat_ai.resolve(state, response, upcoming_actors).resulting_state
+        next_config = self.combat_ai.config_map.get(predicted.current_character_id)
+        if not next_config or next_config.type != "monster":
+            return
+        # 부하 단계가 올라가 있으면 추측 실행부터 생략
+        if load_controller.mode != "full":
+            self.shed += 1
+            return
+
+        self.predicted = predicted
+        # 미리 계산한 결과는 실제로 사용될 때 전투 로그, 전략 캐시, 타겟 배정에 반영
+        self.task = asyncio.create_task(
+            self.combat_ai.get_character_action(self.predicted, commit_log=False)
+        )
+        self.started += 1
+
+    async def take(self, state: BattleState) -> Optional[BattleActionResponse]:
+        """요청 상태가 예측과 일치하면 미리 계산한 결과 반환, 아니면 None"""
+        if self.task is None:
+            return None
+
+        if not states_match(self.predicted, state):
+            self.misses += 1
+            CACHE_REQUESTS.labels("prefetch", "miss").inc()
+            self.discard()
+            return None
+
+        task = self.task
+        self.task = None
+        self.predicted = None
+        try:
+            response = await task
+        except Exception:
+            self.wasted += 1
+            return None
+
+        self.hits += 1
+        CACHE_REQUESTS.labels("prefetch", "hit").inc()
+        self.combat_ai.commit_speculation(state, response)
+        return response
+
+    def discard(self) -> None:
+        """사용하지 않을 추측 실행 취소"""
+        if self.task is not None:
+            self.task.cancel()
+            self.wasted += 1
+        self.task = None
+        self.predicted = None
+
+    def metrics(self) -> Dict[str, Any]:
+        checked = self.hits + self.misses
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "wasted": self.wasted,
+            "shed": self.shed,
+            "hit_rate": round(self.hits / checked, 3) if checked else 0.0,
+        }
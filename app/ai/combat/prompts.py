@@ -0,0 +1,185 @@
+from app.ai.prompts import compile_prompt, KEEP_HEAD, KEEP_TAIL
+from app.ai.combat.states import ActionPlan, Strategy, FusedDecision
+
+# 전투 노드 프롬프트 (모듈 로드 시 한 번만 컴파일)
+# - prefix: 규칙/형식 지시문 등 고정 부분 (system 메시지, 제공자 프롬프트 캐시 대상)
+# - template: 캐릭터/타겟 등 매 턴 바뀌는 값 (user 메시지)
+# optional 섹션은 COMBAT_PROMPT_TOKEN_BUDGET 을 넘으면 나열 순서대로 줄어듭니다.
+
+STRATEGY_OPTIONS = """1. 공격 우선 (근접한 적에게 최대 피해)
+2. 처치 우선 (가장 약한 적에게 최대 피해)
+3. 방어 우선 (회피 및 생존 중심)
+4. 지원 우선 (아군 지원에 집중)
+5. 도망 우선 (안전한 위치로 후퇴) - 체력이 50% 이하일 때만 고려"""
+
+STRATEGY_PROMPT = compile_prompt(
+    """당신은 '{character_name}'이라는 {character_type} 캐릭터입니다.
+캐릭터 특성: {character_traits}
+현재 HP: {hp}, AP: {ap}, MOV: {mov}
+상태 이상: {status_effects}
+
+전투 환경:
+- 지형: {terrain}
+- 날씨: {weather}
+
+전투 상황:
+{battle_summary}""",
+    prefix="""당신은 판타지 전투의 캐릭터로서 이번 턴의 행동 전략을 결정합니다.
+캐릭터 정보와 전투 상황을 보고 다음 중 하나의 전략을 선택하고 그 이유를 간략히 설명하세요:
+""" + STRATEGY_OPTIONS + """
+
+{format_instructions}""",
+    output_model=Strategy,
+    optional={"battle_summary": KEEP_TAIL},
+    name="strategy",
+)
+
+# 행동 계획 프롬프트 공통 규칙 (고정 부분 앞쪽)
+ACTION_PLAN_RULES = """당신은 판타지 전투의 캐릭터로서 이번 턴의 이동 위치와 사용할 스킬을 결정합니다.
+
+이동 규칙:
+- 이동은 한 턴에 최대 MOV값 만큼 가능합니다.
+- 이동 시 반드시 현재 MOV 이하의 거리(맨해튼 거리)만 이동 가능합니다.
+- 목표로 이동이 불가능한 경우 목표와 최대한 가까운 위치로 이동합니다.
+- 스킬 사용 시 스킬 범위 내에 타겟이 있어야 합니다."""
+
+# 행동 계획 프롬프트 공통 값 부분 ({node_info} 자리에 노드별 타겟/위협 정보가 들어감)
+ACTION_PLAN_TEMPLATE = """캐릭터: {character_name} ({character_type})
+위치: {position}
+자원: HP {hp}, AP {ap}, MOV {mov}
+
+전략: {strategy}
+
+현재 타겟 ID: {target_id}
+현재 타겟까지의 거리: {current_distance}
+
+이동 관련 중요 정보:
+- 현재 이동력(MOV): {mov}
+- 현재 위치: {position}
+- 타겟 위치: {target_position}
+- 맨해튼 거리: {current_distance}
+- 이동 가능 여부: {movable}
+
+사용 가능한 스킬 정보:
+{skill_descriptions}
+
+{node_info}"""
+
+ATTACK_PLAN_PROMPT = compile_prompt(
+    ACTION_PLAN_TEMPLATE.replace("{node_info}", """{environment}
+
+타겟 정보:
+{target_info}{additional_targets}{recommended_actions}"""),
+    prefix=ACTION_PLAN_RULES + """
+
+현재 위치에서 주요 타겟을 향해 어떻게 움직이고, 어떤 공격 스킬을 사용할지 결정하세요.
+공격적인 접근과 최대 데미지를 주는 방법을 선택하세요.
+
+{format_instructions}""",
+    output_model=ActionPlan,
+    optional={"additional_targets": KEEP_HEAD},
+    name="plan_attack",
+)
+
+FLEE_PLAN_PROMPT = compile_prompt(
+    ACTION_PLAN_TEMPLATE.replace("{node_info}", """{environment}
+
+위협 정보:
+{threat_info}{additional_threats}{safe_tiles}"""),
+    prefix=ACTION_PLAN_RULES + """
+
+현재 위치에서 주요 위협과 추가 위협으로부터 멀어지고, 안전하게 대피할 방법을 결정하세요.
+방어 또는 회피 스킬을 사용하거나, 안전한 이동 후보 중 하나로 후퇴하는 것을 우선시하세요.
+타겟과의 거리를 최대한 늘리고 생존에 집중하세요.
+
+{format_instructions}""",
+    output_model=ActionPlan,
+    optional={"additional_threats": KEEP_HEAD},
+    name="plan_flee",
+)
+
+FUSED_PLAN_PROMPT = compile_prompt(
+    ACTION_PLAN_TEMPLATE.replace("{node_info}", """캐릭터 특성: {character_traits}
+상태 이상: {status_effects}
+전투 환경: 지형 {terrain}, 날씨 {weather}
+{environment}
+전투 상황: {battle_summary}
+
+적 정보:{targets_info}
+추천 행동:{recommended_actions}
+안전한 이동 후보:{safe_tiles}"""),
+    prefix=ACTION_PLAN_RULES + """
+
+다음 중 하나의 전략을 선택하고, 그 전략에 맞는 행동 계획과 캐릭터 성격이 드러나는 짧은 대사(action_plan.dialogue)를 함께 결정하세요:
+""" + STRATEGY_OPTIONS + """
+
+{format_instructions}""",
+    output_model=FusedDecision,
+    optional={"battle_summary": KEEP_TAIL},
+    name="fused",
+)
+
+# 대사 생성 few-shot 예제 (FewShotPromptTemplate 대신 한 번만 이어 붙여 고정 부분에 포함)
+DIALOGUE_EXAMPLES = [
+    {
+        'name': '골렘',
+        'traits': '냉정함, 강인함',
+        'strategy': '전투 태세를 유지하며 침착하게 대응하는 것이 적합하며, 냉정하고 신중한 성격으로 인해 무리하지 않고 질서를 유지하려는 판단을 내립니다.',
+        'skill': '타격',
+        'dialogue': '위반 감지. 대응 절차 개시.'
+    },
+    {
+        'name': '앤트',
+        'traits': '신중함',
+        'strategy': '신중한 성격으로 인해 자연의 힘을 활용하여 전장의 균형을 맞추려는 판단을 내립니다.',
+        'skill': '대지 가르기',
+        'dialogue': '땅이.. 너희를 기억하지 않기를 바란다..'
+    },
+    {
+        'name': '리자드맨',
+        'traits': '충동적, 잔인함',
+        'strategy': '적에게 망설임 없이 공격을 감행하는 것이 효과적이며, 충동적인 성격 때문에 즉각적이고 강력한 공격으로 적을 빠르게 제압하는 것이 적합하다고 판단됩니다.',
+        'skill': '날카로운 발톱',
+        'dialogue': '사람 피.. 더! 씹어..! 찢어..!'
+    }
+]
+
+DIALOGUE_EXAMPLE_TEMPLATE = """캐릭터: {name}
+특성: {traits}
+전략: {strategy}
+스킬: {skill}
+대사: {dialogue}"""
+
+DIALOGUE_PREFIX = """당신은 판타지 게임 세계관의 캐릭터 대사를 생성하는 AI입니다.
+주어진 캐릭터 정보와 상황에 적합한 한 줄의 대사를 생성해 주세요.
+
+###지시사항:
+1. 캐릭터의 특성과 종족에 따른 독특한 말투 사용
+2. 짧지만 강렬하고 기억에 남는 대사 작성
+3. 현재 HP와 전투 상황에 맞는 감정 표현
+4. 사용하는 스킬의 특성이 대사에 반영되도록 함
+5. 판타지 세계관에 맞는 고어체나 특수한 표현 사용
+
+###각 몬스터 유형별 말투 특징:
+- 골렘: 기계적, 단조로운 어조, 짧은 문장, 1인칭 사용 희박
+- 앤트: 느리고 묵직한 말투, 자연과 생명 언급 잦음, 의인화된 자연체 느낌, 호흡 길고 문장 완성도 높음
+- 리자드맨: 짧고 끊어지는 말투, 'ㅅ', 'ㅆ' 발음 강조, 육식동물 같은 표현
+- 고블린: 거친 말투, 비문법적 표현, 3인칭으로 자신 지칭
+
+###예시:"""
+
+DIALOGUE_PROMPT = compile_prompt(
+    """아래 정보를 바탕으로 판타지 RPG 세계관의 {character_name}의 성격을 최대한 반영하여 상황에 어울리는 짧은 대사를 한 문장으로 작성하세요:
+캐릭터: {character_name}
+특성: {character_traits}
+전략: {strategy}
+스킬: {skill_name}
+대사:
+""",
+    # 예제는 중괄호가 없는 고정 문자열이므로 미리 채워서 고정 부분에 포함
+    prefix="\n\n".join(
+        [DIALOGUE_PREFIX]
+        + [DIALOGUE_EXAMPLE_TEMPLATE.format_map(example) for example in DIALOGUE_EXAMPLES]
+    ),
+    name="dialogue",
+)
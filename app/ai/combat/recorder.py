@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import ormsgpack
+
+from app.utils.appender import BufferedAppender
+
+# 파일 시작 표식과 레코드 길이 헤더 (4바이트 little-endian 부호 없는 정수)
+TRACE_MAGIC = b"CTRACE1\n"
+LENGTH_HEADER = struct.Struct("<I")
+
+# 이만큼 레코드가 쌓이거나 시간이 지나면 파일에 쓰고 fsync
+FLUSH_EVERY = 32
+FLUSH_INTERVAL = 1.0
+
+# 파일 하나의 최대 크기 (넘으면 새 파일로 교체)
+MAX_FILE_BYTES = 64 * 1024 * 1024
+
+
+class DecisionRecorder:
+    """전투 행동 결정 기록기 (길이 헤더 + msgpack 레코드를 추가만 하는 바이너리 로그)
+
+    - record() 는 직렬화해 BufferedAppender 버퍼에 넣기만 하고 바로 반환합니다.
+    - 버퍼가 FLUSH_EVERY 개 이상이거나 FLUSH_INTERVAL 초가 지나면 쓰기 스레드가 한 번에 쓰고 fsync 합니다.
+    - 워커(프로세스)마다 별도 파일에 기록하므로 잠금 없이 추가할 수 있습니다.
+    """
+
+    def __init__(self, directory: str, prefix: str = "combat",
+                 flush_every: int = FLUSH_EVERY, flush_interval: float = FLUSH_INTERVAL,
+                 max_file_bytes: int = MAX_FILE_BYTES):
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.max_file_bytes = max_file_bytes
+        self._appender = BufferedAppender(self._write, flush_every, flush_interval, name="decision_recorder")
+        self._file = None
+        self._file_bytes = 0
+        self._sequence = 0
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """레코드 추가 (파일 쓰기는 쓰기 스레드에서 수행)"""
+        payload = ormsgpack.packb(entry, option=ormsgpack.OPT_NON_STR_KEYS | ormsgpack.OPT_SERIALIZE_PYDANTIC)
+        self._appender.append(LENGTH_HEADER.pack(len(payload)) + payload)
+
+    def flush(self) -> None:
+        """버퍼의 레코드를 파일에 쓰고 fsync"""
+        self._appender.flush()
+
+    def _write(self, chunks: List[bytes]) -> None:
+        data = b"".join(chunks)
+        if self._file is None or self._file_bytes + len(data) > self.max_file_bytes:
+            self._open_next_file()
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file_bytes += len(data)
+
+    def _open_next_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        name = f"{self.prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._sequence}.trace"
+        self._file = open(self.directory / name, "ab")
+        self._file.write(TRACE_MAGIC)
+        self._file_bytes = len(TRACE_MAGIC)
+
+    def close(self) -> None:
+        self._appender.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return self._appender.metrics()
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """기록 파일을 한 레코드씩 읽기 (파일 전체를 메모리에 올리지 않음)
+
+    마지막 레코드가 중간에 잘려 있으면(쓰기 도중 종료) 그 앞까지만 반환합니다.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f"전투 기록 파일이 아닙니다: {path}")
+        while True:
+            header = f.read(LENGTH_HEADER.size)
+            if len(header) < LENGTH_HEADER.size:
+                return
+            (length,) = LENGTH_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield ormsgpack.unpackb(payload)
+
+
+def iter_trace_files(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    """파일 또는 디렉터리(안의 *.trace 파일) 목록의 레코드를 순서대로 읽기"""
+    for path in paths:
+        target = Path(path)
+        files = sorted(target.glob("*.trace")) if target.is_dir() else [target]
+        for file in files:
+            yield from iter_records(str(file))
+
+
+def _summary(record: Dict[str, Any]) -> Dict[str, Any]:
+    action = record.get("action") or {}
+    tokens = record.get("tokens") or {}
+    return {
+        "ts": record.get("ts"),
+        "character_id": record.get("character_id"),
+        "tier": record.get("tier"),
+        "degradation": record.get("degradation"),
+        "latency_ms": record.get("latency_ms"),
+        "skill": action.get("skill"),
+        "target": action.get("target_character_id"),
+        "move_to": action.get("move_to"),
+        "tokens": tokens.get("prompt_tokens", 0) + tokens.get("completion_tokens", 0),
+        "cached_tokens": tokens.get("cached_tokens", 0),
+        "node_timings": record.get("node_timings"),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """기록 파일을 JSON Lines 로 출력
+
+    python -m app.ai.combat.recorder <파일 또는 디렉터리>... [--full]
+    """
+    parser = argparse.ArgumentParser(description="전투 행동 결정 기록 파일 읽기")
+    parser.add_argument("paths", nargs="+", help="*.trace 파일 또는 디렉터리")
+    parser.add_argument("--full", action="store_true", help="입력 상태와 LLM 응답까지 모두 출력")
+    args = parser.parse_args(argv)
+
+    for record in iter_trace_files(args.paths):
+        output = record if args.full else _summary(record)
+        sys.stdout.write(json.dumps(output, ensure_ascii=False, default=str) + "\n")
+
+
+if __name__ == "__main__":
+    main()
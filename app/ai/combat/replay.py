@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextvars import ContextVar
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from app.ai.combat import CombatAI
+from app.ai.combat.graph import AI_TIERS
+from app.ai.combat.nodes import apply_rule_decision
+from app.ai.combat.recorder import iter_trace_files
+from app.ai.combat.resolver import action_violations
+from app.ai.combat.shedding import load_controller
+from app.ai.gateway import llm_gateway
+from app.models.combat import BattleState, CharacterConfig
+from app.utils.battle_map import map_registry
+
+# LLM 응답 방식
+# - stub: 규칙 기반 결정을 LLM 응답 형식으로 돌려주는 결정적 응답
+# - recorded: 기록된 LLM 응답을 호출 순서대로 재생 (부족하면 stub 응답)
+LLM_MODES = ["stub", "recorded"]
+
+# 프로세스 하나에 한 번에 넘기는 레코드 수
+CHUNK_SIZE = 16
+
+# 프로세스당 동시에 제출해두는 묶음 수 (기록 파일을 끝까지 메모리에 올리지 않도록 제한)
+PENDING_PER_WORKER = 2
+
+# stub 대사
+STUB_DIALOGUE = "..."
+
+# 현재 재생 중인 레코드의 LLM 응답 (태스크마다 별도)
+_replay_responses: ContextVar[Optional[Dict[str, Any]]] = ContextVar("replay_responses", default=None)
+
+
+def actions_agree(action: Dict[str, Any], baseline: Dict[str, Any]) -> bool:
+    """스킬, 대상, 이동 위치가 모두 같으면 일치"""
+    return (action.get("skill") == baseline.get("skill")
+            and action.get("target_character_id") == baseline.get("target_character_id")
+            and list(action.get("move_to") or []) == list(baseline.get("move_to") or []))
+
+
+class _CaptureRecorder:
+    """CombatAI 의 기록 레코드를 메모리에 받아두는 기록기"""
+
+    def __init__(self):
+        self.entry: Optional[Dict[str, Any]] = None
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        self.entry = entry
+
+
+def _stub_responses(ai: CombatAI, battle_state: BattleState) -> Dict[str, Any]:
+    """규칙 기반 결정으로 만든 기능별 LLM 응답"""
+    state = apply_rule_decision(ai._build_langgraph_state(battle_state, ai.battle_log))
+    strategy = state.strategy_info.model_dump(mode="json")
+    action_plan = state.action_plan.model_dump(mode="json")
+    return {
+        "strategy": json.dumps(strategy, ensure_ascii=False),
+        "plan": json.dumps(action_plan, ensure_ascii=False),
+        "fused": json.dumps({"strategy": strategy, "action_plan": {**action_plan, "dialogue": STUB_DIALOGUE}},
+                            ensure_ascii=False),
+        "dialogue": STUB_DIALOGUE,
+    }
+
+
+async def _replay_chat(feature: str, prompt: Any, **kwargs: Any) -> str:
+    """llm_gateway.chat 대체: 기록된 응답 → stub 응답 순으로 반환"""
+    responses = _replay_responses.get()
+    latency = responses["latency"]
+    if latency:
+        await asyncio.sleep(latency)
+
+    recorded = responses["recorded"].get(feature)
+    if recorded:
+        return recorded.popleft()
+    stub = responses["stub"]
+    # 통합 결정(fused) 프롬프트는 전략과 행동 계획을 함께 요구
+    if feature == "plan" and '"action_plan"' in str(prompt):
+        return stub["fused"]
+    return stub.get(feature, STUB_DIALOGUE)
+
+
+def _init_worker() -> None:
+    """재생 프로세스 초기화: LLM 호출을 재생 응답으로 대체하고 노드 로그 출력 억제"""
+    llm_gateway.chat = _replay_chat
+    # 재생 결과가 재생 프로세스의 부하에 따라 달라지지 않도록 부하 단계 고정 (항상 full)
+    load_controller.target_p95 = 0
+    # 노드 로그는 logging 으로 출력되므로 전투 AI 로거 수준을 올려 레코드마다 찍히는 로그 억제
+    logging.getLogger("app.ai.combat").setLevel(logging.WARNING)
+
+
+async def _replay_record(record: Dict[str, Any], tier: str, mode: str, latency: float) -> Dict[str, Any]:
+    # 캐릭터별 티어 설정은 무시하고 모든 캐릭터를 재생 티어로 결정
+    configs = {
+        char_id: CharacterConfig(**{**config, "ai_tier": None})
+        for char_id, config in record["configs"].items()
+    }
+    battle_state = BattleState(**record["state"])
+    map_id = record.get("map_id")
+    recorder = _CaptureRecorder()
+    ai = CombatAI(configs, record.get("terrain", ""), record.get("weather", ""),
+                  map_id=map_id, ai_tier=tier, recorder=recorder)
+
+    recorded = defaultdict(deque)
+    if mode == "recorded":
+        for call in (record.get("tokens") or {}).get("calls", []):
+            recorded[call["feature"]].append(call["output"])
+    _replay_responses.set({
+        "stub": _stub_responses(ai, battle_state),
+        "recorded": recorded,
+        "latency": latency,
+    })
+
+    response = await ai.get_character_action(battle_state, commit_log=False)
+    entry = recorder.entry or {}
+    environment = ai.environment
+    battle_map = map_registry.get(map_id) if map_id else None
+    return {
+        "latency_ms": entry.get("latency_ms", 0.0),
+        "node_timings": entry.get("node_timings", {}),
+        "degradation": response.degradation,
+        "action": response.action.model_dump(mode="json"),
+        "violations": action_violations(battle_state, configs, response.action, environment, battle_map),
+    }
+
+
+def _replay_chunk(records: List[Dict[str, Any]], tier: str, mode: str, latency: float) -> List[Dict[str, Any]]:
+    """프로세스에서 레코드 묶음 재생 (레코드 간 상태 공유 없음)"""
+    async def run():
+        return [await _replay_record(record, tier, mode, latency) for record in records]
+    return asyncio.run(run())
+
+
+def _chunks(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"count": len(values), "mean": round(float(np.mean(values)), 2),
+            "p50": round(float(p50), 2), "p95": round(float(p95), 2), "p99": round(float(p99), 2)}
+
+
+def replay(paths: List[str], tier: str, mode: str = "stub", baseline_tier: Optional[str] = None,
+           workers: int = os.cpu_count() or 1, latency: float = 0.0, limit: Optional[int] = None,
+           chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """기록된 전투 상태를 tier 파이프라인으로 재생해 지연 시간, 합법률, 기준 행동과의 일치율 집계
+
+    기준 행동은 기록된 행동이며, baseline_tier 가 주어지면 같은 방식으로 재생한 해당 티어의 행동입니다.
+    추측 실행 레코드는 게임이 만든 상태가 아니라 예측한 상태이므로 제외합니다.
+    레코드는 스트리밍으로 읽고, 프로세스당 PENDING_PER_WORKER 개 묶음까지만 제출해 둔 채 결과를 소비합니다.
+    """
+    records = islice(
+        (r for r in iter_trace_files(paths) if r.get("configs") and not r.get("speculative")),
+        limit
+    )
+    latency_ms: List[float] = []
+    node_timings: Dict[str, List[float]] = defaultdict(list)
+    degradation: Counter = Counter()
+    violations: Counter = Counter()
+    legal = agree = total = 0
+
+    def consume(chunk, job, baseline_job) -> None:
+        nonlocal legal, agree, total
+        results = job.result()
+        baselines = (
+            [b["action"] for b in baseline_job.result()] if baseline_job
+            else [r["action"] for r in chunk]
+        )
+        for result, baseline_action in zip(results, baselines):
+            total += 1
+            latency_ms.append(result["latency_ms"])
+            for name, ms in result["node_timings"].items():
+                node_timings[name].append(ms)
+            degradation[result["degradation"]] += 1
+            if result["violations"]:
+                violations.update(v.split(" ")[0] for v in result["violations"])
+            else:
+                legal += 1
+            agree += actions_agree(result["action"], baseline_action)
+
+    workers = max(1, workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for chunk in _chunks(records, chunk_size):
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                consume(*pending.popleft())
+            baseline = (pool.submit(_replay_chunk, chunk, baseline_tier, mode, latency)
+                        if baseline_tier else None)
+            pending.append((chunk, pool.submit(_replay_chunk, chunk, tier, mode, latency), baseline))
+
+        while pending:
+            consume(*pending.popleft())
+
+    return {
+        "tier": tier,
+        "llm": mode,
+        "baseline": baseline_tier or "recorded",
+        "records": total,
+        "latency_ms": _percentiles(latency_ms),
+        "node_latency_ms": {name: _percentiles(values) for name, values in node_timings.items()},
+        "legality_rate": round(legal / total, 4) if total else None,
+        "violations": dict(violations),
+        "agreement_rate": round(agree / total, 4) if total else None,
+        "degradation": dict(degradation),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """기록 파일을 재생해 결과를 JSON 으로 출력
+
+    python -m app.ai.combat.replay <파일 또는 디렉터리>... --tier tactical [--llm recorded] [--baseline full]
+    """
+    parser = argparse.ArgumentParser(description="전투 AI 오프라인 재생 평가")
+    parser.add_argument("paths", nargs="+", help="*.trace 파일 또는 디렉터리")
+    parser.add_argument("--tier", choices=AI_TIERS, default="full", help="재생할 AI 티어")
+    parser.add_argument("--llm", choices=LLM_MODES, default="stub", help="LLM 응답 방식")
+    parser.add_argument("--baseline", choices=AI_TIERS, default=None, help="비교 기준 티어 (없으면 기록된 행동)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="재생 프로세스 수")
+    parser.add_argument("--latency", type=float, default=0.0, help="LLM 호출당 지연 시간(초)")
+    parser.add_argument("--limit", type=int, default=None, help="재생할 최대 레코드 수")
+    args = parser.parse_args(argv)
+
+    report = replay(args.paths, args.tier, args.llm, args.baseline, args.workers, args.latency, args.limit)
+    sys.stdout.write(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional, Tuple
+
+from app.ai.combat.scoring import MIN_DAMAGE, effective_stats
+from app.ai.combat.states import Character
+from app.models.combat import (
+    ActionOutcome, AppliedStatusEffect, BattleActionResponse, BattleState, CharacterAction, CharacterConfig, HpDelta
+)
+from app.utils.battle_map import BattleMap
+from app.utils.combat import calculate_manhattan_distance
+from app.utils.environment import BattleEnvironment
+from app.utils.loader import skill_info_all, status_effects_info_all
+
+# 상태 효과 정보에 지속 시간이 없을 때의 기본 지속 턴 수
+DEFAULT_EFFECT_DURATION = 1
+
+
+def action_violations(state: BattleState, configs: Dict[str, CharacterConfig], action: CharacterAction,
+                      environment: Optional[BattleEnvironment] = None,
+                      battle_map: Optional[BattleMap] = None) -> List[str]:
+    """행동이 규칙을 어긴 항목 목록 (비어 있으면 합법)
+
+    - 이동: MOV(지형/날씨 보정) 이내, 막히지 않은 타일, 다른 생존 캐릭터가 없는 타일
+    - 스킬: 보유 스킬, AP 충분, 살아 있는 대상이 이동한 위치에서 사거리 안
+    """
+    actor = next((c for c in state.characters if c.id == state.current_character_id), None)
+    if actor is None:
+        return ["현재 캐릭터 없음"]
+
+    violations = []
+    move_to = tuple(action.move_to)
+    mov = environment.movement(actor.mov) if environment else actor.mov
+    if battle_map is not None and battle_map.is_walkable(actor.position):
+        distance = battle_map.distance(actor.position, move_to)
+    else:
+        distance = calculate_manhattan_distance(actor.position, move_to)
+    if distance is None or distance > mov:
+        violations.append(f"이동 불가 위치 {move_to}")
+    if any(c.id != actor.id and c.hp > 0 and tuple(c.position) == move_to for c in state.characters):
+        violations.append(f"점유된 위치 {move_to}")
+
+    if action.skill:
+        config = configs.get(actor.id)
+        skill_info = environment.skill_info if environment else skill_info_all
+        if config is not None and action.skill not in config.skills:
+            violations.append(f"보유하지 않은 스킬 {action.skill}")
+        if actor.ap < skill_info.get(action.skill, {}).get("ap", 1):
+            violations.append(f"AP 부족 {action.skill}")
+        target = next((c for c in state.characters if c.id == action.target_character_id), None)
+        if target is None:
+            violations.append(f"대상 없음 {action.target_character_id}")
+        elif target.hp <= 0:
+            violations.append(f"쓰러진 대상 {target.id}")
+        elif calculate_manhattan_distance(move_to, target.position) > skill_info.get(action.skill, {}).get("range", 1):
+            violations.append(f"사거리 밖 대상 {target.id}")
+    return violations
+
+
+def hit_damage(attacker: Character, target: Character, multiplier: float) -> Tuple[float, float, float]:
+    """한 번 명중했을 때의 (일반 피해량, 치명타 피해량, 치명타 확률)
+
+    scoring.score_actions 와 같은 식을 사용합니다: 피해량 = max(1, 공격력 × 스킬 피해 배율 - 타겟 방어력)
+    """
+    attack, _, critical_rate, critical_damage = effective_stats(attacker)
+    _, defense, _, _ = effective_stats(target)
+    damage = max(MIN_DAMAGE, attack * multiplier - defense)
+    return damage, damage * critical_damage, critical_rate
+
+
+def next_actor(state: BattleState, upcoming_actors: Optional[List[str]]) -> str:
+    """upcoming_actors 중 state 에서 살아 있는 첫 캐릭터 (없으면 현재 캐릭터 유지)"""
+    alive = {c.id for c in state.characters if c.hp > 0}
+    return next((char_id for char_id in upcoming_actors or [] if char_id in alive), state.current_character_id)
+
+
+def resolve_action(state: BattleState, response: BattleActionResponse, characters: List[Character],
+                   configs: Dict[str, CharacterConfig], environment: BattleEnvironment,
+                   battle_map: Optional[BattleMap] = None,
+                   upcoming_actors: Optional[List[str]] = None) -> ActionOutcome:
+    """결정된 행동을 상태 사본에 적용한 결과 예측
+
+    - 이동 위치와 남은 AP/MOV 반영
+    - 피해 스킬: 특성/상태 효과를 반영한 공격력/방어력으로 피해량 계산 (결과 상태는 일반 명중 기준)
+    - 스킬의 상태 효과를 대상에게 부여 (이미 걸려 있으면 지속 시간 갱신, 대상이 쓰러지면 부여하지 않음)
+    - 다음 행동 캐릭터와 턴 번호 갱신: 행동 결과를 적용한 뒤 upcoming_actors 중 살아 있는 첫 캐릭터
+      (지속 피해 등 턴 경과 처리는 클라이언트 규칙을 따름)
+
+    규칙을 어긴 행동이면 valid=False 와 위반 항목만 반환하고 턴 번호 외에는 상태를 바꾸지 않습니다.
+    """
+    resulting = state.model_copy(deep=True)
+    resulting.turn = state.turn + 1
+
+    action = response.action
+    violations = action_violations(state, configs, action, environment, battle_map)
+    if violations:
+        resulting.current_character_id = next_actor(resulting, upcoming_actors)
+        return ActionOutcome(valid=False, violations=violations, resulting_state=resulting)
+
+    by_id = {c.id: c for c in resulting.characters}
+    actor = by_id[response.current_character_id]
+    actor.position = tuple(action.move_to)
+    if action.remaining_ap is not None:
+        actor.ap = action.remaining_ap
+    if action.remaining_mov is not None:
+        actor.mov = action.remaining_mov
+
+    outcome = ActionOutcome(valid=True, resulting_state=resulting)
+    if not action.skill:
+        resulting.current_character_id = next_actor(resulting, upcoming_actors)
+        return outcome
+
+    info = environment.skill_info.get(action.skill, {})
+    target = by_id[action.target_character_id]
+    stats = {c.id: c for c in characters}
+
+    multiplier = info.get("dmg_mult", 0)
+    if multiplier > 0 and target.hp > 0:
+        damage, critical, critical_rate = hit_damage(stats[actor.id], stats[target.id], multiplier)
+        outcome.hp_deltas.append(HpDelta(
+            character_id=target.id,
+            source=action.skill,
+            delta=-round(damage),
+            critical_delta=-round(critical),
+            expected_delta=round(-(damage * (1 - critical_rate) + critical * critical_rate) * environment.accuracy, 2),
+            hit_chance=environment.accuracy,
+            critical_chance=critical_rate,
+        ))
+        target.hp = max(0, target.hp - round(damage))
+        if target.hp == 0:
+            outcome.knocked_out.append(target.id)
+
+    if target.hp > 0:
+        for effect in info.get("effects", []):
+            refreshed = effect in target.status_effects
+            if not refreshed:
+                target.status_effects.append(effect)
+            outcome.applied_effects.append(AppliedStatusEffect(
+                character_id=target.id,
+                effect=effect,
+                duration=status_effects_info_all.get(effect, {}).get("duration", DEFAULT_EFFECT_DURATION),
+                refreshed=refreshed,
+            ))
+
+    # 피해를 적용한 뒤 다음 캐릭터 결정 (이번 행동으로 쓰러진 캐릭터는 건너뜀)
+    resulting.current_character_id = next_actor(resulting, upcoming_actors)
+    return outcome
@@ -0,0 +1,142 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.ai.combat.states import Character
+from app.utils.battle_map import BattleMap
+from app.utils.environment import BattleEnvironment
+from app.utils.loader import skill_info_all, traits_info_all, status_effects_info_all
+
+# 최소 피해량 (방어력이 공격력보다 높아도 1 이상의 피해)
+MIN_DAMAGE = 1.0
+
+# 프롬프트에 포함할 최대 후보 수
+MAX_SKILL_CANDIDATES = 3
+MAX_ACTION_CANDIDATES = 3
+
+
+def stat_modifiers(names: Iterable[str], info_map: Dict[str, Dict]) -> Dict[str, float]:
+    """특성/상태 효과 목록의 atk, def, crit 증감 합계"""
+    modifiers = {"atk": 0.0, "def": 0.0, "crit": 0.0}
+    for name in names:
+        stat_cng = info_map.get(name, {}).get("stat_cng", {})
+        for stat in modifiers:
+            modifiers[stat] += stat_cng.get(stat, 0)
+    return modifiers
+
+
+def effective_stats(character: Character) -> Tuple[float, float, float, float]:
+    """특성과 상태 효과를 반영한 (공격력, 방어력, 치명타 확률, 치명타 배율)"""
+    traits = stat_modifiers(character.traits, traits_info_all)
+    effects = stat_modifiers(character.status_effects, status_effects_info_all)
+    attack = character.attack * (1 + traits["atk"]) * (1 + effects["atk"])
+    defense = character.defense * (1 + traits["def"]) * (1 + effects["def"])
+    critical_rate = min(1.0, max(0.0, character.critical_rate + traits["crit"] + effects["crit"]))
+    return max(0.0, attack), max(0.0, defense), critical_rate, character.critical_damage
+
+
+class ActionScores:
+    """(스킬, 타겟) 쌍별 예상 피해량과 이번 턴 처치 확률
+
+    expected_damage, kill_probability 는 [스킬 수 × 타겟 수] 배열이며,
+    AP 부족이나 사거리 밖(이동 후에도 닿지 않음)인 쌍은 0입니다.
+    """
+
+    def __init__(self, skills: List[str], targets: List[Character],
+                 expected_damage: np.ndarray, kill_probability: np.ndarray):
+        self.skills = skills
+        self.targets = targets
+        self.expected_damage = expected_damage
+        self.kill_probability = kill_probability
+
+    def __bool__(self) -> bool:
+        return bool(self.skills) and bool(self.targets) and bool(self.expected_damage.any())
+
+    def best_kill_target(self) -> Character:
+        """처치 확률이 가장 높은 타겟 (같으면 예상 피해량이 큰 타겟)"""
+        kill = self.kill_probability.max(axis=0)
+        damage = self.expected_damage.max(axis=0)
+        index = int(np.lexsort((damage, kill))[-1])
+        return self.targets[index]
+
+    def kill_chance(self, target_id: str) -> float:
+        """특정 타겟의 이번 턴 최대 처치 확률"""
+        index = next((i for i, t in enumerate(self.targets) if t.id == target_id), None)
+        if index is None:
+            return 0.0
+        return float(self.kill_probability[:, index].max())
+
+    def target_damage(self, target_id: str) -> Dict[str, Tuple[float, float]]:
+        """특정 타겟에 대한 스킬별 (예상 피해량, 처치 확률)"""
+        index = next((i for i, t in enumerate(self.targets) if t.id == target_id), None)
+        if index is None:
+            return {}
+        return {
+            skill: (float(self.expected_damage[s, index]), float(self.kill_probability[s, index]))
+            for s, skill in enumerate(self.skills)
+        }
+
+    def top_actions(self, k: int = MAX_ACTION_CANDIDATES) -> List[Tuple[str, Character, float, float]]:
+        """처치 확률, 예상 피해량 순으로 상위 k개 (스킬, 타겟, 예상 피해량, 처치 확률)"""
+        if not self:
+            return []
+        kill = self.kill_probability.ravel()
+        damage = self.expected_damage.ravel()
+        order = np.lexsort((damage, kill))[::-1]
+        actions = []
+        for flat in order[:k]:
+            if damage[flat] <= 0:
+                break
+            s, t = divmod(int(flat), len(self.targets))
+            actions.append((self.skills[s], self.targets[t], float(damage[flat]), float(kill[flat])))
+        return actions
+
+
+def score_actions(attacker: Character, targets: List[Character], require_reach: bool = True,
+                  environment: Optional[BattleEnvironment] = None,
+                  battle_map: Optional[BattleMap] = None) -> ActionScores:
+    """공격자의 모든 공격 스킬 × 타겟 쌍에 대해 예상 피해량과 처치 확률을 한 번에 계산
+
+    - 피해량 = max(1, 공격력 × 스킬 피해 배율 - 타겟 방어력)
+    - 예상 피해량 = 피해량 × (1 + 치명타 확률 × (치명타 배율 - 1))
+    - 처치 확률 = 일반 피해로 처치 가능하면 1, 치명타로만 가능하면 치명타 확률, 아니면 0
+    - require_reach=True 이면 이동(MOV) 후에도 사거리 밖인 쌍은 0으로 처리
+    - environment 가 주어지면 지형/날씨의 이동 비용, 사거리, 명중률 보정을 반영
+    - battle_map 이 주어지면 막힌 타일을 피해 이동 가능한 위치 기준으로 사거리 판정
+    """
+    skills = [s for s in attacker.skills if skill_info_all.get(s, {}).get("dmg_mult", 0) > 0]
+    if not skills or not targets:
+        empty = np.zeros((len(skills), len(targets)))
+        return ActionScores(skills, targets, empty, empty.copy())
+
+    multiplier = np.array([skill_info_all[s]["dmg_mult"] for s in skills], dtype=float)
+    ap_cost = np.array([skill_info_all[s].get("ap", 1) for s in skills], dtype=float)
+    skill_info = environment.skill_info if environment else skill_info_all
+    skill_range = np.array([skill_info[s].get("range", 1) for s in skills], dtype=float)
+    accuracy = environment.accuracy if environment else 1.0
+    mov = environment.movement(attacker.mov) if environment else attacker.mov
+
+    attack, _, critical_rate, critical_damage = effective_stats(attacker)
+    target_stats = [effective_stats(t) for t in targets]
+    defense = np.array([stats[1] for stats in target_stats], dtype=float)
+    hp = np.array([t.hp for t in targets], dtype=float)
+
+    base = np.maximum(MIN_DAMAGE, attack * multiplier[:, None] - defense[None, :])
+    critical = base * critical_damage
+    expected = (base * (1 - critical_rate) + critical * critical_rate) * accuracy
+    kill = np.where(base >= hp[None, :], 1.0, np.where(critical >= hp[None, :], critical_rate, 0.0)) * accuracy
+
+    usable = np.repeat((ap_cost <= attacker.ap)[:, None], len(targets), axis=1)
+    if require_reach:
+        positions = np.array([t.position for t in targets], dtype=float)
+        start = battle_map.tile_index(attacker.position) if battle_map is not None else -1
+        if start >= 0:
+            # 이동 가능한 타일들 중 각 타겟과 가장 가까운 거리
+            cells = battle_map.cells[battle_map.distances[start] <= mov]
+            remaining_distance = np.abs(cells[:, None, :] - positions[None]).sum(axis=2).min(axis=0)
+        else:
+            distance = np.abs(positions - np.array(attacker.position, dtype=float)).sum(axis=1)
+            remaining_distance = np.maximum(0.0, distance - mov)
+        usable &= remaining_distance[None, :] <= skill_range[:, None]
+
+    return ActionScores(skills, targets, np.where(usable, expected, 0.0), np.where(usable, kill, 0.0))
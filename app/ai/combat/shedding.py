@@ -0,0 +1,153 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+from app.ai.combat.budget import DEGRADATION_LEVELS
+from app.ai.gateway import llm_gateway
+from app.config import settings
+from app.utils.metrics import COMBAT_LOAD_MODE, COMBAT_LOAD_PRESSURE
+
+logger = logging.getLogger(__name__)
+
+# 부하 단계 (성능 저하 단계 중 fallback 을 제외한 것, 뒤로 갈수록 LLM 호출이 적음)
+# - full: 전략/행동/대사 모두 LLM 사용
+# - no_dialogue: 대사 생성 생략
+# - cached_strategy: 전략 LLM 생략, 직전 전략 재사용
+# - rule_based: 행동 계획 LLM 생략, 규칙 기반 행동 사용
+LOAD_MODES = DEGRADATION_LEVELS[:DEGRADATION_LEVELS.index("rule_based") + 1]
+
+# 지연 시간을 모으는 구간 (초)
+LATENCY_WINDOW = 30.0
+# 단계를 올릴 때 필요한 최소 표본 수 (단계 변경 이후 측정값만 사용)
+MIN_SAMPLES = 20
+# 부하가 이 값을 넘으면 한 단계 올리고, RECOVER_PRESSURE 미만이면 한 단계 내림
+ESCALATE_PRESSURE = 1.0
+RECOVER_PRESSURE = 0.7
+# 단계를 바꾼 뒤 다시 올리기/내리기까지 기다리는 시간 (초)
+ESCALATE_DWELL = 2.0
+RECOVER_DWELL = 15.0
+
+
+def percentile(values, q: float) -> float:
+    """정렬하지 않은 값 목록의 q 분위수 (nearest-rank)"""
+    ordered = sorted(values)
+    rank = max(math.ceil(q * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class LoadController:
+    """전투 행동 결정 지연 시간 SLO 기반 부하 차단 컨트롤러
+
+    - 실제 요청(추측 실행 제외)의 행동 결정 시간을 최근 LATENCY_WINDOW 초 동안 모아 p95 를 계산
+    - 부하 = max(p95 / 목표 p95, (실행 중 + 대기 중 LLM 호출) / 동시 실행 한도)
+    - 부하가 ESCALATE_PRESSURE 를 넘으면 ESCALATE_DWELL 마다 한 단계씩 저렴한 모드로 전환
+    - 부하가 RECOVER_PRESSURE 미만으로 RECOVER_DWELL 이상 유지되면 한 단계씩 복구 (히스테리시스)
+
+    단계를 바꾸면 이전 모드에서 측정한 지연 시간은 버리고 새 모드의 측정값으로만 판단합니다.
+    표본이 MIN_SAMPLES 보다 적으면 지연 시간으로는 단계를 올리지 않지만, 복구 판단에는
+    적은 표본의 p95(사실상 최댓값)를 그대로 사용해 보수적으로 복구합니다.
+    """
+
+    def __init__(self, target_p95: float, scheduler=None, window: float = LATENCY_WINDOW,
+                 min_samples: int = MIN_SAMPLES, escalate_dwell: float = ESCALATE_DWELL,
+                 recover_dwell: float = RECOVER_DWELL, clock: Callable[[], float] = time.monotonic):
+        self.target_p95 = target_p95
+        self.scheduler = scheduler
+        self.window = window
+        self.min_samples = min_samples
+        self.escalate_dwell = escalate_dwell
+        self.recover_dwell = recover_dwell
+        self.clock = clock
+        self.level = 0
+        self.transitions = 0
+        self.pressure = 0.0
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._changed_at = clock()
+        self._lock = threading.Lock()
+        self._export()
+
+    @property
+    def enabled(self) -> bool:
+        return self.target_p95 > 0
+
+    @property
+    def mode(self) -> str:
+        return LOAD_MODES[self.level]
+
+    def observe(self, latency: float) -> None:
+        """실제 요청의 행동 결정 시간 (초) 기록"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._samples.append((self.clock(), latency))
+
+    def current_mode(self) -> str:
+        """부하를 다시 계산해 단계를 조정한 뒤 이번 결정에 적용할 모드 반환"""
+        if not self.enabled:
+            return self.mode
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            latency_pressure, samples = self._latency_pressure()
+            queue_pressure = self._queue_pressure()
+            self.pressure = max(latency_pressure, queue_pressure)
+
+            elapsed = now - self._changed_at
+            # 표본이 적을 때는 실행 중인 LLM 호출 수로만 단계를 올림
+            escalate_pressure = self.pressure if samples >= self.min_samples else queue_pressure
+            if (escalate_pressure > ESCALATE_PRESSURE and elapsed >= self.escalate_dwell
+                    and self.level < len(LOAD_MODES) - 1):
+                self._change(self.level + 1, now)
+            elif self.pressure < RECOVER_PRESSURE and elapsed >= self.recover_dwell and self.level > 0:
+                self._change(self.level - 1, now)
+            self._export()
+            return self.mode
+
+    def _expire(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+    def _latency_pressure(self) -> Tuple[float, int]:
+        samples = [latency for ts, latency in self._samples if ts >= self._changed_at]
+        if not samples:
+            return 0.0, 0
+        return percentile(samples, 0.95) / self.target_p95, len(samples)
+
+    def _queue_pressure(self) -> float:
+        if self.scheduler is None or not self.scheduler.capacity:
+            return 0.0
+        return (self.scheduler.in_flight + self.scheduler.queue_depth) / self.scheduler.capacity
+
+    def _change(self, level: int, now: float) -> None:
+        logger.warning("전투 AI 부하 단계 변경: %s -> %s (부하 %.2f)", self.mode, LOAD_MODES[level], self.pressure)
+        self.level = level
+        self.transitions += 1
+        self._changed_at = now
+
+    def _export(self) -> None:
+        for index, mode in enumerate(LOAD_MODES):
+            COMBAT_LOAD_MODE.labels(mode).set(1 if index == self.level else 0)
+        COMBAT_LOAD_PRESSURE.set(round(self.pressure, 3))
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = [latency for ts, latency in self._samples if ts >= self._changed_at]
+            return {
+                "enabled": self.enabled,
+                "mode": self.mode,
+                "pressure": round(self.pressure, 3),
+                "target_p95_ms": round(self.target_p95 * 1000, 2),
+                "p95_ms": round(percentile(samples, 0.95) * 1000, 2) if samples else None,
+                "samples": len(samples),
+                "llm_in_flight": self.scheduler.in_flight if self.scheduler is not None else None,
+                "llm_queue_depth": self.scheduler.queue_depth if self.scheduler is not None else None,
+                "transitions": self.transitions,
+                "mode_age_s": round(self.clock() - self._changed_at, 1),
+            }
+
+
+# 워커 전체에서 공유하는 컨트롤러 (COMBAT_LOAD_SHED_P95 가 0 이면 항상 full)
+load_controller = LoadController(settings.COMBAT_LOAD_SHED_P95, scheduler=llm_gateway.scheduler)
@@ -1,5 +1,7 @@
 from typing import List, Optional, Tuple, Literal, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.utils.environment import BattleEnvironment
 
 class Character(BaseModel):
     id: str = Field(description="캐릭터의 고유 식별자")
@@ -12,6 +14,10 @@ class Character(BaseModel):
     ap: int = Field(description="캐릭터의 현재 행동력 (Action Points)")
     mov: int = Field(description="캐릭터의 현재 이동력 (Movement Points)")
     status_effects: List[str] = Field(description="캐릭터에게 적용된 상태 이상 효과 목록")
+    attack: int = Field(default=10, description="캐릭터의 공격력")
+    defense: int = Field(default=5, description="캐릭터의 방어력")
+    critical_rate: float = Field(default=0.05, description="치명타 확률 (0~1)")
+    critical_damage: float = Field(default=1.5, description="치명타 피해 배율")
 
 class ActionPlan(BaseModel):
     move_to: Optional[Tuple[int, int]] = Field(
@@ -46,11 +52,23 @@ class Strategy(BaseModel):
         description="이 전략을 선택한 이유에 대한 간략한 설명"
     )
 
+class FusedDecision(BaseModel):
+    """전략, 행동 계획, 대사를 한 번의 LLM 호출로 결정한 결과 (fused 티어)"""
+    strategy: Strategy = Field(description="선택한 전략")
+    action_plan: ActionPlan = Field(description="전략에 따른 행동 계획 (dialogue 포함)")
+
 class LangGraphBattleState(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     cycle: int = Field(description="현재 전투의 라운드 번호")
     turn: int = Field(description="현재 라운드 내의 턴 번호")
     terrain: str = Field(description="전투가 진행되는 지형의 종류")
     weather: str = Field(description="현재 날씨 상태")
+    map_id: Optional[str] = Field(default=None, description="등록된 전투 맵 ID")
+    environment: Optional[BattleEnvironment] = Field(
+        default=None, exclude=True,
+        description="전투 시작 시 컴파일한 지형/날씨 효과 (CombatAI.environment)"
+    )
     current_character_id: str = Field(description="현재 행동할 차례인 캐릭터의 ID")
     characters: List[Character] = Field(description="전투에 참여한 모든 캐릭터의 목록")
 
@@ -84,6 +102,10 @@ class LangGraphBattleState(BaseModel):
         default=None,
         description="현재 캐릭터가 주로 타겟으로 삼고 있는 캐릭터의 ID"
     )
+    assigned_target_id: Optional[str] = Field(
+        default=None,
+        description="팀 단위 타겟 배정으로 현재 캐릭터에게 배정된 타겟 ID"
+    )
     action_plan: Optional[ActionPlan] = Field(
         default=None,
         description="현재 캐릭터의 행동 계획"
@@ -96,4 +118,33 @@ class LangGraphBattleState(BaseModel):
         default=None,
         description="AI의 의사결정 과정을 추적하기 위한 로그"
     )
+
+    deadline: Optional[float] = Field(
+        default=None,
+        description="행동 결정 마감 시각 (time.monotonic 기준, 초)"
+    )
+    deadline_budget: Optional[float] = Field(
+        default=None,
+        description="행동 결정에 주어진 전체 제한 시간 (초)"
+    )
+    cached_strategy: Optional[Strategy] = Field(
+        default=None,
+        description="현재 캐릭터가 직전 턴에 선택한 전략 (시간 부족 시 재사용)"
+    )
+    degradation_level: str = Field(
+        default="full",
+        description="제한 시간 부족으로 적용된 성능 저하 단계"
+    )
+    load_level: str = Field(
+        default="full",
+        description="서버 부하로 적용된 부하 단계 (이 단계에서 생략하는 노드는 LLM 을 호출하지 않음)"
+    )
+    node_timings: Dict[str, float] = Field(
+        default_factory=dict,
+        description="노드별 실행 시간 (ms)"
+    )
+    ai_tier: str = Field(
+        default="full",
+        description="현재 캐릭터에게 적용된 AI 티어 (rule/fused/full/tactical)"
+    )
     
\ No newline at end of file
@@ -0,0 +1,107 @@
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.ai.combat.influence import InfluenceMap
+from app.ai.combat.scoring import score_actions
+from app.ai.combat.states import ActionPlan, Character
+from app.utils.battle_map import BattleMap, reachable_positions
+from app.utils.environment import BattleEnvironment
+from app.utils.loader import skill_info_all
+
+# 행동 평가 가중치
+KILL_BONUS = 1.0        # 처치 확률 1당 예상 피해량에 더하는 배율
+THREAT_WEIGHT = 0.5     # 이동한 타일의 위협 1당 비용
+APPROACH_WEIGHT = 0.1   # 공격하지 않을 때 가장 가까운 적까지 거리 1칸당 비용 (도주 중에는 미적용)
+
+# LLM 계획보다 이만큼 이상 좋아야 탐색 결과로 교체
+SEARCH_MARGIN = 1.0
+
+
+class TacticalChoice:
+    """전술 탐색으로 찾은 (이동 위치, 스킬, 타겟)과 평가값"""
+
+    def __init__(self, move_to: Tuple[int, int], skill: Optional[str], target_id: Optional[str], value: float):
+        self.move_to = move_to
+        self.skill = skill
+        self.target_id = target_id
+        self.value = value
+
+
+class TacticalSearch:
+    """이동 가능한 모든 타일 × 공격 스킬 × 타겟 조합을 한 번에 평가하는 1수 탐색
+
+    평가값 = 예상 피해량 × (1 + 처치 확률 × KILL_BONUS) - 이동한 타일의 위협 × THREAT_WEIGHT
+    공격하지 않는 이동은 가장 가까운 적까지 거리 × APPROACH_WEIGHT 를 비용으로 더합니다.
+    도주 중이면 공격 가치와 접근 비용은 무시하고 위협이 가장 낮은 타일을 찾습니다.
+    """
+
+    def __init__(self, character: Character, enemies: List[Character], occupied: Set[Tuple[int, int]],
+                 influence: InfluenceMap, environment: Optional[BattleEnvironment] = None,
+                 battle_map: Optional[BattleMap] = None):
+        self.character = character
+        self.enemies = enemies
+        self.environment = environment
+        mov = environment.movement(character.mov) if environment else character.mov
+        tiles = [
+            pos for pos in reachable_positions(character.position, mov, battle_map)
+            if pos == character.position or pos not in occupied
+        ]
+        self.tiles = np.array(sorted(tiles), dtype=int).reshape(-1, 2)
+        self.threat = influence.threat_at(self.tiles)
+
+        scores = score_actions(character, enemies, require_reach=False, environment=environment)
+        self.skills = scores.skills
+        # [스킬 × 타겟] 공격 가치
+        self.attack_value = scores.expected_damage * (1 + KILL_BONUS * scores.kill_probability)
+        skill_info = environment.skill_info if environment else skill_info_all
+        self.skill_range = np.array([skill_info[s].get("range", 1) for s in self.skills], dtype=int)
+
+        enemy_positions = np.array([e.position for e in enemies], dtype=int).reshape(-1, 2)
+        # [타일 × 타겟] 맨해튼 거리
+        self.distance = np.abs(self.tiles[:, None, :] - enemy_positions[None]).sum(axis=2)
+
+    def values(self, flee: bool = False) -> np.ndarray:
+        """[타일 × (스킬 + 1) × 타겟] 평가값 (마지막 스킬 칸은 스킬 미사용)"""
+        tile_cost = -THREAT_WEIGHT * self.threat
+        n_tiles, n_targets = self.distance.shape
+        values = np.full((n_tiles, len(self.skills) + 1, max(n_targets, 1)), -np.inf)
+        if flee or not n_targets:
+            values[:, -1, :] = tile_cost[:, None]
+            return values
+
+        values[:, -1, :] = (tile_cost - APPROACH_WEIGHT * self.distance.min(axis=1))[:, None]
+        if not self.skills:
+            return values
+
+        # 사거리 안이고 AP로 사용 가능한 (예상 피해량 > 0) 조합만 평가
+        in_range = ((self.distance[:, None, :] <= self.skill_range[None, :, None])
+                    & (self.attack_value[None] > 0))
+        attack = self.attack_value[None] + tile_cost[:, None, None]
+        values[:, :-1, :n_targets] = np.where(in_range, attack, -np.inf)
+        return values
+
+    def best(self, flee: bool = False) -> Optional[TacticalChoice]:
+        if not len(self.tiles):
+            return None
+        values = self.values(flee)
+        t, s, j = np.unravel_index(int(np.argmax(values)), values.shape)
+        skill = self.skills[s] if s < len(self.skills) else None
+        target_id = self.enemies[j].id if skill else None
+        return TacticalChoice(tuple(int(v) for v in self.tiles[t]), skill, target_id, float(values[t, s, j]))
+
+    def evaluate(self, plan: ActionPlan, flee: bool = False) -> float:
+        """기존 행동 계획의 평가값 (이동할 수 없거나 사거리 밖이면 -inf)"""
+        if plan.move_to is None:
+            return -np.inf
+        matches = np.nonzero((self.tiles == np.array(plan.move_to, dtype=int)).all(axis=1))[0]
+        if not len(matches):
+            return -np.inf
+        t = int(matches[0])
+        values = self.values(flee)
+        if not plan.skill or plan.skill not in self.skills:
+            return float(values[t, -1, 0])
+        j = next((i for i, e in enumerate(self.enemies) if e.id == plan.target_character_id), None)
+        if j is None:
+            return float(values[t, -1, 0])
+        return float(values[t, self.skills.index(plan.skill), j])
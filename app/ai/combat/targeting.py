@@ -0,0 +1,147 @@
+import math
+from typing import Dict, List, Optional, Sequence
+
+from app.ai.combat.scoring import effective_stats
+from app.ai.combat.states import Character
+from app.utils.combat import calculate_manhattan_distance
+from app.utils.battle_map import BattleMap
+from app.utils.environment import BattleEnvironment
+from app.utils.loader import skill_info_all
+
+# 공격 가능한 캐릭터가 없을 때 평균 1회 피해량 계산에 사용하는 기본 공격력
+DEFAULT_ATTACK = 10
+
+# 비용 가중치
+HITS_TO_KILL_WEIGHT = 0.1   # 처치까지 필요한 공격 횟수 1회당 비용
+OVERKILL_PENALTY = 5.0      # 이미 처치에 충분한 인원이 배정된 타겟에 추가 배정할 때의 비용
+SLOT_EPSILON = 0.01         # 같은 타겟 안에서 앞 슬롯부터 채우도록 하는 미세 비용
+
+# 이보다 공격자가 많으면 헝가리안 알고리즘 대신 탐욕 근사 사용
+HUNGARIAN_MAX_ROWS = 30
+
+
+def hungarian(cost: Sequence[Sequence[float]]) -> List[int]:
+    """헝가리안 알고리즘 (행 수 <= 열 수). 각 행에 배정된 열 인덱스 반환"""
+    n, m = len(cost), len(cost[0])
+    INF = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [INF] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0, delta, j1 = p[j0], INF, 0
+            row = cost[i0 - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j], way[j] = cur, j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    assignment = [-1] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            assignment[p[j] - 1] = j - 1
+    return assignment
+
+
+def greedy_assignment(cost: Sequence[Sequence[float]]) -> List[int]:
+    """비용이 낮은 (행, 열) 쌍부터 배정하는 탐욕 근사"""
+    pairs = sorted((c, i, j) for i, row in enumerate(cost) for j, c in enumerate(row))
+    assignment = [-1] * len(cost)
+    used_cols = set()
+    for _, i, j in pairs:
+        if assignment[i] == -1 and j not in used_cols:
+            assignment[i] = j
+            used_cols.add(j)
+    return assignment
+
+
+def attack_profile(character: Character, environment: Optional[BattleEnvironment] = None) -> Dict[str, float]:
+    """AP로 사용 가능한 공격 스킬 기준 최대 예상 피해량과 최대 사거리 (지형/날씨 보정 반영)"""
+    skill_info = environment.skill_info if environment else skill_info_all
+    attack_skills = [
+        skill_info[s] for s in character.skills
+        if skill_info.get(s, {}).get("dmg_mult", 0) > 0 and skill_info[s].get("ap", 1) <= character.ap
+    ]
+    if not attack_skills:
+        return {"damage": 0.0, "range": 1}
+    attack = effective_stats(character)[0] * (environment.accuracy if environment else 1.0)
+    return {
+        "damage": attack * max(s["dmg_mult"] for s in attack_skills),
+        "range": max(s.get("range", 1) for s in attack_skills),
+    }
+
+
+def assign_targets(attackers: List[Character], defenders: List[Character],
+                   environment: Optional[BattleEnvironment] = None,
+                   battle_map: Optional[BattleMap] = None) -> Dict[str, str]:
+    """공격자 팀 전체의 타겟을 한 번에 배정
+
+    각 방어자는 처치에 필요한 인원만큼의 슬롯을 가지며, 슬롯을 넘는 배정에는 오버킬 비용이 붙습니다.
+    비용 = 사거리까지 필요한 턴 수 + 처치까지 필요한 공격 횟수 × 가중치 (+ 오버킬 비용)
+    공격자 × (방어자 × 슬롯) 비용 행렬에 헝가리안 알고리즘(큰 전투에서는 탐욕 근사)을 적용합니다.
+    """
+    attackers = [a for a in attackers if a.hp > 0]
+    defenders = [d for d in defenders if d.hp > 0]
+    if not attackers or not defenders:
+        return {}
+
+    profiles = [attack_profile(a, environment) for a in attackers]
+    damages = [p["damage"] for p in profiles if p["damage"] > 0]
+    average_damage = sum(damages) / len(damages) if damages else DEFAULT_ATTACK
+
+    slots = len(attackers)
+    columns = []  # (방어자 인덱스, 슬롯 번호)
+    for j, defender in enumerate(defenders):
+        needed = max(1, math.ceil(defender.hp / average_damage))
+        columns.extend((j, k, k >= needed) for k in range(slots))
+
+    cost = []
+    for attacker, profile in zip(attackers, profiles):
+        damage = profile["damage"] or 1.0
+        mov = max(environment.movement(attacker.mov) if environment else attacker.mov, 1)
+        base = []
+        for defender in defenders:
+            distance = calculate_manhattan_distance(attacker.position, defender.position)
+            if battle_map is not None:
+                # 전투 맵이 있으면 장애물을 돌아가는 최단 이동 거리 사용
+                distance = battle_map.distance(attacker.position, defender.position) or distance
+            reach_turns = math.ceil(max(0, distance - profile["range"]) / mov)
+            base.append(reach_turns + HITS_TO_KILL_WEIGHT * (defender.hp / damage))
+        cost.append([
+            base[j] + (OVERKILL_PENALTY if overkill else 0.0) + SLOT_EPSILON * k
+            for j, k, overkill in columns
+        ])
+
+    solver = hungarian if len(attackers) <= HUNGARIAN_MAX_ROWS else greedy_assignment
+    assignment = solver(cost)
+
+    return {
+        attacker.id: defenders[columns[col][0]].id
+        for attacker, col in zip(attackers, assignment)
+        if col >= 0
+    }
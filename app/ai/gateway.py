@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+import httpx
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from app.config import settings
+from app.ai.scheduler import LLMScheduler
+from app.ai.ledger import cached_tokens, usage_ledger
+from app.utils.metrics import LLM_REQUEST_DURATION, LLM_TOKENS
+from app.utils.profiling import record_span
+
+logger = logging.getLogger(__name__)
+
+# 기능별 동시 LLM 호출 제한
+FEATURE_CONCURRENCY: Dict[str, int] = {
+    "strategy": 16,
+    "plan": 16,
+    "dialogue": 8,
+    "npc_chat": 8,
+    "char_creation": 4,
+    "item_gen": 2,
+}
+DEFAULT_CONCURRENCY = 4
+
+# 호출 기능 이름을 전달하는 헤더 (대체 서버가 기능별 응답을 고르는 데 사용)
+FEATURE_HEADER = "X-LLM-Feature"
+
+# 재시도 대상 오류 (일시적인 네트워크/서버 오류)
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
+Messages = Union[str, List[Dict[str, str]]]
+
+
+class UsageCollector:
+    """한 작업(전투 행동 결정 등) 안에서 발생한 LLM 호출의 토큰 사용량과 응답 수집"""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.calls: List[Dict[str, Any]] = []
+
+    def add(self, feature: str, usage: Any, output: str, latency_ms: float) -> None:
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        cached = cached_tokens(usage)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_tokens += cached
+        self.calls.append({
+            "feature": feature,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached,
+            "latency_ms": round(latency_ms, 2),
+            "output": output,
+        })
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "calls": self.calls,
+        }
+
+
+# 현재 컨텍스트의 사용량 수집기 (없으면 수집하지 않음)
+_usage_collector: ContextVar[Optional[UsageCollector]] = ContextVar("llm_usage_collector", default=None)
+
+
+@contextmanager
+def collect_usage() -> Iterator[UsageCollector]:
+    """블록 안에서 실행된 LLM 호출(하위 태스크 포함)의 사용량 수집"""
+    collector = UsageCollector()
+    token = _usage_collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _usage_collector.reset(token)
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 LLM 호출을 즉시 거부할 때 발생"""
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커
+
+    closed → (연속 실패 threshold회) → open → (recovery_timeout 경과) → half_open
+    half_open 상태에서 시험 호출이 성공하면 closed, 실패하면 다시 open 으로 전환합니다.
+    """
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.half_open_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """호출 허용 여부 (half_open 상태에서는 한 번에 하나의 시험 호출만 허용)"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.half_open_in_flight:
+            self.half_open_in_flight = True
+            return True
+        return False
+
+    def is_available(self) -> bool:
+        """상태를 바꾸지 않고 호출 가능 여부만 확인"""
+        return self.state != "open"
+
+    def release(self) -> None:
+        """시험 호출이 성공/실패 기록 없이 끝난 경우(취소, 요청 오류 등) 점유 해제"""
+        self.half_open_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.half_open_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.half_open_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("LLM 서킷 브레이커 열림 (연속 실패 %d회)", self.failures)
+            self.opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """모든 기능이 공유하는 LLM 호출 게이트웨이
+
+    - 커넥션 풀을 공유하는 단일 HTTP 클라이언트
+    - 기능별 동시 호출 세마포어
+    - 우선순위 가중 공정 큐잉 스케줄러 (전투 > 대사/NPC/캐릭터 생성 > 아이템 생성)
+    - 지터가 적용된 지수 백오프 재시도
+    - 서킷 브레이커 (열려 있으면 타임아웃을 기다리지 않고 즉시 실패)
+    """
+
+    def __init__(self):
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=5.0),
+        )
+        # 재시도는 게이트웨이에서 직접 처리하므로 SDK 재시도는 끔
+        # OPENAI_BASE_URL 이 있으면 OpenAI 호환 서버(app/ai/stub_server.py 등)로 호출
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            http_client=self.http_client,
+            max_retries=0,
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.LLM_BREAKER_THRESHOLD,
+            recovery_timeout=settings.LLM_BREAKER_RECOVERY,
+        )
+        self.max_retries = settings.LLM_MAX_RETRIES
+        self.scheduler = LLMScheduler(capacity=settings.LLM_MAX_IN_FLIGHT)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, feature: str) -> asyncio.Semaphore:
+        if feature not in self._semaphores:
+            limit = FEATURE_CONCURRENCY.get(feature, DEFAULT_CONCURRENCY)
+            self._semaphores[feature] = asyncio.Semaphore(limit)
+        return self._semaphores[feature]
+
+    def is_available(self) -> bool:
+        """서킷 브레이커가 닫혀 있어 LLM 호출이 가능한지 여부"""
+        return self.breaker.is_available()
+
+    @staticmethod
+    def _to_messages(prompt: Messages) -> List[Dict[str, str]]:
+        if isinstance(prompt, str):
+            return [{"role": "user", "content": prompt}]
+        return prompt
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """full jitter 지수 백오프 (초)"""
+        return random.uniform(0, min(8.0, 0.25 * (2 ** attempt)))
+
+    async def chat_completion(self, feature: str, prompt: Messages, *, model: Optional[str] = None,
+                              temperature: float = 0.5, **kwargs: Any):
+        """chat completions 호출 후 원본 응답 객체 반환"""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._chat_completion(feature, prompt, model=model, temperature=temperature, **kwargs)
+            outcome = "success"
+        except CircuitOpenError:
+            outcome = "circuit_open"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            LLM_REQUEST_DURATION.labels(feature, outcome).observe(elapsed)
+            record_span("llm", feature, started, elapsed, outcome=outcome)
+
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            LLM_TOKENS.labels(feature, "prompt").observe(usage.prompt_tokens or 0)
+            LLM_TOKENS.labels(feature, "completion").observe(usage.completion_tokens or 0)
+            LLM_TOKENS.labels(feature, "cached").observe(cached_tokens(usage))
+        # 가격은 요청한 모델 이름 기준 (응답의 model 에는 날짜 버전이 붙음)
+        usage_ledger.record(feature, model or settings.OPENAI_MODEL, usage, elapsed * 1000)
+        return response
+
+    async def _chat_completion(self, feature: str, prompt: Messages, *, model: Optional[str] = None,
+                               temperature: float = 0.5, **kwargs: Any):
+        messages = self._to_messages(prompt)
+        async with self._semaphore(feature):
+            attempt = 0
+            while True:
+                if not self.breaker.allow_request():
+                    raise CircuitOpenError(f"LLM 서킷 브레이커가 열려 있습니다 ({feature})")
+                try:
+                    async with self.scheduler.slot(feature):
+                        response = await self.client.chat.completions.create(
+                            model=model or settings.OPENAI_MODEL,
+                            messages=messages,
+                            temperature=temperature,
+                            extra_headers={FEATURE_HEADER: feature},
+                            **kwargs,
+                        )
+                except RETRYABLE_ERRORS as e:
+                    self.breaker.record_failure()
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt)
+                    attempt += 1
+                    logger.warning("LLM 호출 실패 (%s), %.2f초 후 재시도 %d/%d: %s",
+                                   feature, delay, attempt, self.max_retries, e)
+                    await asyncio.sleep(delay)
+                    continue
+                finally:
+                    self.breaker.release()
+                self.breaker.record_success()
+                return response
+
+    async def chat(self, feature: str, prompt: Messages, *, model: Optional[str] = None,
+                   temperature: float = 0.5, **kwargs: Any) -> str:
+        """chat completions 호출 후 응답 텍스트만 반환"""
+        started = time.perf_counter()
+        response = await self.chat_completion(feature, prompt, model=model, temperature=temperature, **kwargs)
+        content = response.choices[0].message.content or ""
+        collector = _usage_collector.get()
+        if collector is not None:
+            collector.add(feature, response.usage, content, (time.perf_counter() - started) * 1000)
+        return content
+
+    async def stream(self, feature: str, prompt: Messages, *, model: Optional[str] = None,
+                     temperature: float = 0.5, **kwargs: Any) -> AsyncIterator[str]:
+        """스트리밍 호출 (토큰 단위로 반환). 스트림 시작 전 오류만 재시도합니다."""
+        messages = self._to_messages(prompt)
+        async with self._semaphore(feature), self.scheduler.slot(feature):
+            attempt = 0
+            while True:
+                if not self.breaker.allow_request():
+                    raise CircuitOpenError(f"LLM 서킷 브레이커가 열려 있습니다 ({feature})")
+                try:
+                    response = await self.client.chat.completions.create(
+                        model=model or settings.OPENAI_MODEL,
+                        messages=messages,
+                        temperature=temperature,
+                        stream=True,
+                        # 마지막 청크로 토큰 사용량 수신 (원장 기록용)
+                        stream_options={"include_usage": True},
+                        extra_headers={FEATURE_HEADER: feature},
+                        **kwargs,
+                    )
+                    break
+                except RETRYABLE_ERRORS:
+                    self.breaker.record_failure()
+                    if attempt >= self.max_retries:
+                        raise
+                    await asyncio.sleep(self._backoff(attempt))
+                    attempt += 1
+                finally:
+                    self.breaker.release()
+
+            started = time.perf_counter()
+            outcome = "error"
+            usage = None
+            try:
+                async for chunk in response:
+                    if getattr(chunk, "usage", None) is not None:
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+                    token = chunk.choices[0].delta.content
+                    if token:
+                        yield token
+                outcome = "success"
+            except RETRYABLE_ERRORS:
+                self.breaker.record_failure()
+                raise
+            finally:
+                LLM_REQUEST_DURATION.labels(feature, f"stream_{outcome}").observe(time.perf_counter() - started)
+            self.breaker.record_success()
+            usage_ledger.record(feature, model or settings.OPENAI_MODEL, usage,
+                                (time.perf_counter() - started) * 1000)
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+
+# 앱 전체에서 공유하는 게이트웨이 인스턴스
+llm_gateway = LLMGateway()
@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.config import settings
+from app.utils.appender import BufferedAppender
+
+# 모델별 토큰 가격 (USD / 100만 토큰: 입력, 캐시된 입력, 출력). 없는 모델은 비용 0 으로 집계
+MODEL_PRICES: Dict[str, tuple] = {
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+}
+
+# 이만큼 기록이 쌓이거나 시간이 지나면 파일에 추가
+FLUSH_EVERY = 64
+FLUSH_INTERVAL = 5.0
+
+# 집계 기준과 기준별로 메모리에 유지하는 최대 키 수 (전투/사용자는 오래 갱신되지 않은 것부터 제외)
+GROUPS = ("feature", "model", "battle", "user")
+MAX_GROUP_KEYS = 1000
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int) -> float:
+    """호출 한 번의 예상 비용 (USD)"""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return 0.0
+    prompt_price, cached_price, completion_price = prices
+    return ((prompt_tokens - cached_tokens) * prompt_price + cached_tokens * cached_price
+            + completion_tokens * completion_price) / 1_000_000
+
+
+def cached_tokens(usage: Any) -> int:
+    """제공자 프롬프트 캐시에서 재사용된 입력 토큰 수 (usage.prompt_tokens_details.cached_tokens)"""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", 0) or 0
+
+
+# 현재 컨텍스트의 LLM 호출 태그 (battle_id, user_id)
+_usage_tags: ContextVar[Dict[str, str]] = ContextVar("llm_usage_tags", default={})
+
+
+@contextmanager
+def usage_tags(**tags: Optional[str]) -> Iterator[None]:
+    """블록 안에서 실행된 LLM 호출(하위 태스크 포함)에 전투/사용자 ID 태그 지정"""
+    token = _usage_tags.set({**_usage_tags.get(), **{k: str(v) for k, v in tags.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _usage_tags.reset(token)
+
+
+class UsageTotals:
+    __slots__ = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "latency_ms", "cost_usd")
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.latency_ms = 0.0
+        self.cost_usd = 0.0
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        self.calls += 1
+        self.prompt_tokens += entry["prompt_tokens"]
+        self.completion_tokens += entry["completion_tokens"]
+        self.cached_tokens += entry["cached_tokens"]
+        self.latency_ms += entry["latency_ms"]
+        self.cost_usd += entry["cost_usd"]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_hit_rate": round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else None,
+            "mean_latency_ms": round(self.latency_ms / self.calls, 2) if self.calls else None,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+class UsageLedger:
+    """LLM 호출별 토큰 사용량/비용 원장
+
+    - record() 는 기능/전투/사용자/모델별 집계를 갱신하고 메모리 버퍼에 추가만 합니다.
+    - directory 가 설정되어 있으면 BufferedAppender 로 버퍼가 FLUSH_EVERY 개 이상이거나 FLUSH_INTERVAL 초가
+      지났을 때 쓰기 스레드에서 JSON Lines 파일에 한 번에 추가합니다 (워커마다 별도 파일).
+    """
+
+    def __init__(self, directory: str = "", flush_every: int = FLUSH_EVERY, flush_interval: float = FLUSH_INTERVAL,
+                 max_group_keys: int = MAX_GROUP_KEYS):
+        self.directory = Path(directory) if directory else None
+        self.max_group_keys = max_group_keys
+        self.totals = UsageTotals()
+        self._groups: Dict[str, "OrderedDict[str, UsageTotals]"] = {group: OrderedDict() for group in GROUPS}
+        self._lock = threading.Lock()
+        self._appender = BufferedAppender(self._write, flush_every, flush_interval, name="usage_ledger")
+        self._file = None
+
+    def record(self, feature: str, model: str, usage: Any, latency_ms: float) -> Dict[str, Any]:
+        """호출 한 건 기록 (usage 는 OpenAI 응답의 usage 객체)"""
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        cached = cached_tokens(usage)
+        tags = _usage_tags.get()
+        entry = {
+            "ts": round(time.time(), 3),
+            "feature": feature,
+            "model": model,
+            "battle": tags.get("battle_id"),
+            "user": tags.get("user_id"),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached,
+            "latency_ms": round(latency_ms, 2),
+            "cost_usd": call_cost(model, prompt_tokens, completion_tokens, cached),
+        }
+
+        with self._lock:
+            self.totals.add(entry)
+            for group in GROUPS:
+                key = entry[group]
+                if key is not None:
+                    self._group_totals(group, key).add(entry)
+        if self.directory is not None:
+            self._appender.append(json.dumps(entry, ensure_ascii=False))
+        return entry
+
+    def _group_totals(self, group: str, key: str) -> UsageTotals:
+        totals = self._groups[group]
+        item = totals.get(key)
+        if item is None:
+            item = totals[key] = UsageTotals()
+            while len(totals) > self.max_group_keys:
+                totals.popitem(last=False)
+        else:
+            totals.move_to_end(key)
+        return item
+
+    def summary(self, group_by: str = "feature", top: int = 20) -> Dict[str, Any]:
+        """전체 합계와 group_by 기준 비용 상위 항목"""
+        if group_by not in GROUPS:
+            raise ValueError(f"지원하지 않는 집계 기준입니다: {group_by} (가능한 값: {', '.join(GROUPS)})")
+        with self._lock:
+            items = sorted(self._groups[group_by].items(),
+                           key=lambda item: (item[1].cost_usd, item[1].prompt_tokens), reverse=True)
+            return {
+                "group_by": group_by,
+                "total": self.totals.as_dict(),
+                "items": [{group_by: key, **totals.as_dict()} for key, totals in items[:top]],
+            }
+
+    def flush(self) -> None:
+        """버퍼의 기록을 파일에 추가"""
+        self._appender.flush()
+
+    def _write(self, lines: List[str]) -> None:
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            name = f"llm-usage-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl"
+            self._file = open(self.directory / name, "a", encoding="utf-8")
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._appender.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# 앱 전체에서 공유하는 원장 (LLM_LEDGER_DIR 이 비어 있으면 파일 없이 메모리 집계만 수행)
+usage_ledger = UsageLedger(settings.LLM_LEDGER_DIR)
+
+
+def _load(directory: str) -> UsageLedger:
+    """기록 파일들을 다시 읽어 집계 (파일 기록 없이 메모리 집계만 사용)"""
+    ledger = UsageLedger(max_group_keys=sys.maxsize)
+    for path in sorted(Path(directory).glob("llm-usage-*.jsonl")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                with ledger._lock:
+                    ledger.totals.add(entry)
+                    for group in GROUPS:
+                        if entry.get(group) is not None:
+                            ledger._group_totals(group, entry[group]).add(entry)
+    return ledger
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """여러 워커의 기록 파일을 합쳐 집계
+
+    python -m app.ai.ledger <디렉터리> [--by feature|model|battle|user] [--top 20]
+    """
+    parser = argparse.ArgumentParser(description="LLM 토큰 사용량/비용 원장 집계")
+    parser.add_argument("directory", help="LLM_LEDGER_DIR 디렉터리")
+    parser.add_argument("--by", default="feature", choices=GROUPS, help="집계 기준")
+    parser.add_argument("--top", type=int, default=20, help="비용 상위 항목 수")
+    args = parser.parse_args(argv)
+
+    ledger = _load(args.directory)
+    json.dump(ledger.summary(args.by, args.top), sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
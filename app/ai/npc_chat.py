@@ -1,46 +1,34 @@
-import openai
+from app.ai.gateway import llm_gateway
 
-SYSTEM_PROMPT = "당신은 게임 속 질문에 친절하게 답하는 NPC입니다."
+# 모든 NPC 대화에서 바이트 단위로 같은 고정 지시문 (제공자 프롬프트 캐시 대상이므로 맨 앞에 둠)
+SYSTEM_PROMPT = (
+    "당신은 게임 속 질문에 친절하게 답하는 NPC입니다.\n"
+    "참고 자료가 주어지면 그 내용을 바탕으로 답변하고, 질문에는 3줄 이내로 답변해주세요."
+)
+NPC_MODEL = "gpt-4.1-nano"
 
 class NPCChatAI:
     def get_npc_personality(self, personality) -> str:
-        system_prompt = f"당신은 게임 속 질문에 답하는 NPC입니다. {personality} 말투로 답변해주세요."
-        
-        return system_prompt
-    
-    def chat(self, user_input: str, retriever, personality) -> str:
-        docs = retriever.invoke(user_input)
-        context = "\n\n".join(d.page_content for d in docs)
+        system_prompt = f"{personality} 말투로 답변해주세요."
 
-        messages = [
-            # {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "system", "content": self.get_npc_personality(personality)},
-            {"role": "user", "content": f"{context}\n\n{user_input}에 대해 3줄 이내로 답변해주세요."}
-        ]
-        resp = openai.chat.completions.create(
-            model="gpt-4.1-nano",
-            messages=messages,
-            temperature=0.5
-        )
-        return resp.choices[0].message.content
+        return system_prompt
 
-    def chat_stream(self, user_input: str, retriever, personality):
-        docs = retriever.invoke(user_input)
+    async def build_messages(self, user_input: str, retriever, personality) -> list:
+        docs = await retriever.ainvoke(user_input)
         context = "\n\n".join(d.page_content for d in docs)
 
-        messages = [
-            # {"role": "system", "content": SYSTEM_PROMPT},
+        # 고정 지시문 → NPC 말투 → 참고 자료/질문 순 (바뀌는 값은 뒤쪽에)
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "system", "content": self.get_npc_personality(personality)},
-            {"role": "user", "content": f"{context}\n\n{user_input}에 대해 3줄 이내로 답변해주세요."}
+            {"role": "user", "content": f"참고 자료:\n{context}\n\n질문: {user_input}"}
         ]
-        response = openai.chat.completions.create(
-            model="gpt-4.1-nano",
-            messages=messages,
-            temperature=0.5,
-            stream=True
-        )
 
-        for chunk in response:
-            token = chunk.choices[0].delta.content
-            if token:
-                yield token
+    async def chat(self, user_input: str, retriever, personality) -> str:
+        messages = await self.build_messages(user_input, retriever, personality)
+        return await llm_gateway.chat("npc_chat", messages, model=NPC_MODEL, temperature=0.5)
+
+    async def chat_stream(self, user_input: str, retriever, personality):
+        messages = await self.build_messages(user_input, retriever, personality)
+        async for token in llm_gateway.stream("npc_chat", messages, model=NPC_MODEL, temperature=0.5):
+            yield token
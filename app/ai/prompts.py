@@ -0,0 +1,133 @@
+import logging
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, Optional, Type
+
+from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel
+
+from app.ai.gateway import Messages
+
+logger = logging.getLogger(__name__)
+
+# 선택 섹션을 줄일 때 남기는 쪽 (head: 앞부분 유지, tail: 뒷부분 유지)
+KEEP_HEAD = "head"
+KEEP_TAIL = "tail"
+
+# 토큰 수 계산에 사용하는 인코딩 (tiktoken 이 설치된 경우)
+TOKEN_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=None)
+def output_parser(model: Type[BaseModel]) -> PydanticOutputParser:
+    """출력 모델별 파서 (모델당 한 번만 생성)"""
+    return PydanticOutputParser(pydantic_object=model)
+
+
+@lru_cache(maxsize=None)
+def format_instructions(model: Type[BaseModel]) -> str:
+    """출력 모델의 형식 지시문 (JSON 스키마 직렬화는 모델당 한 번만 수행)"""
+    return output_parser(model).get_format_instructions()
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception:
+        # tiktoken 이 없거나 인코딩 파일을 받을 수 없으면 근사치 사용
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """프롬프트 토큰 수 (tiktoken 이 없으면 ASCII 4글자당 1토큰, 그 외 글자당 1토큰으로 근사)"""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def trim_section(text: str, excess: int, keep: str = KEEP_HEAD) -> str:
+    """섹션에서 excess 토큰 이상을 줄임 (여러 줄이면 줄 단위, 한 줄이면 단어 단위)
+
+    keep=head 이면 뒤에서부터, tail 이면 앞에서부터 잘라냅니다. 다 잘라도 모자라면 빈 문자열.
+    """
+    separator = "\n" if "\n" in text else " "
+    units = text.split(separator)
+    if keep == KEEP_TAIL:
+        units.reverse()
+    while units and excess > 0:
+        excess -= count_tokens(units.pop()) + 1
+    if keep == KEEP_TAIL:
+        units.reverse()
+    return separator.join(units)
+
+
+def template_fields(template: str) -> set:
+    return {field for _, field, _, _ in Formatter().parse(template) if field}
+
+
+class CompiledPrompt:
+    """한 번만 준비해 두고 반복 렌더링하는 프롬프트 템플릿
+
+    - prefix: 규칙, few-shot 예제, 형식 지시문 등 매 호출 바이트 단위로 같은 고정 부분 (system 메시지)
+    - template: 이름/HP/위치 등 호출마다 바뀌는 값만 담는 부분 (user 메시지)
+    - 출력 모델의 형식 지시문은 생성 시 한 번만 만들어 prefix 의 {format_instructions} 에 채움
+    - 렌더링은 str.format_map 만 사용 (langchain PromptTemplate 검증/복사 비용 없음)
+    - optional 에 지정한 섹션은 토큰 예산을 넘으면 지정한 순서대로 줄임
+
+    LLM 제공자의 프롬프트 캐시는 앞부분이 완전히 같을 때만 재사용되므로,
+    prefix 에 값 자리가 남아 있으면 생성 시 ValueError 를 발생시킵니다.
+    """
+
+    def __init__(self, template: str, output_model: Optional[Type[BaseModel]] = None,
+                 optional: Optional[Dict[str, str]] = None, name: str = "prompt", prefix: str = ""):
+        self.template = template
+        self.name = name
+        self.fields = template_fields(template)
+        self.optional = dict(optional or {})
+        missing = set(self.optional) - self.fields
+        if missing:
+            raise ValueError(f"{name} 템플릿에 없는 선택 섹션입니다: {sorted(missing)}")
+        partials = {"format_instructions": format_instructions(output_model)} if output_model else {}
+        dynamic = template_fields(prefix) - set(partials)
+        if dynamic:
+            raise ValueError(f"{name} 고정 프롬프트에 값 자리가 있습니다: {sorted(dynamic)}")
+        self.prefix = prefix.format_map(partials) if prefix else ""
+        self.prefix_tokens = count_tokens(self.prefix)
+
+    def messages(self, content: str) -> Messages:
+        """고정 부분이 있으면 [system(고정), user(값)] 메시지, 없으면 문자열"""
+        if not self.prefix:
+            return content
+        return [{"role": "system", "content": self.prefix}, {"role": "user", "content": content}]
+
+    def render(self, budget: Optional[int] = None, **values) -> Messages:
+        """값을 채운 프롬프트 (budget 토큰을 넘으면 선택 섹션부터 줄임, 고정 부분은 줄이지 않음)"""
+        prompt = self.template.format_map(values)
+        if not budget or not self.optional:
+            return self.messages(prompt)
+
+        excess = count_tokens(prompt) + self.prefix_tokens - budget
+        if excess <= 0:
+            return self.messages(prompt)
+        for section, keep in self.optional.items():
+            text = values.get(section) or ""
+            # 단위별 토큰 수의 합은 전체 토큰 수와 다를 수 있으므로 실제로 줄어든 만큼 다시 계산
+            while text and excess > 0:
+                trimmed = trim_section(text, excess, keep)
+                excess -= count_tokens(text) - count_tokens(trimmed)
+                text = trimmed
+            values[section] = text
+            if excess <= 0:
+                break
+        logger.debug("[%s] 프롬프트 토큰 예산(%s) 초과 - 선택 섹션 축소", self.name, budget)
+        return self.messages(self.template.format_map(values))
+
+
+def compile_prompt(template: str, output_model: Optional[Type[BaseModel]] = None,
+                   optional: Optional[Dict[str, str]] = None, name: str = "prompt",
+                   prefix: str = "") -> CompiledPrompt:
+    return CompiledPrompt(template, output_model=output_model, optional=optional, name=name, prefix=prefix)
@@ -0,0 +1,137 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+# 기능 → 우선순위 클래스
+# - combat: 플레이어가 기다리는 전투 행동 결정 (가장 우선)
+# - interactive: 전투 대사, NPC 대화, 캐릭터 생성 대화
+# - background: 디스코드 아이템 생성기
+FEATURE_CLASS: Dict[str, str] = {
+    "strategy": "combat",
+    "plan": "combat",
+    "dialogue": "interactive",
+    "npc_chat": "interactive",
+    "char_creation": "interactive",
+    "item_gen": "background",
+}
+DEFAULT_CLASS = "background"
+
+# 클래스별 가중치 (가중 공정 큐잉). 대기열이 모두 찬 경우 대략 8:3:1 비율로 슬롯을 배분
+CLASS_WEIGHTS: Dict[str, float] = {
+    "combat": 8.0,
+    "interactive": 3.0,
+    "background": 1.0,
+}
+
+
+class LLMScheduler:
+    """우선순위 가중 공정 큐잉(WFQ) 기반 LLM 호출 스케줄러
+
+    전체 동시 호출 수를 capacity 로 제한하고, 슬롯이 부족하면 요청을 클래스별로 대기시킵니다.
+    각 요청은 `max(가상 시각, 클래스의 마지막 종료 태그) + 1 / 가중치` 를 종료 태그로 받고,
+    슬롯이 비면 종료 태그가 가장 작은 요청부터 실행됩니다.
+    가중치가 높은 클래스가 먼저 처리되지만 낮은 클래스도 굶지 않습니다.
+    """
+
+    def __init__(self, capacity: int, weights: Dict[str, float] = CLASS_WEIGHTS):
+        self.capacity = capacity
+        self.weights = weights
+        self.in_flight = 0
+        self.virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {cls: 0.0 for cls in weights}
+        self._queue: List[Tuple[float, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._stats: Dict[str, Dict[str, float]] = {
+            cls: {"queued": 0, "in_flight": 0, "dispatched": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for cls in weights
+        }
+
+    @staticmethod
+    def class_of(feature: str) -> str:
+        return FEATURE_CLASS.get(feature, DEFAULT_CLASS)
+
+    async def acquire(self, feature: str) -> str:
+        """실행 슬롯 획득 (필요하면 대기). 획득한 클래스 이름을 반환"""
+        cls = self.class_of(feature)
+        stats = self._stats[cls]
+        started = time.monotonic()
+
+        if self.in_flight < self.capacity and not self._queue:
+            self.in_flight += 1
+        else:
+            finish = max(self.virtual_time, self._last_finish[cls]) + 1.0 / self.weights[cls]
+            self._last_finish[cls] = finish
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queue, (finish, next(self._seq), cls, future))
+            stats["queued"] += 1
+            # 취소된 항목만 남아 있던 경우를 대비해 즉시 배분 시도
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                # 슬롯을 받은 직후 취소된 경우 슬롯 반환
+                if future.done() and not future.cancelled():
+                    self.in_flight -= 1
+                    self._dispatch()
+                else:
+                    stats["queued"] -= 1
+                raise
+
+        waited = time.monotonic() - started
+        stats["in_flight"] += 1
+        stats["dispatched"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+        return cls
+
+    def release(self, cls: str) -> None:
+        """실행 슬롯 반환 후 대기 중인 다음 요청 실행"""
+        self.in_flight -= 1
+        self._stats[cls]["in_flight"] = max(0, self._stats[cls]["in_flight"] - 1)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.capacity and self._queue:
+            finish, _, cls, future = heapq.heappop(self._queue)
+            if future.cancelled():
+                continue
+            self._stats[cls]["queued"] -= 1
+            self.virtual_time = finish
+            self.in_flight += 1
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, feature: str) -> AsyncIterator[None]:
+        cls = await self.acquire(feature)
+        try:
+            yield
+        finally:
+            self.release(cls)
+
+    @property
+    def queue_depth(self) -> int:
+        """슬롯을 기다리는 요청 수"""
+        return sum(int(stats["queued"]) for stats in self._stats.values())
+
+    def metrics(self) -> Dict[str, Any]:
+        """대기열 길이 및 대기 시간 지표"""
+        classes = {}
+        for cls, stats in self._stats.items():
+            dispatched = stats["dispatched"]
+            classes[cls] = {
+                "weight": self.weights[cls],
+                "queue_depth": int(stats["queued"]),
+                "in_flight": int(stats["in_flight"]),
+                "dispatched": int(dispatched),
+                "wait_avg_ms": round(stats["wait_total"] / dispatched * 1000, 2) if dispatched else 0.0,
+                "wait_max_ms": round(stats["wait_max"] * 1000, 2),
+            }
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "queue_depth": sum(c["queue_depth"] for c in classes.values()),
+            "classes": classes,
+        }
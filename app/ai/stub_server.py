@@ -0,0 +1,336 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# OPENAI_BASE_URL=http://localhost:8099/v1 로 앱을 이 서버에 연결합니다.
+DEFAULT_PORT = 8099
+
+# 임베딩 벡터 차원
+EMBEDDING_DIMENSIONS = 256
+
+# 게이트웨이가 기능 이름을 전달하는 헤더
+FEATURE_HEADER = "x-llm-feature"
+
+# 기능별 기본 응답 (전투 계획은 프롬프트에서 위치/추천 행동을 읽어 만듦)
+DEFAULT_STRATEGY = {"type": "공격 우선", "reason": "대체 서버 기본 전략"}
+DEFAULT_DIALOGUE = "크르릉... 각오해라!"
+DEFAULT_TEXT = "대체 서버 응답입니다."
+
+# 주입할 수 있는 실패 종류
+FAILURE_KINDS = ["500", "429", "timeout"]
+
+POSITION_PATTERN = re.compile(r"위치: \((\d+), (\d+)\)")
+RECOMMENDED_PATTERN = re.compile(r"추천 행동:\s*\n- (.+?) → .+?\(ID: ([^)]+)\)")
+TARGET_PATTERN = re.compile(r"현재 타겟 ID: (\S+)")
+
+
+class LatencyModel:
+    """응답 지연 시간 분포 (초)
+
+    - fixed:0.3
+    - uniform:0.1,0.5
+    - lognormal:mu,sigma (exp(N(mu, sigma^2)))
+    - token_rate 가 있으면 출력 토큰 수 / token_rate 초를 더합니다.
+    """
+
+    def __init__(self, spec: str = "fixed:0", token_rate: float = 0.0, seed: Optional[int] = None):
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"알 수 없는 지연 분포: {spec}")
+        self.token_rate = token_rate
+        self.random = random.Random(seed)
+
+    def first_token(self) -> float:
+        """첫 토큰까지의 지연 시간"""
+        if self.kind == "fixed":
+            return self.params[0] if self.params else 0.0
+        if self.kind == "uniform":
+            return self.random.uniform(*self.params)
+        return math.exp(self.random.gauss(*self.params))
+
+    def per_token(self) -> float:
+        """출력 토큰 하나당 생성 시간"""
+        return 1.0 / self.token_rate if self.token_rate > 0 else 0.0
+
+
+def count_tokens(text: str) -> int:
+    """토큰 수 근사 (UTF-8 4바이트당 1토큰)"""
+    return max(1, math.ceil(len(text.encode("utf-8")) / 4))
+
+
+def split_tokens(text: str) -> Iterator[str]:
+    """스트리밍용 토큰 분할 (공백 단위)"""
+    for match in re.finditer(r"\S+\s*|\s+", text):
+        yield match.group(0)
+
+
+def prompt_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(str(m.get("content", "")) for m in messages)
+
+
+def combat_plan(prompt: str) -> Dict[str, Any]:
+    """전투 행동 계획 프롬프트에서 현재 위치와 첫 번째 추천 행동을 읽어 ActionPlan 형식 응답 구성"""
+    position = POSITION_PATTERN.search(prompt)
+    move_to = [int(position.group(1)), int(position.group(2))] if position else [0, 0]
+    recommended = RECOMMENDED_PATTERN.search(prompt)
+    target = TARGET_PATTERN.search(prompt)
+    return {
+        "move_to": move_to,
+        "skill": recommended.group(1).strip() if recommended else None,
+        "target_character_id": recommended.group(2) if recommended else (target.group(1) if target else None),
+        "reason": "대체 서버 추천 행동",
+        "remaining_ap": 0,
+        "remaining_mov": 0,
+    }
+
+
+class StubLLM:
+    """OpenAI 호환 대체 LLM의 응답 생성기
+
+    응답 순서: 기능별 스크립트 응답(순환) → 프롬프트 형식에 맞는 기본 응답
+    기능은 게이트웨이가 보내는 x-llm-feature 헤더로 구분합니다.
+    """
+
+    def __init__(self, latency: LatencyModel, failure_rate: float = 0.0,
+                 failure_kinds: Optional[List[str]] = None, script: Optional[Dict[str, Any]] = None,
+                 timeout_delay: float = 60.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.failure_kinds = failure_kinds or ["500"]
+        self.script = {
+            feature: responses if isinstance(responses, list) else [responses]
+            for feature, responses in (script or {}).items()
+        }
+        self.timeout_delay = timeout_delay
+        self.random = random.Random(seed)
+        self._script_index: Dict[str, int] = defaultdict(int)
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.failures: Dict[str, int] = defaultdict(int)
+        self.cached_tokens: Dict[str, int] = defaultdict(int)
+        self._cached_prefixes: set = set()
+
+    def failure(self) -> Optional[str]:
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            return self.random.choice(self.failure_kinds)
+        return None
+
+    def respond(self, feature: str, prompt: str) -> str:
+        responses = self.script.get(feature)
+        if responses:
+            index = self._script_index[feature]
+            self._script_index[feature] = index + 1
+            response = responses[index % len(responses)]
+            return response if isinstance(response, str) else json.dumps(response, ensure_ascii=False)
+
+        if feature == "strategy":
+            return json.dumps(DEFAULT_STRATEGY, ensure_ascii=False)
+        if feature == "plan":
+            plan = combat_plan(prompt)
+            # 통합 결정(fused) 프롬프트는 전략과 행동 계획을 함께 요구
+            if '"action_plan"' in prompt:
+                return json.dumps({"strategy": DEFAULT_STRATEGY, "action_plan": {**plan, "dialogue": DEFAULT_DIALOGUE}},
+                                  ensure_ascii=False)
+            return json.dumps(plan, ensure_ascii=False)
+        if feature == "dialogue":
+            return DEFAULT_DIALOGUE
+        return DEFAULT_TEXT
+
+    def cached_prefix_tokens(self, feature: str, messages: List[Dict[str, Any]]) -> int:
+        """제공자 프롬프트 캐시 흉내: 이전에 본 첫 system 메시지와 같으면 그 토큰 수를 캐시 적중으로 보고"""
+        if not messages or messages[0].get("role") != "system":
+            return 0
+        prefix = str(messages[0].get("content", ""))
+        key = hashlib.sha256(prefix.encode("utf-8")).digest()
+        if key not in self._cached_prefixes:
+            self._cached_prefixes.add(key)
+            return 0
+        tokens = count_tokens(prefix)
+        self.cached_tokens[feature] += tokens
+        return tokens
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"requests": dict(self.requests), "failures": dict(self.failures),
+                "cached_tokens": dict(self.cached_tokens)}
+
+
+def embedding(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> List[float]:
+    """텍스트 해시로 만든 결정적 단위 벡터"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+
+def _error(kind: str) -> JSONResponse:
+    status = 429 if kind == "429" else 500
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": f"대체 서버 주입 실패 ({kind})", "type": "stub_failure", "code": kind}},
+    )
+
+
+def create_app(stub: StubLLM) -> FastAPI:
+    app = FastAPI(title="Loreless LLM Stand-in")
+    app.state.stub = stub
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]}
+
+    @app.get("/stub/metrics")
+    async def stub_metrics():
+        return stub.metrics()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        feature = request.headers.get(FEATURE_HEADER, "default")
+        stub.requests[feature] += 1
+        failure = stub.failure()
+        if failure:
+            stub.failures[feature] += 1
+            if failure == "timeout":
+                await asyncio.sleep(stub.timeout_delay)
+            return _error(failure)
+
+        messages = body.get("messages", [])
+        prompt = prompt_text(messages)
+        content = stub.respond(feature, prompt)
+        model = body.get("model", "stub")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": count_tokens(prompt),
+            "completion_tokens": count_tokens(content),
+            "prompt_tokens_details": {"cached_tokens": stub.cached_prefix_tokens(feature, messages)},
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        await asyncio.sleep(stub.latency.first_token())
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(content, completion_id, created, model, stub.latency.per_token(),
+                        usage if (body.get("stream_options") or {}).get("include_usage") else None),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(stub.latency.per_token() * usage["completion_tokens"])
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        inputs = body.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        dimensions = body.get("dimensions") or EMBEDDING_DIMENSIONS
+        stub.requests["embeddings"] += 1
+        await asyncio.sleep(stub.latency.first_token())
+        tokens = sum(count_tokens(str(text)) for text in inputs)
+        return {
+            "object": "list",
+            "model": body.get("model", "stub"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": embedding(str(text), dimensions)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    return app
+
+
+async def _stream(content: str, completion_id: str, created: int, model: str, per_token: float,
+                  usage: Optional[Dict[str, Any]] = None):
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        data = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    for token in split_tokens(content):
+        if per_token:
+            await asyncio.sleep(per_token * count_tokens(token))
+        yield chunk({"content": token})
+    yield chunk({}, "stop")
+    if usage is not None:
+        # stream_options.include_usage 요청 시 choices 가 빈 마지막 청크로 사용량 전달
+        data = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [], "usage": usage}
+        yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """대체 LLM 서버 실행
+
+    python -m app.ai.stub_server --latency lognormal:-1.2,0.4 --token-rate 60 --failure-rate 0.02
+    """
+    parser = argparse.ArgumentParser(description="OpenAI 호환 로컬 대체 LLM 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", default=os.getenv("STUB_LLM_LATENCY", "fixed:0"),
+                        help="첫 토큰 지연 분포 (fixed:초 / uniform:최소,최대 / lognormal:mu,sigma)")
+    parser.add_argument("--token-rate", type=float, default=float(os.getenv("STUB_LLM_TOKEN_RATE", 0)),
+                        help="초당 출력 토큰 수 (0 이면 즉시)")
+    parser.add_argument("--failure-rate", type=float, default=float(os.getenv("STUB_LLM_FAILURE_RATE", 0)),
+                        help="실패 주입 확률 (0~1)")
+    parser.add_argument("--failure-kinds", default=os.getenv("STUB_LLM_FAILURE_KINDS", "500"),
+                        help=f"주입할 실패 종류 ({', '.join(FAILURE_KINDS)} 중 쉼표로 구분)")
+    parser.add_argument("--script", default=os.getenv("STUB_LLM_SCRIPT"),
+                        help="기능별 응답 스크립트 JSON 파일 ({\"strategy\": [...], \"plan\": [...]} )")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    failure_kinds = [kind.strip() for kind in args.failure_kinds.split(",") if kind.strip()]
+    unknown = set(failure_kinds) - set(FAILURE_KINDS)
+    if unknown:
+        parser.error(f"알 수 없는 실패 종류: {', '.join(sorted(unknown))}")
+    script = None
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = json.load(f)
+
+    stub = StubLLM(
+        LatencyModel(args.latency, args.token_rate, args.seed),
+        failure_rate=args.failure_rate,
+        failure_kinds=failure_kinds,
+        script=script,
+        seed=args.seed,
+    )
+
+    import uvicorn
+    uvicorn.run(create_app(stub), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
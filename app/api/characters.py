@@ -7,6 +7,7 @@ from app.services import characters
 from app.models.characters import CharacterCreateRequest, CharacterCreateResponse, CharacterUpdateRequest, CharacterUpdateResponse, CharacterStatsUpdateRequest, CharacterStatsUpdateResponse
 
 from app.utils.database import get_db
+from app.utils.metrics import WEBSOCKET_SESSIONS
 
 router = APIRouter(prefix="/characters", tags=["characters"])
 ws_router = APIRouter(prefix="/ws/characters", tags=["characters"])
@@ -35,8 +36,11 @@ async def character_creation_websocket(
     db: Session = Depends(get_db)
 ):
     character_service = characters.CharacterCreationService(db)
+    session_opened = False
     try:
         await websocket.accept()
+        session_opened = True
+        WEBSOCKET_SESSIONS.labels("character_creation").inc()
         await character_service.prepare_session(str(user_id), websocket)
         await character_service.send_first_question(str(user_id))
 
@@ -54,6 +58,8 @@ async def character_creation_websocket(
     except Exception as e:
         logger.error(f"Error in WebSocket connection for user {user_id}: {str(e)}")
     finally:
+        if session_opened:
+            WEBSOCKET_SESSIONS.labels("character_creation").dec()
         if str(user_id) in character_service.sessions:
             del character_service.sessions[str(user_id)]
     
@@ -1,17 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
-from app.models.combat import BattleInitRequest, BattleState, BattleActionResponse
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response
+from app.models.combat import BattleInitRequest, BattleState, BattleActionResponse, BattleMapRequest
 from app.services.combat import CombatService
+from app.ai.combat.shedding import load_controller
 from app.api.examples.combat import (
     BATTLE_START_REQUEST_EXAMPLE,
     BATTLE_START_RESPONSE_EXAMPLE,
     BATTLE_ACTION_REQUEST_EXAMPLE,
     BATTLE_ACTION_RESPONSE_EXAMPLE,
     BATTLE_START_DESCRIPTION,
-    BATTLE_ACTION_DESCRIPTION
+    BATTLE_ACTION_DESCRIPTION,
+    BATTLE_MAP_REQUEST_EXAMPLE
 )
 
 router = APIRouter(prefix="/battle", tags=["battle"])
 
+# 행동 결정에 적용된 부하 단계 응답 헤더
+LOAD_MODE_HEADER = "X-AI-Load-Mode"
+
 # 싱글톤 패턴 - 앱 전체에서 하나의 CombatService 인스턴스 사용
 combat_service = CombatService()
 
@@ -36,11 +41,18 @@ async def battle_start(
     request: BattleInitRequest = Body(..., example=BATTLE_START_REQUEST_EXAMPLE), 
     service: CombatService = Depends(get_combat_service)
 ):
-    result = await service.start_battle(
-        characters=request.characters,
-        terrain=request.terrain,
-        weather=request.weather
-    )
+    try:
+        result = await service.start_battle(
+            characters=request.characters,
+            terrain=request.terrain,
+            weather=request.weather,
+            decision_deadline=request.decision_deadline,
+            prefetch=request.prefetch,
+            map_id=request.map_id,
+            ai_tier=request.ai_tier
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return result
 
 @router.post(
@@ -59,14 +71,55 @@ async def battle_start(
     }
 )
 async def battle_action(
+    response: Response,
     state: BattleState = Body(..., example=BATTLE_ACTION_REQUEST_EXAMPLE), 
+    resolve: bool = Query(False, description="true 이면 예상 HP 변화, 상태 효과, 다음 턴 상태(outcome)를 함께 반환"),
     service: CombatService = Depends(get_combat_service)
 ):
     try:
-        response = await service.decide_actions(state)
-        return response
+        action_response = await service.decide_actions(state, resolve=resolve)
+        response.headers[LOAD_MODE_HEADER] = action_response.load_mode
+        return action_response
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
-    
\ No newline at end of file
+
+@router.get("/turn-order")
+async def battle_turn_order(service: CombatService = Depends(get_combat_service)):
+    """속도와 상태 효과를 반영해 예측한 이후 행동 캐릭터 순서를 조회합니다."""
+    try:
+        return service.get_turn_order()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/prefetch/metrics")
+async def battle_prefetch_metrics(service: CombatService = Depends(get_combat_service)):
+    """다음 행동 추측 실행의 적중률과 낭비된 실행 수를 조회합니다."""
+    return service.prefetch_metrics()
+
+@router.get("/load/metrics")
+async def battle_load_metrics():
+    """부하 컨트롤러의 현재 단계, 부하, 행동 결정 p95 와 LLM 동시 실행 수를 조회합니다."""
+    return load_controller.metrics()
+
+@router.get("/trace/metrics")
+async def battle_trace_metrics(service: CombatService = Depends(get_combat_service)):
+    """행동 결정 기록기(COMBAT_TRACE_DIR 설정 시)의 기록 수와 fsync 횟수를 조회합니다."""
+    return service.trace_metrics()
+
+@router.post("/maps")
+async def battle_register_map(
+    request: BattleMapRequest = Body(..., example=BATTLE_MAP_REQUEST_EXAMPLE),
+    service: CombatService = Depends(get_combat_service)
+):
+    """전투 맵을 등록하고 모든 타일 쌍의 최단 거리를 미리 계산합니다. /battle/start 의 map_id 로 사용합니다."""
+    try:
+        return await service.register_map(request.id, request.tiles)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/maps")
+async def battle_list_maps(service: CombatService = Depends(get_combat_service)):
+    """이 서버 워커에 불러온 전투 맵 목록을 조회합니다."""
+    return service.list_maps()
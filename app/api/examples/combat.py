@@ -6,14 +6,20 @@ BATTLE_START_REQUEST_EXAMPLE = {
       "name": "앤트",
       "type": "monster",
       "traits": ["신중함"],
-      "skills": ["타격", "몸통 박치기", "생존 본능", "대지 가르기"]
+      "skills": ["타격", "몸통 박치기", "생존 본능", "대지 가르기"],
+      "speed": 8
     },
     {
       "id": "monster2",
       "name": "리자드맨",
       "type": "monster",
       "traits": ["충동적", "잔인함"],
-      "skills": ["타격", "포효", "방어 지휘", "날카로운 발톱"]
+      "skills": ["타격", "포효", "방어 지휘", "날카로운 발톱"],
+      "speed": 12,
+      "attack": 14,
+      "defense": 6,
+      "critical_rate": 0.1,
+      "ai_tier": "tactical"
     },
     {
       "id": "player1",
@@ -31,12 +37,17 @@ BATTLE_START_REQUEST_EXAMPLE = {
     }
   ],
   "terrain": "",
-  "weather": ""
+  "weather": "",
+  "decision_deadline": 8.0,
+  "prefetch": False,
+  "map_id": "forest_clearing",
+  "ai_tier": "fused"
 }
 
 # /battle/start 응답 예시
 BATTLE_START_RESPONSE_EXAMPLE = {
-  "status": "success"
+  "status": "success",
+  "battle_id": "3f2b9c1e8d7a4b6c9e0f1a2b3c4d5e6f"
 }
 
 # /battle/action 요청 예시
@@ -94,7 +105,11 @@ BATTLE_ACTION_RESPONSE_EXAMPLE = {
     "dialogue": "땅이.. 그대를 거부한다..",
     "remaining_ap": 2,
     "remaining_mov": 0
-  }
+  },
+  "upcoming_actors": ["monster2", "player1", "player2", "monster1"],
+  "degradation": "full",
+  "ai_tier": "fused",
+  "load_mode": "full"
 }
 
 # API 문서용 설명 텍스트
@@ -103,9 +118,17 @@ BATTLE_ACTION_RESPONSE_EXAMPLE = {
 BATTLE_START_DESCRIPTION = """
 전투 시작 API - 캐릭터, 지형, 날씨 정보 설정
 
-- **characters**: 전투에 참여하는 캐릭터 목록 (플레이어와 몬스터)
-- **terrain**: 전투가 발생하는 지형
-- **weather**: 전투 시 날씨 조건
+- **characters**: 전투에 참여하는 캐릭터 목록 (플레이어와 몬스터). **speed**(선택)는 행동 순서 계산에, **attack/defense/critical_rate/critical_damage**(선택)는 예상 피해량과 처치 확률 계산에 사용됩니다.
+- **terrain**: 전투가 발생하는 지형 (app/data/environment.json 에 정의된 지형은 이동 비용, 사거리, 명중률에 반영됩니다). 이동 가능 칸 수는 ⌊MOV / 이동 비용⌋ 이며, MOV 가 1 이상이면 최소 1칸입니다.
+- **weather**: 전투 시 날씨 조건 (environment.json 에 정의된 날씨는 지형 효과와 함께 적용됩니다)
+- **decision_deadline**: 행동 결정 제한 시간(초, 선택). 시간이 부족하면 대사 생략 → 캐시된 전략 → 규칙 기반 행동 순으로 단계적으로 성능을 낮춥니다.
+- **prefetch**: 다음 몬스터의 행동을 미리 계산할지 여부 (선택, 기본 false)
+- **ai_tier**: 전투 기본 AI 티어 (선택, 기본 full). 캐릭터별 **ai_tier** 로 개별 지정할 수 있습니다.
+  - rule: LLM 없이 규칙 기반 행동 (가장 빠름)
+  - fused: 전략/행동/대사를 한 번의 LLM 호출로 결정
+  - full: 전략 → 행동 계획 → 대사 LLM 그래프
+  - tactical: full 그래프 + 전술 탐색으로 행동 계획 보정 (보스용)
+- **map_id**: /battle/maps 로 등록했거나 app/data/maps 에 정의된 전투 맵 ID (선택). 지정하면 막힌 타일을 피하는 최단 거리로 이동 범위를 계산합니다.
 """
 
 # /battle/action API 설명
@@ -116,5 +139,23 @@ BATTLE_ACTION_DESCRIPTION = """
 - **cycle**: 현재 전투 사이클
 - **turn**: 현재 턴 번호
 - **current_character_id**: 현재 행동할 캐릭터의 ID
+
+응답의 **upcoming_actors** 필드는 속도와 상태 효과를 반영해 예측한 이후 행동 순서입니다.
+응답의 **ai_tier** 필드는 행동 결정에 사용한 AI 티어입니다.
+응답의 **degradation** 필드는 적용된 성능 저하 단계(full/no_dialogue/cached_strategy/rule_based/fallback)를 나타냅니다.
+응답의 **load_mode** 필드(와 X-AI-Load-Mode 헤더)는 서버 부하로 적용된 부하 단계(full/no_dialogue/cached_strategy/rule_based)를 나타냅니다.
+`?resolve=true` 로 요청하면 **outcome** 필드에 서버에서 예측한 행동 결과(예상 HP 변화, 부여되는 상태 효과와 지속 시간, 다음 턴 상태)가 포함됩니다.
 ```
-""" 
\ No newline at end of file
+""" 
+
+# /battle/maps 요청 예시
+BATTLE_MAP_REQUEST_EXAMPLE = {
+  "id": "small_arena",
+  "tiles": [
+    "......",
+    "..##..",
+    "......",
+    "..##..",
+    "......"
+  ]
+}
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any
+
+from app.ai.gateway import llm_gateway
+from app.ai.ledger import usage_ledger
+
+router = APIRouter(prefix="/llm", tags=["llm"])
+
+@router.get("/scheduler")
+async def get_scheduler_metrics() -> Dict[str, Any]:
+    """LLM 스케줄러의 우선순위 클래스별 대기열 길이와 대기 시간을 조회합니다."""
+    return {
+        "circuit_breaker": llm_gateway.breaker.state,
+        "scheduler": llm_gateway.scheduler.metrics()
+    }
+
+@router.get("/usage")
+async def get_usage(
+    group_by: str = Query("feature", description="집계 기준 (feature, model, battle, user)"),
+    top: int = Query(20, ge=1, le=1000, description="비용 상위 항목 수")
+) -> Dict[str, Any]:
+    """LLM 호출 토큰 사용량(입력/출력/캐시), 평균 지연 시간, 예상 비용을 기능/모델/전투/사용자별로 집계해 비용 순으로 조회합니다."""
+    try:
+        return usage_ledger.summary(group_by, top)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
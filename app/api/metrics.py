@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import registry
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """노드 실행 시간, LLM 호출 시간/토큰 수, 캐시 적중률, 폴백 수, 요청당 DB 쿼리 수, 웹소켓 세션 수를 Prometheus text format 으로 조회합니다."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Any, Dict, List, Optional
+
+from app.utils.profiling import is_authorized, profile_store
+
+router = APIRouter(prefix="/debug/profiles", tags=["profiling"])
+
+def require_profile_token(x_profile_token: Optional[str] = Header(default=None)):
+    if not is_authorized(x_profile_token):
+        raise HTTPException(status_code=403, detail="프로파일 조회 권한이 없습니다.")
+
+@router.get("", dependencies=[Depends(require_profile_token)])
+async def list_profiles() -> List[Dict[str, Any]]:
+    """이 워커에 저장된 최근 요청 프로파일 목록을 조회합니다."""
+    return profile_store.list()
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profile_token)])
+async def get_profile(profile_id: str) -> Dict[str, Any]:
+    """요청 프로파일의 구간(노드/DB/LLM) 시간을 조회합니다. 요청 시 x-profile-id 응답 헤더로 받은 ID를 사용합니다."""
+    try:
+        return profile_store.get(profile_id).as_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/{profile_id}/folded", dependencies=[Depends(require_profile_token)])
+async def download_profile_stacks(profile_id: str) -> PlainTextResponse:
+    """스택 샘플을 flamegraph 용 folded stack 파일로 내려받습니다."""
+    try:
+        profile = profile_store.get(profile_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return PlainTextResponse(
+        profile.folded(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+    )
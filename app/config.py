@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from pymongo import MongoClient
@@ -8,6 +9,27 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)),
 class Settings(BaseModel):
     OPENAI_API_KEY: str
     OPENAI_MODEL: str
+    OPENAI_BASE_URL: Optional[str]
+
+    LLM_MAX_CONNECTIONS: int
+    LLM_MAX_IN_FLIGHT: int
+    LLM_TIMEOUT: float
+    LLM_MAX_RETRIES: int
+    LLM_BREAKER_THRESHOLD: int
+    LLM_BREAKER_RECOVERY: float
+
+    COMBAT_DECISION_DEADLINE: float
+    MAP_CACHE_DIR: str
+    COMBAT_TRACE_DIR: str
+    COMBAT_PROMPT_TOKEN_BUDGET: int
+    COMBAT_LOAD_SHED_P95: float
+    LLM_LEDGER_DIR: str
+
+    LOG_LEVEL: str
+    LOG_LEVELS: str
+    LOG_STATE_SAMPLE_RATE: float
+    LOG_MAX_FIELD_CHARS: int
+    PROFILE_TOKEN: str
     
     DATABASE_HOST: str
     DATABASE_NAME: str
@@ -36,6 +58,24 @@ class Settings(BaseModel):
 settings = Settings(
     OPENAI_API_KEY=os.getenv("OPENAI_API_KEY")
     , OPENAI_MODEL=os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    , OPENAI_BASE_URL=os.getenv("OPENAI_BASE_URL") or None
+    , LLM_MAX_CONNECTIONS=int(os.getenv("LLM_MAX_CONNECTIONS", 32))
+    , LLM_MAX_IN_FLIGHT=int(os.getenv("LLM_MAX_IN_FLIGHT", 24))
+    , LLM_TIMEOUT=float(os.getenv("LLM_TIMEOUT", 20))
+    , LLM_MAX_RETRIES=int(os.getenv("LLM_MAX_RETRIES", 2))
+    , LLM_BREAKER_THRESHOLD=int(os.getenv("LLM_BREAKER_THRESHOLD", 5))
+    , LLM_BREAKER_RECOVERY=float(os.getenv("LLM_BREAKER_RECOVERY", 30))
+    , COMBAT_DECISION_DEADLINE=float(os.getenv("COMBAT_DECISION_DEADLINE", 8))
+    , MAP_CACHE_DIR=os.getenv("MAP_CACHE_DIR", "app/data/maps/cache")
+    , COMBAT_TRACE_DIR=os.getenv("COMBAT_TRACE_DIR", "")
+    , COMBAT_PROMPT_TOKEN_BUDGET=int(os.getenv("COMBAT_PROMPT_TOKEN_BUDGET", 1500))
+    , COMBAT_LOAD_SHED_P95=float(os.getenv("COMBAT_LOAD_SHED_P95", 4))
+    , LLM_LEDGER_DIR=os.getenv("LLM_LEDGER_DIR", "")
+    , LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO")
+    , LOG_LEVELS=os.getenv("LOG_LEVELS", "sqlalchemy.engine=WARNING,httpx=WARNING")
+    , LOG_STATE_SAMPLE_RATE=float(os.getenv("LOG_STATE_SAMPLE_RATE", 0.01))
+    , LOG_MAX_FIELD_CHARS=int(os.getenv("LOG_MAX_FIELD_CHARS", 500))
+    , PROFILE_TOKEN=os.getenv("PROFILE_TOKEN", "")
     , DATABASE_HOST=os.getenv("DATABASE_HOST")
     , DATABASE_NAME=os.getenv("DATABASE_NAME")
     , DATABASE_USER=os.getenv("DATABASE_USER")
@@ -1,10 +1,29 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.config import settings
+from app.utils.metrics import count_db_query
+from app.utils.profiling import current_profile, record_span
 
-engine = create_engine(settings.POSTGRESQL_URL, echo=True)
+# SQL 로그는 echo 대신 LOG_LEVELS 의 sqlalchemy.engine 레벨로 조절
+engine = create_engine(settings.POSTGRESQL_URL, echo=False)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
+# 요청당 DB 쿼리 수 지표 및 프로파일링 중인 요청의 쿼리 구간 기록
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    count_db_query()
+    if current_profile() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_list = conn.info.get("query_started")
+    if started_list:
+        started = started_list.pop()
+        record_span("db", statement[:200], started, time.perf_counter() - started)
+
 mongo_client = settings.MONGO_CONFIG
\ No newline at end of file
@@ -11,10 +11,23 @@ from app.api.characters import ws_router as characters_ws_router
 from app.api.items import router as items_router
 from app.api.me import router as me_router
 from app.api.npc_chat import router as npc_chat_router
+from app.api.llm import router as llm_router
+from app.api.metrics import router as metrics_router
+from app.api.profiling import router as profiling_router
+from app.ai.gateway import llm_gateway
+from app.ai.ledger import usage_ledger
+from app.utils.battle_map import map_registry
+from app.services.combat import decision_recorder
+from app.utils.metrics import MetricsMiddleware
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.log import setup_logging, shutdown_logging
 
 # 환경 변수 로드
 load_dotenv()
 
+# 대기열 기반 구조화 로깅 (출력은 백그라운드 스레드에서 수행)
+setup_logging()
+
 # FastAPI 앱 생성
 app = FastAPI(title="Loreless AI Server")
 
@@ -27,6 +40,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 처리 시간 및 요청당 DB 쿼리 수 지표
+app.add_middleware(MetricsMiddleware)
+
+# x-profile-token 헤더가 있는 요청만 프로파일링 (PROFILE_TOKEN 설정 시)
+app.add_middleware(ProfilingMiddleware)
+
 # 라우터 등록
 app.include_router(combat_router)
 app.include_router(users_router)
@@ -36,6 +55,23 @@ app.include_router(characters_ws_router)
 app.include_router(items_router)
 app.include_router(me_router)
 app.include_router(npc_chat_router)
+app.include_router(llm_router)
+app.include_router(metrics_router)
+app.include_router(profiling_router)
+
+@app.on_event("startup")
+async def startup():
+    """app/data/maps 의 전투 맵 등록 (최단 거리 파일이 이미 있으면 메모리 매핑만 수행)"""
+    map_registry.load_definitions()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """공유 LLM HTTP 커넥션 풀 정리, 버퍼에 남은 행동 결정 기록/LLM 사용량 원장 저장 및 남은 로그 출력"""
+    await llm_gateway.aclose()
+    if decision_recorder is not None:
+        decision_recorder.close()
+    usage_ledger.close()
+    shutdown_logging()
 
 @app.get("/")
 async def root():
@@ -1,6 +1,13 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Tuple, Literal
 
+# AI 티어 (연산량 순)
+# - rule: LLM 없이 규칙 기반 행동
+# - fused: 전략/행동/대사를 한 번의 LLM 호출로 결정
+# - full: 전략 → 행동 계획 → 대사 LLM 그래프
+# - tactical: full 그래프 + 전술 탐색으로 행동 계획 보정
+AITier = Literal["rule", "fused", "full", "tactical"]
+
 # 캐릭터 공통 필드
 class CharacterBase(BaseModel):
     id: str
@@ -11,11 +18,26 @@ class CharacterConfig(CharacterBase):
     type: Literal["monster", "player"]
     traits: List[str]
     skills: List[str]
+    speed: Optional[int] = Field(default=None, description="캐릭터의 속도 (행동 순서 계산용, 없으면 기본값)")
+    attack: Optional[int] = Field(default=None, description="캐릭터의 공격력 (예상 피해량 계산용, 없으면 기본값)")
+    defense: Optional[int] = Field(default=None, description="캐릭터의 방어력 (없으면 기본값)")
+    critical_rate: Optional[float] = Field(default=None, description="치명타 확률 0~1 (없으면 기본값)")
+    critical_damage: Optional[float] = Field(default=None, description="치명타 피해 배율 (없으면 기본값)")
+    ai_tier: Optional[AITier] = Field(default=None, description="캐릭터별 AI 티어 (없으면 전투 기본 티어)")
 
 class BattleInitRequest(BaseModel):
     characters: List[CharacterConfig]
     terrain: str
     weather: str
+    decision_deadline: Optional[float] = Field(default=None, gt=0, description="행동 결정 제한 시간(초, 0보다 커야 함). 없으면 서버 기본값 사용")
+    prefetch: bool = Field(default=False, description="다음 몬스터 행동 미리 계산 여부")
+    map_id: Optional[str] = Field(default=None, pattern=r"^[A-Za-z0-9_-]+$", description="등록된 전투 맵 ID (없으면 장애물 없는 격자)")
+    ai_tier: AITier = Field(default="full", description="전투 기본 AI 티어 (rule/fused/full/tactical)")
+
+# 전투 맵 등록 요청용
+class BattleMapRequest(BaseModel):
+    id: str = Field(pattern=r"^[A-Za-z0-9_-]+$", description="맵 ID")
+    tiles: List[str] = Field(description="맵 타일 (행 = y, 열 = x, '.' 이동 가능, '#' 막힘)")
 
 # 전투 판단 요청용
 class CharacterState(CharacterBase):
@@ -41,10 +63,39 @@ class CharacterAction(BaseModel):
     remaining_ap: int = Field(default=None, description="남은 AP")
     remaining_mov: int = Field(default=None, description="남은 MOV")
 
+# 행동 결과 예측 (resolve 옵션 사용 시)
+class HpDelta(BaseModel):
+    character_id: str = Field(description="HP 가 바뀌는 캐릭터의 ID")
+    source: str = Field(description="HP 변화 원인 (스킬 이름)")
+    delta: int = Field(description="일반 명중 시 HP 변화량 (피해는 음수)")
+    critical_delta: int = Field(description="치명타 시 HP 변화량")
+    expected_delta: float = Field(description="명중률과 치명타 확률을 반영한 HP 변화 기댓값")
+    hit_chance: float = Field(description="명중 확률 (지형/날씨 보정)")
+    critical_chance: float = Field(description="치명타 확률")
+
+class AppliedStatusEffect(BaseModel):
+    character_id: str = Field(description="상태 효과가 걸리는 캐릭터의 ID")
+    effect: str = Field(description="상태 효과 이름")
+    duration: int = Field(description="지속 턴 수")
+    refreshed: bool = Field(default=False, description="이미 걸려 있던 효과의 지속 시간을 갱신하는지 여부")
+
+class ActionOutcome(BaseModel):
+    valid: bool = Field(description="행동이 규칙에 맞는지 여부 (false 이면 결과를 적용하지 않음)")
+    violations: List[str] = Field(default_factory=list, description="규칙을 어긴 항목")
+    hp_deltas: List[HpDelta] = Field(default_factory=list, description="예상 HP 변화")
+    applied_effects: List[AppliedStatusEffect] = Field(default_factory=list, description="부여되는 상태 효과와 지속 시간")
+    knocked_out: List[str] = Field(default_factory=list, description="일반 명중 시 쓰러지는 캐릭터 ID")
+    resulting_state: BattleState = Field(description="행동을 적용한 다음 턴 예측 상태 (일반 명중 기준)")
+
 class BattleActionResponse(BaseModel):
     current_character_id: str = Field(description="현재 행동 대상 캐릭터의 ID")
     # actions: List[CharacterAction] = Field(description="해당 턴에 사용하는 캐릭터의 행동 목록 (최대한 많은 행동을 수행하는 것이 중요)")
     action: CharacterAction = Field(description="해당 턴에 사용하는 캐릭터의 행동")
+    upcoming_actors: List[str] = Field(default_factory=list, description="속도 기반으로 예측한 이후 행동 캐릭터 ID 순서")
+    degradation: str = Field(default="full", description="제한 시간 부족으로 적용된 성능 저하 단계 (full/no_dialogue/cached_strategy/rule_based/fallback)")
+    ai_tier: str = Field(default="full", description="행동 결정에 사용한 AI 티어 (rule/fused/full/tactical)")
+    load_mode: str = Field(default="full", description="서버 부하로 적용된 부하 단계 (full/no_dialogue/cached_strategy/rule_based)")
+    outcome: Optional[ActionOutcome] = Field(default=None, description="서버에서 예측한 행동 결과 (resolve 옵션 사용 시)")
     
 
 # AI 판단 용 모델
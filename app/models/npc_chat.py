@@ -1,8 +1,10 @@
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, Field
 
 class ChatRequest(BaseModel):
     question: str
     personality: str
+    user_id: Optional[str] = Field(default=None, description="LLM 토큰 사용량 집계용 사용자 ID")
     
 
 class ChatResponse(BaseModel):
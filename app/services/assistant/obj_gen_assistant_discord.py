@@ -5,11 +5,12 @@ from datetime import datetime, timezone, timedelta
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 
+from app.ai.gateway import llm_gateway
+
 # Load environment variables
 load_dotenv(override=True)
 
@@ -97,13 +98,12 @@ item_prompt = ChatPromptTemplate.from_template("""
 """
 )
 
-# 4) Initialize LLM chain
-llm = ChatOpenAI(
-    temperature=0.6,
-    model="gpt-4.1-nano",
-    openai_api_key=os.getenv("OPENAI_API_KEY")
-)
-chain = (item_prompt | llm)
+# 4) LLM chain (호출은 공용 llm_gateway 사용)
+ITEM_MODEL = "gpt-4.1-nano"
+
+async def chain(**inputs) -> str:
+    prompt = item_prompt.format_messages(**inputs)[0].content
+    return await llm_gateway.chat("item_gen", prompt, model=ITEM_MODEL, temperature=0.6)
 
 # 5) Stateful designer class
 default_steps = ("function", "scene_desc")
@@ -128,15 +128,17 @@ class ItemDesigner:
             self.scene_desc = user_input
             docs = self.retriever.invoke(self.scene_desc)
             merged = "\n\n".join(d.page_content for d in docs[:3])
-            summary = await llm.ainvoke(f"다음 문맥을 3문장 이내로 요약:\n{merged}")
+            summary = await llm_gateway.chat(
+                "item_gen", f"다음 문맥을 3문장 이내로 요약:\n{merged}", model=ITEM_MODEL, temperature=0.6
+            )
             # Generate final item
-            result = await self.chain.ainvoke({
-                "function": self.function,
-                "loreless_summary": self.lore_summary,
-                "scene_summary": summary
-            })
+            result = await self.chain(
+                function=self.function,
+                loreless_summary=self.lore_summary,
+                scene_summary=summary
+            )
             self.reset()
-            return getattr(result, "content", result)
+            return result
             # 메타데이터를 제외한 순수 텍스트만 반환
             #return result.content if hasattr(result, "content") else result
 
@@ -1,6 +1,5 @@
 import json
 import uuid
-from openai import AsyncOpenAI
 from sqlalchemy.orm import Session
 
 from app.db.characters import Character, CharacterStats
@@ -8,8 +7,8 @@ from app.db.users import Users
 
 from app.models.characters import CharacterCreateRequest, CharacterUpdateRequest, CharacterStatsUpdateRequest, CharacterInfoRequest
 from app.config import settings
-
-openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+from app.ai.gateway import llm_gateway
+from app.ai.ledger import usage_tags
 
 ALLOWED_TRAITS = [
     "강인함", "잔잔함", "호전적", "충동적", "수비적", "신중함", "관찰꾼", "잔인함",
@@ -17,6 +16,44 @@ ALLOWED_TRAITS = [
     "고립적", "지능적", "냉정함", "원한꾼", "민첩함"
 ]
 
+# 캐릭터 생성 대화의 고정 지시문 (모든 세션에서 바이트 단위로 같아야 제공자 프롬프트 캐시를 재사용)
+CHARACTER_CREATION_PROMPT = (
+    "당신은 판타지 세계의 신비로운 존재입니다.\n"
+    "이 세계를 찾아온 이방인(사용자)에게 직접적으로 직업이나 성격을 묻지 말고, "
+    "대화를 통해 그들의 기질과 성향을 파악하세요.\n"
+    "최종 목표는 그들의 내면을 알아차리고 다음 두 직업 중 하나를 결정하는 것입니다:\n"
+    "- warrior (전사): 강력한 근접 전투 능력과 높은 방어력을 가진 직업\n"
+    "- archer (궁수): 원거리 공격과 높은 기동성을 가진 직업\n\n"
+    "또한 아래 고정된 성격 목록 중에서 3개를 추론해야 합니다:\n"
+    "성격 목록:\n"
+    "강인함, 잔잔함, 호전적, 충동적, 수비적, 신중함, 관찰꾼, 잔인함, "
+    "겁쟁이, 허세꾼, 교란꾼, 파괴적, 협동적, 용감함, 조화적, "
+    "고립적, 지능적, 냉정함, 원한꾼, 민첩함\n\n"
+    "5회의 대화 이후 서버가 이름과 성별을 요청할 것입니다.\n"
+    "그대는 부드럽운 어조를 유지해야 하며, "
+    "사용자의 깊은 본질을 끌어내기 위해 노력해야 합니다."
+    "개별 질문은 각각 30자 이내로 구성되며, "
+    "답변을 양자 택일할 수 있도록 물어봐야합니다."
+    "몇 번째 질문인지 말하지 않아도 됩니다."
+    "감사합니다, 훌륭합니다 등의 대답을 하지 않아도 됩니다."
+)
+
+# 대화 종료 후 직업/성격 추론 지시문 (고정 부분, 이름/성별은 뒤에 덧붙임)
+CHARACTER_SUMMARY_PROMPT = (
+    "지금까지 사용자와 나눈 대화를 바탕으로 다음 정보를 추론하여 JSON으로 출력하세요.\n"
+    "- 직업 (warrior 또는 archer 중 하나)\n"
+    "- 성격 (아래 목록 중 3개 고르세요)\n\n"
+    "성격 목록:\n"
+    "강인함, 잔잔함, 호전적, 충동적, 수비적, 신중함, 관찰꾼, 잔인함, "
+    "겁쟁이, 허세꾼, 교란꾼, 파괴적, 협동적, 용감함, 조화적, "
+    "고립적, 지능적, 냉정함, 원한꾼, 민첩함\n\n"
+    "반드시 아래 JSON 형태로만 출력하세요.\n"
+    "{\n"
+    "  \"job\": \"warrior\",\n"
+    "  \"traits\": [\"강인함\", \"용감함\", \"민첩함\"]\n"
+    "}\n\n"
+)
+
 def get_character(request: CharacterInfoRequest, db: Session) -> Character:
     character = db.query(Character).filter_by(user_id=request.user_id).order_by(Character.created_time.desc()).first()
     return character
@@ -100,26 +137,7 @@ class CharacterCreationService:
         self.sessions[user_id] = {
             "websocket": websocket,
             "history": [
-                {"role": "system", "content": (
-                    "당신은 판타지 세계의 신비로운 존재입니다.\n"
-                    "이 세계를 찾아온 이방인(사용자)에게 직접적으로 직업이나 성격을 묻지 말고, "
-                    "대화를 통해 그들의 기질과 성향을 파악하세요.\n"
-                    "최종 목표는 그들의 내면을 알아차리고 다음 두 직업 중 하나를 결정하는 것입니다:\n"
-                    "- warrior (전사): 강력한 근접 전투 능력과 높은 방어력을 가진 직업\n"
-                    "- archer (궁수): 원거리 공격과 높은 기동성을 가진 직업\n\n"
-                    "또한 아래 고정된 성격 목록 중에서 3개를 추론해야 합니다:\n"
-                    "성격 목록:\n"
-                    "강인함, 잔잔함, 호전적, 충동적, 수비적, 신중함, 관찰꾼, 잔인함, "
-                    "겁쟁이, 허세꾼, 교란꾼, 파괴적, 협동적, 용감함, 조화적, "
-                    "고립적, 지능적, 냉정함, 원한꾼, 민첩함\n\n"
-                    "5회의 대화 이후 서버가 이름과 성별을 요청할 것입니다.\n"
-                    "그대는 부드럽운 어조를 유지해야 하며, "
-                    "사용자의 깊은 본질을 끌어내기 위해 노력해야 합니다."
-                    "개별 질문은 각각 30자 이내로 구성되며, "
-                    "답변을 양자 택일할 수 있도록 물어봐야합니다."
-                    "몇 번째 질문인지 말하지 않아도 됩니다."
-                    "감사합니다, 훌륭합니다 등의 대답을 하지 않아도 됩니다."
-                )}
+                {"role": "system", "content": CHARACTER_CREATION_PROMPT}
             ],
             "message_count": 0,
             "stage": "chatting",
@@ -160,7 +178,8 @@ class CharacterCreationService:
                 await websocket.send_text("알겠습니다. 앞으로의 모험을 위해 캐릭터의 이름을 지정해주세요.")
             else:
                 # 자연스러운 대화 이어가기
-                next_response = await self.ask_llm(session["history"])
+                with usage_tags(user_id=user_id):
+                    next_response = await self.ask_llm(session["history"])
                 session["history"].append({"role": "assistant", "content": next_response})
                 await websocket.send_text(next_response)
 
@@ -189,45 +208,38 @@ class CharacterCreationService:
 
     async def ask_llm(self, history: list):
         """자연스러운 대화용 LLM 호출"""
-        response = await openai_client.chat.completions.create(
+        response = await llm_gateway.chat(
+            "char_creation",
+            history,
             model=settings.OPENAI_MODEL,
-            messages=history,
             temperature=0.7,
         )
-        return response.choices[0].message.content.strip()
+        return response.strip()
 
     async def finalize_character(self, user_id: str):
         """대화 기록과 이름/성별을 종합해 캐릭터 최종 생성"""
         session = self.sessions.get(user_id)
         websocket = session["websocket"]
 
+        # 고정 지시문을 앞에, 세션마다 다른 이름/성별을 뒤에 둠
         summarize_prompt = (
-            "지금까지 사용자와 나눈 대화를 바탕으로 다음 정보를 추론하여 JSON으로 출력하세요.\n"
-            "- 직업 (warrior 또는 archer 중 하나)\n"
-            "- 성격 (아래 목록 중 3개 고르세요)\n\n"
-            "성격 목록:\n"
-            "강인함, 잔잔함, 호전적, 충동적, 수비적, 신중함, 관찰꾼, 잔인함, "
-            "겁쟁이, 허세꾼, 교란꾼, 파괴적, 협동적, 용감함, 조화적, "
-            "고립적, 지능적, 냉정함, 원한꾼, 민첩함\n\n"
-            f"캐릭터 이름: {session['user_inputs']['character_name']}\n"
-            f"성별: {session['user_inputs']['gender']}\n\n"
-            "반드시 아래 JSON 형태로만 출력하세요.\n"
-            "{\n"
-            "  \"job\": \"warrior\",\n"
-            "  \"traits\": [\"강인함\", \"용감함\", \"민첩함\"]\n"
-            "}"
+            CHARACTER_SUMMARY_PROMPT
+            + f"캐릭터 이름: {session['user_inputs']['character_name']}\n"
+            + f"성별: {session['user_inputs']['gender']}"
         )
 
         extended_history = session["history"] + [{"role": "user", "content": summarize_prompt}]
         
-        response = await openai_client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=extended_history,
-            temperature=0.3,
-        )
+        with usage_tags(user_id=user_id):
+            response = await llm_gateway.chat(
+                "char_creation",
+                extended_history,
+                model=settings.OPENAI_MODEL,
+                temperature=0.3,
+            )
 
         try:
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(response)
             result["traits"] = self.validate_traits(result.get("traits", []))
 
             await self.save_character(user_id, result, session["user_inputs"])
@@ -1,42 +1,146 @@
-from typing import Dict, Any, List
+import asyncio
+import uuid
+from typing import Dict, Any, List, Optional
 from app.models.combat import (
     CharacterConfig, 
     BattleState, 
     BattleActionResponse
 )
 from app.ai.combat import CombatAI
+from app.ai.combat.recorder import DecisionRecorder
+from app.ai.combat.prefetch import DecisionPrefetcher
+from app.ai.ledger import usage_tags
+from app.services.turn_order import TurnOrderScheduler
+from app.utils.singleflight import SingleFlight, canonical_key
+from app.utils.battle_map import map_registry
+from app.config import settings
+
+# 동일한 BattleState 재시도 요청에 결과를 재사용하는 시간 (초)
+ACTION_RESULT_TTL = 30.0
+
+# 행동 결정 기록기 (COMBAT_TRACE_DIR 이 비어 있으면 기록하지 않음)
+decision_recorder = DecisionRecorder(settings.COMBAT_TRACE_DIR) if settings.COMBAT_TRACE_DIR else None
 
 class CombatService:
     def __init__(self):
         self.battle_config_map: Dict[str, Any] = {}
         self.combat_ai = None
+        # 현재 전투 ID (LLM 토큰 사용량 원장의 전투별 집계에 사용)
+        self.battle_id: Optional[str] = None
+        # 동일한 전투 상태에 대한 동시/재시도 요청을 하나의 AI 실행으로 합침
+        # (폴백 행동은 저장하지 않아 LLM 이 복구되면 재시도 요청이 다시 판단함)
+        self.single_flight = SingleFlight(ttl=ACTION_RESULT_TTL, name="battle_action",
+                                          cacheable=lambda response: response.degradation != "fallback")
+        # 다음 몬스터 행동 추측 실행기 (prefetch 옵션 사용 시)
+        self.prefetcher: Optional[DecisionPrefetcher] = None
+        # 속도 기반 행동 순서 스케줄러
+        self.turn_order: Optional[TurnOrderScheduler] = None
 
-    async def start_battle(self, characters: List[CharacterConfig], terrain: str, weather: str):
+    async def start_battle(self, characters: List[CharacterConfig], terrain: str, weather: str,
+                           decision_deadline: Optional[float] = None, prefetch: bool = False,
+                           map_id: Optional[str] = None, ai_tier: str = "full"):
         """전투 시작시 설정을 저장합니다"""
+        if map_id:
+            # 등록되지 않은 맵이면 ValueError, 다른 워커가 등록한 맵은 디스크에서 불러옴
+            await asyncio.to_thread(map_registry.get, map_id)
+        
         self.battle_config_map = {
             "characters": {char.id: char for char in characters},
             "terrain": terrain,
-            "weather": weather
+            "weather": weather,
+            "decision_deadline": decision_deadline,
+            "prefetch": prefetch,
+            "map_id": map_id,
+            "ai_tier": ai_tier
         }
         
         # CombatAI 초기화 - 설정 정보 전달
         self.combat_ai = CombatAI(
             config_map=self.battle_config_map["characters"],
             terrain=terrain,
-            weather=weather
+            weather=weather,
+            decision_deadline=decision_deadline,
+            map_id=map_id,
+            ai_tier=ai_tier,
+            recorder=decision_recorder
         )
+        self.battle_id = uuid.uuid4().hex
+        # 이전 전투의 결과 재사용 방지
+        self.single_flight.clear()
+        if self.prefetcher:
+            self.prefetcher.discard()
+        self.prefetcher = DecisionPrefetcher(self.combat_ai) if prefetch else None
+        self.turn_order = TurnOrderScheduler(self.battle_config_map["characters"])
         
-        return {"status": "success"}
+        return {"status": "success", "battle_id": self.battle_id}
 
-    async def decide_actions(self, state: BattleState) -> BattleActionResponse:
-        """AI를 통해 캐릭터의 행동을 결정합니다"""
+    async def decide_actions(self, state: BattleState, resolve: bool = False) -> BattleActionResponse:
+        """AI를 통해 캐릭터의 행동을 결정합니다 (resolve=True 이면 행동 결과 예측 포함)"""
         try:
             if not self.combat_ai:
                 raise ValueError("전투가 시작되지 않았습니다. start_battle을 먼저 호출하세요.")
                 
-            # AI에 상태 전달하여 행동 결정
-            return await self.combat_ai.get_character_action(state)
+            # AI에 상태 전달하여 행동 결정 (동일한 상태의 중복 요청은 결과 공유)
+            # 추측 실행 태스크도 이 컨텍스트를 복사하므로 같은 전투 ID 로 집계됨
+            combat_ai = self.combat_ai
+            with usage_tags(battle_id=self.battle_id):
+                response = await self.single_flight.do(
+                    # 같은 상태라도 다른 전투의 결과를 공유하지 않도록 전투 ID 포함
+                    canonical_key(self.battle_id, state),
+                    lambda: self._decide(combat_ai, self.prefetcher, self.turn_order, state)
+                )
+            if not resolve:
+                return response
+
+            # 공유된 응답 객체는 바꾸지 않고 사본에 결과 예측 추가
+            return response.model_copy(update={"outcome": combat_ai.resolve(state, response, response.upcoming_actors)})
         
         except Exception as e:
             raise ValueError(f"행동 결정 중 오류 발생: {str(e)}")
-        
\ No newline at end of file
+
+    async def _decide(self, combat_ai: CombatAI, prefetcher: Optional[DecisionPrefetcher],
+                      turn_order: TurnOrderScheduler, state: BattleState) -> BattleActionResponse:
+        """미리 계산된 결과가 있으면 사용하고, 없으면 AI 실행 후 다음 행동 미리 계산"""
+        response = await prefetcher.take(state) if prefetcher else None
+        if response is None:
+            response = await combat_ai.get_character_action(state)
+
+        # 이후 행동 순서 공개
+        response.upcoming_actors = turn_order.upcoming(state)
+
+        if prefetcher:
+            prefetcher.schedule(state, response, response.upcoming_actors)
+        return response
+
+    def get_turn_order(self) -> Dict[str, Any]:
+        """마지막으로 계산한 행동 대기열"""
+        if not self.turn_order:
+            raise ValueError("전투가 시작되지 않았습니다. start_battle을 먼저 호출하세요.")
+        return {"upcoming_actors": self.turn_order.queue}
+
+    async def register_map(self, map_id: str, tiles: List[str]) -> Dict[str, Any]:
+        """전투 맵 등록 (모든 타일 쌍 최단 거리 계산은 스레드에서 수행)"""
+        battle_map = await asyncio.to_thread(map_registry.register, map_id, tiles)
+        return {
+            "id": battle_map.map_id,
+            "width": battle_map.width,
+            "height": battle_map.height,
+            "walkable_tiles": len(battle_map.cells)
+        }
+
+    def list_maps(self) -> List[Dict[str, Any]]:
+        """이 워커에 불러온 전투 맵 목록"""
+        return map_registry.list_maps()
+
+    def prefetch_metrics(self) -> Dict[str, Any]:
+        """추측 실행 적중률 및 낭비된 실행 수"""
+        if not self.prefetcher:
+            return {"enabled": False}
+        return {"enabled": True, **self.prefetcher.metrics()}
+        
+
+    def trace_metrics(self) -> Dict[str, Any]:
+        """행동 결정 기록 수와 fsync 횟수"""
+        if decision_recorder is None:
+            return {"enabled": False}
+        return {"enabled": True, **decision_recorder.metrics()}
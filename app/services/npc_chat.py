@@ -1,19 +1,34 @@
 from functools import lru_cache
+from typing import Optional
 from app.ai.npc_chat import NPCChatAI  # 변경된 import 경로
 from langchain_chroma import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
+from app.utils.singleflight import SingleFlight, canonical_key
+from app.ai.ledger import usage_tags
+
+# 동일한 질문 재시도 요청에 답변을 재사용하는 시간 (초)
+CHAT_RESULT_TTL = 10.0
 
 class NPCChatService:
     def __init__(self):
         self.ai = NPCChatAI()
+        # 동일한 질문/말투의 동시/재시도 요청을 하나의 LLM 호출로 합침
+        self.single_flight = SingleFlight(ttl=CHAT_RESULT_TTL)
 
-    def chat(self, user_input: str, personality: str) -> str:
+    async def chat(self, user_input: str, personality: str, user_id: Optional[str] = None) -> str:
         retriever = self.get_retriever()
-        return self.ai.chat(user_input, retriever, personality)
+        with usage_tags(user_id=user_id):
+            return await self.single_flight.do(
+                canonical_key({"question": user_input, "personality": personality}),
+                lambda: self.ai.chat(user_input, retriever, personality)
+            )
 
-    def chat_stream(self, user_input: str, personality: str):
+    async def chat_stream(self, user_input: str, personality: str, user_id: Optional[str] = None):
         retriever = self.get_retriever()
-        return self.ai.chat_stream(user_input, retriever, personality)
+        # 스트리밍 응답은 엔드포인트 반환 후 실행되므로 생성기 안에서 태그 지정
+        with usage_tags(user_id=user_id):
+            async for token in self.ai.chat_stream(user_input, retriever, personality):
+                yield token
 
     @lru_cache(maxsize=1)
     def get_embedding_model(self):
@@ -0,0 +1,64 @@
+import heapq
+from typing import Dict, Iterable, List, Optional
+
+from app.models.combat import BattleState, CharacterConfig, CharacterState
+from app.utils.loader import traits_info_all, status_effects_info_all
+
+# 속도 정보가 없는 캐릭터의 기본 속도
+DEFAULT_SPEED = 10
+
+
+def speed_modifier(names: Iterable[str], info_map: Dict[str, Dict]) -> float:
+    """특성/상태 효과 목록의 속도 증감 비율 합계 (stat_cng.spd)"""
+    return sum(info_map.get(name, {}).get("stat_cng", {}).get("spd", 0) for name in names)
+
+
+class TurnOrderScheduler:
+    """속도 기반 행동 순서 스케줄러
+
+    각 사이클마다 살아 있는 캐릭터가 유효 속도가 높은 순서대로 한 번씩 행동한다고 보고,
+    현재 캐릭터 이후의 행동 대기열을 계산합니다.
+    - 유효 속도 = 기본 속도 × (1 + 특성 속도 보정) × (1 + 상태 효과 속도 보정)
+    - 특성 보정은 전투 시작 시 한 번만 계산하고, 상태 효과 보정만 턴마다 적용합니다.
+    - 속도가 같으면 요청의 characters 순서를 따릅니다.
+    """
+
+    def __init__(self, config_map: Dict[str, CharacterConfig]):
+        self.trait_speed: Dict[str, float] = {
+            char_id: (config.speed or DEFAULT_SPEED) * (1 + speed_modifier(config.traits, traits_info_all))
+            for char_id, config in config_map.items()
+        }
+        # 마지막으로 계산한 행동 대기열
+        self.queue: List[str] = []
+
+    def effective_speed(self, character: CharacterState) -> float:
+        base = self.trait_speed.get(character.id, DEFAULT_SPEED)
+        modifier = speed_modifier(character.status_effects, status_effects_info_all)
+        return max(0.0, base * (1 + modifier))
+
+    def cycle_order(self, state: BattleState) -> List[str]:
+        """한 사이클의 행동 순서 (유효 속도 내림차순 우선순위 큐)"""
+        heap = [
+            (-self.effective_speed(character), index, character.id)
+            for index, character in enumerate(state.characters)
+            if character.hp > 0
+        ]
+        heapq.heapify(heap)
+        return [heapq.heappop(heap)[2] for _ in range(len(heap))]
+
+    def upcoming(self, state: BattleState, limit: Optional[int] = None) -> List[str]:
+        """현재 캐릭터 이후의 행동 대기열 (이번 사이클 남은 순서 + 다음 사이클 순서)"""
+        order = self.cycle_order(state)
+        if state.current_character_id in order:
+            index = order.index(state.current_character_id)
+            queue = order[index + 1:] + order
+        else:
+            queue = order
+
+        self.queue = queue[:limit if limit is not None else len(order)]
+        return self.queue
+
+    def next_actor(self, state: BattleState) -> Optional[str]:
+        """다음에 행동할 캐릭터 ID"""
+        queue = self.upcoming(state)
+        return queue[0] if queue else None
@@ -0,0 +1,82 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedAppender:
+    """메모리 버퍼에 모았다가 한 번에 쓰는 추가 전용 기록 버퍼 (전투 기록기, LLM 사용량 원장 공용)
+
+    - append() 는 버퍼에 추가만 하고 바로 반환합니다.
+    - 버퍼가 flush_every 개 이상이면 바로, 아니면 flush_interval 초마다 백그라운드 스레드가 write(items) 를 호출합니다.
+      요청이 끊겨도 마지막 기록이 종료 시점까지 버퍼에 남지 않습니다.
+    - 쓰기는 한 번에 하나만 실행되며, 실패하면 로그를 남기고 errors 를 늘린 뒤 해당 기록은 버립니다.
+    """
+
+    def __init__(self, write: Callable[[List[Any]], None], flush_every: int, flush_interval: float,
+                 name: str = "appender"):
+        self._write = write
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.name = name
+        self._buffer: List[Any] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self.records = 0
+        self.flushes = 0
+        self.errors = 0
+
+    def append(self, item: Any) -> None:
+        """기록 추가 (쓰기 스레드가 없으면 시작)"""
+        with self._lock:
+            self._buffer.append(item)
+            self.records += 1
+            due = len(self._buffer) >= self.flush_every
+            if self._thread is None:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop,), name=self.name, daemon=True)
+                self._thread.start()
+        if due:
+            self._wake.set()
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> bool:
+        """버퍼의 기록을 쓰기 (실패하면 False)"""
+        with self._lock:
+            items, self._buffer = self._buffer, []
+        if not items:
+            return True
+
+        with self._write_lock:
+            try:
+                self._write(items)
+            except Exception:
+                self.errors += 1
+                logger.exception("[%s] 기록 %d건 쓰기 실패", self.name, len(items))
+                return False
+            self.flushes += 1
+        return True
+
+    def close(self) -> None:
+        """쓰기 스레드를 멈추고 남은 기록 쓰기 (이후 append 하면 스레드를 다시 시작)"""
+        with self._lock:
+            thread, stop = self._thread, self._stop
+            self._thread = self._stop = None
+        if thread is not None:
+            stop.set()
+            self._wake.set()
+            thread.join()
+        self.flush()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"records": self.records, "flushes": self.flushes, "errors": self.errors,
+                "buffered": len(self._buffer)}
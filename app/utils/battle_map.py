@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.utils.combat import calculate_reachable_positions
+
+# 맵 타일 기호
+WALKABLE_TILE = "."
+BLOCKED_TILE = "#"
+
+# 도달할 수 없는 타일 쌍의 거리 값 (dtype 최대값)
+UNREACHABLE_UINT8 = np.iinfo(np.uint8).max
+UNREACHABLE_UINT16 = np.iinfo(np.uint16).max
+
+# 기본 맵 정의 디렉터리
+MAP_DEFINITION_DIR = "app/data/maps"
+
+# 맵 ID 형식 (캐시 파일 이름으로 사용하므로 경로 구분자, 줄바꿈 등 불가, 전체 일치로 검사)
+MAP_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+# 맵 크기 제한 (모든 타일 쌍 거리 배열은 [이동 가능 타일 수²] 크기이고 BFS 를 타일마다 실행하므로
+# 이동 가능 타일 1024개 = 거리 배열 2MB 정도로 제한)
+MAX_MAP_SIDE = 64
+MAX_WALKABLE_TILES = 1024
+
+
+def validate_map_id(map_id: str) -> str:
+    if not MAP_ID_PATTERN.fullmatch(map_id or ""):
+        raise ValueError(f"맵 ID 는 영문, 숫자, '_', '-' 만 사용할 수 있습니다: {map_id!r}")
+    return map_id
+
+
+def parse_tiles(tiles: List[str]) -> np.ndarray:
+    """타일 문자열(행 = y, 열 = x)을 [가로 × 세로] 이동 가능 여부 배열로 변환"""
+    if not tiles or not tiles[0]:
+        raise ValueError("맵 타일이 비어 있습니다.")
+    width = len(tiles[0])
+    if width > MAX_MAP_SIDE or len(tiles) > MAX_MAP_SIDE:
+        raise ValueError(f"맵 크기는 가로, 세로 각각 {MAX_MAP_SIDE} 이하여야 합니다: {width}x{len(tiles)}")
+    if any(len(row) != width for row in tiles):
+        raise ValueError("맵 타일의 모든 행은 길이가 같아야 합니다.")
+    invalid = set("".join(tiles)) - {WALKABLE_TILE, BLOCKED_TILE}
+    if invalid:
+        raise ValueError(f"알 수 없는 타일 기호: {''.join(sorted(invalid))}")
+    walkable = sum(row.count(WALKABLE_TILE) for row in tiles)
+    if walkable > MAX_WALKABLE_TILES:
+        raise ValueError(f"이동 가능 타일은 {MAX_WALKABLE_TILES}개 이하여야 합니다: {walkable}")
+    return np.array([[row[x] == WALKABLE_TILE for row in tiles] for x in range(width)], dtype=bool)
+
+
+def all_pairs_distances(walkable: np.ndarray) -> np.ndarray:
+    """이동 가능한 모든 타일 쌍의 최단 이동 거리 (상하좌우 1칸 = 1)
+
+    반환: [타일 수 × 타일 수] 거리 배열 (타일 순서는 np.argwhere(walkable) 순서)
+    최대 거리가 255 미만이면 uint8, 아니면 uint16 으로 저장합니다.
+    """
+    width, height = walkable.shape
+    index = np.full(walkable.shape, -1, dtype=np.int32)
+    cells = list(zip(*np.nonzero(walkable)))
+    for i, (x, y) in enumerate(cells):
+        index[x, y] = i
+
+    neighbors = []
+    for x, y in cells:
+        neighbors.append([
+            int(index[nx, ny])
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+            if 0 <= nx < width and 0 <= ny < height and index[nx, ny] >= 0
+        ])
+
+    count = len(cells)
+    distances = np.full((count, count), UNREACHABLE_UINT16, dtype=np.uint16)
+    for source in range(count):
+        row = distances[source]
+        row[source] = 0
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            next_distance = row[current] + 1
+            for neighbor in neighbors[current]:
+                if row[neighbor] == UNREACHABLE_UINT16:
+                    row[neighbor] = next_distance
+                    queue.append(neighbor)
+
+    finite = distances[distances != UNREACHABLE_UINT16]
+    if finite.size == 0 or finite.max() < UNREACHABLE_UINT8:
+        compact = distances.astype(np.uint8)
+        compact[distances == UNREACHABLE_UINT16] = UNREACHABLE_UINT8
+        distances = compact
+    return distances
+
+
+class BattleMap:
+    """등록된 전투 맵 (이동 가능 타일과 모든 타일 쌍의 최단 거리)
+
+    거리 배열은 디스크에 저장된 파일을 메모리 매핑하므로 여러 워커가 같은 페이지를 공유합니다.
+    """
+
+    def __init__(self, map_id: str, walkable: np.ndarray, index: np.ndarray, distances: np.ndarray):
+        self.map_id = map_id
+        self.walkable = walkable
+        self.index = index
+        self.distances = distances
+        self.width, self.height = walkable.shape
+        self.unreachable = np.iinfo(distances.dtype).max
+        self.cells = np.argwhere(walkable)
+
+    def tile_index(self, position: Tuple[int, int]) -> int:
+        """이동 가능한 타일의 인덱스 (맵 밖이거나 막힌 타일이면 -1)"""
+        x, y = position
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return int(self.index[x, y])
+        return -1
+
+    def is_walkable(self, position: Tuple[int, int]) -> bool:
+        return self.tile_index(position) >= 0
+
+    def distance(self, start: Tuple[int, int], end: Tuple[int, int]) -> Optional[int]:
+        """두 타일 사이 최단 이동 거리 (도달 불가면 None)"""
+        i, j = self.tile_index(start), self.tile_index(end)
+        if i < 0 or j < 0:
+            return None
+        value = int(self.distances[i, j])
+        return None if value == self.unreachable else value
+
+    def can_reach(self, start: Tuple[int, int], end: Tuple[int, int], mov: int) -> bool:
+        distance = self.distance(start, end)
+        return distance is not None and distance <= mov
+
+    def reachable_positions(self, position: Tuple[int, int], mov: int) -> Set[Tuple[int, int]]:
+        """현재 위치에서 MOV 이내로 이동 가능한 타일 집합"""
+        i = self.tile_index(position)
+        if i < 0:
+            return {tuple(position)}
+        reachable = self.cells[self.distances[i] <= mov]
+        return {(int(x), int(y)) for x, y in reachable}
+
+
+def reachable_positions(position: Tuple[int, int], mov: int,
+                        battle_map: Optional[BattleMap] = None) -> Set[Tuple[int, int]]:
+    """맵이 있으면 막힌 타일을 피하는 최단 거리 기준, 없으면 맨해튼 거리 기준 도달 가능한 위치"""
+    if battle_map is not None and battle_map.is_walkable(position):
+        return battle_map.reachable_positions(position, mov)
+    return calculate_reachable_positions(position, mov)
+
+
+class MapRegistry:
+    """전투 맵 등록소
+
+    - 등록 시 모든 타일 쌍의 최단 거리를 계산해 cache_dir 에 .npy 로 저장 (정의 내용 해시가 파일 이름)
+    - 조회 시 저장된 파일을 mmap 으로 열어 같은 서버의 다른 워커와 공유
+    - 다른 워커가 등록한 맵도 cache_dir 의 정의 파일로 찾아 불러옴
+    """
+
+    def __init__(self, cache_dir: str, definition_dir: str = MAP_DEFINITION_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.definition_dir = Path(definition_dir)
+        self._maps: Dict[str, BattleMap] = {}
+        self._lock = threading.Lock()
+
+    def register(self, map_id: str, tiles: List[str]) -> BattleMap:
+        """맵 등록 (같은 정의가 이미 계산되어 있으면 저장된 거리 배열 재사용)"""
+        validate_map_id(map_id)
+        walkable = parse_tiles(tiles)
+        digest = hashlib.sha256("\n".join(tiles).encode("utf-8")).hexdigest()[:16]
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        distance_path = self.cache_dir / f"{map_id}-{digest}.npy"
+
+        definition_path = self.cache_dir / f"{map_id}.json"
+
+        if not distance_path.exists():
+            distances = all_pairs_distances(walkable)
+            self._write_atomic(distance_path, lambda f: np.save(f, distances))
+        if not definition_path.exists() or self._stored_digest(definition_path) != digest:
+            # 다른 워커가 같은 map_id 로 조회할 수 있도록 정의를 함께 저장
+            self._write_atomic(
+                definition_path,
+                lambda f: f.write(json.dumps({"id": map_id, "tiles": tiles, "digest": digest}).encode("utf-8"))
+            )
+
+        battle_map = self._load(map_id, walkable, distance_path)
+        with self._lock:
+            self._maps[map_id] = battle_map
+        return battle_map
+
+    def get(self, map_id: str) -> BattleMap:
+        """등록된 맵 조회 (다른 워커가 등록한 맵은 디스크에서 불러옴)"""
+        battle_map = self._maps.get(map_id)
+        if battle_map is not None:
+            return battle_map
+
+        validate_map_id(map_id)
+        definition_path = self.cache_dir / f"{map_id}.json"
+        if not definition_path.exists():
+            definition_path = self.definition_dir / f"{map_id}.json"
+        if not definition_path.exists():
+            raise ValueError(f"등록되지 않은 맵입니다: {map_id}")
+        with open(definition_path, "r", encoding="utf-8") as f:
+            definition = json.load(f)
+        return self.register(map_id, definition["tiles"])
+
+    def list_maps(self) -> List[Dict[str, int]]:
+        return [
+            {"id": m.map_id, "width": m.width, "height": m.height, "walkable_tiles": len(m.cells)}
+            for m in self._maps.values()
+        ]
+
+    def load_definitions(self) -> None:
+        """정의 디렉터리의 맵을 모두 등록 (서버 시작 시)"""
+        if not self.definition_dir.exists():
+            return
+        for path in sorted(self.definition_dir.glob("*.json")):
+            self.get(path.stem)
+
+    def _stored_digest(self, definition_path: Path) -> Optional[str]:
+        try:
+            with open(definition_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("digest")
+        except (OSError, ValueError):
+            return None
+
+    def _load(self, map_id: str, walkable: np.ndarray, distance_path: Path) -> BattleMap:
+        distances = np.load(distance_path, mmap_mode="r")
+        index = np.full(walkable.shape, -1, dtype=np.int32)
+        cells = np.argwhere(walkable)
+        index[cells[:, 0], cells[:, 1]] = np.arange(len(cells), dtype=np.int32)
+        return BattleMap(map_id, walkable, index, distances)
+
+    def _write_atomic(self, path: Path, write) -> None:
+        """임시 파일에 쓴 뒤 교체 (동시에 등록하는 워커가 반쯤 쓰인 파일을 읽지 않도록)"""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+# 앱 전체에서 공유하는 맵 등록소
+map_registry = MapRegistry(settings.MAP_CACHE_DIR)
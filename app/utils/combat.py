@@ -1,4 +1,4 @@
-from typing import Tuple, Dict, Any, List, Set
+from typing import Tuple, Dict, Any, List, Set, Optional
 
 def calculate_manhattan_distance(pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
     """두 위치 간의 맨하탄 거리(가로+세로 이동 거리)를 계산합니다"""
@@ -81,7 +81,8 @@ def filter_usable_skills(
     target_position: Tuple[int, int],
     mov: int,
     skills: List[str],
-    skill_info_map: Dict[str, Dict]
+    skill_info_map: Dict[str, Dict],
+    reachable_positions: Optional[Set[Tuple[int, int]]] = None
 ) -> Dict[str, List[str]]:
     """현재 위치와 MOV를 고려하여 사용 가능한 스킬을 필터링합니다
     
@@ -91,6 +92,7 @@ def filter_usable_skills(
         mov: 이동력
         skills: 스킬 이름 목록
         skill_info_map: 스킬 정보 맵 (스킬 이름 -> 정보)
+        reachable_positions: 미리 계산한 도달 가능 위치 (전투 맵 사용 시, 없으면 맨해튼 거리로 계산)
     
     Returns:
         Dict[str, List[str]]: 
@@ -108,7 +110,8 @@ def filter_usable_skills(
     current_distance = calculate_manhattan_distance(current_position, target_position)
     
     # 도달 가능한 위치 계산
-    reachable_positions = calculate_reachable_positions(current_position, mov)
+    if reachable_positions is None:
+        reachable_positions = calculate_reachable_positions(current_position, mov)
     
     # 이동 후 가능한 최소 거리 계산
     min_possible_distance = float('inf')
@@ -0,0 +1,76 @@
+from functools import lru_cache
+from typing import Dict
+
+from app.utils.loader import environment_info_all, skill_info_all
+
+# 지형/날씨 정보가 없을 때의 기본 효과 (보정 없음)
+NEUTRAL_EFFECT = {"move_cost": 1.0, "range": 0, "accuracy": 1.0}
+
+# 사거리 보정을 받는 최소 스킬 사거리 (자신 대상/근접 스킬은 보정하지 않음)
+RANGED_SKILL_MIN_RANGE = 2
+
+# MOV 가 1 이상이면 이동 비용과 관계없이 보장하는 최소 이동 칸 수 (클라이언트 규칙과 동일)
+MIN_STEPS = 1
+
+
+class BattleEnvironment:
+    """지형과 날씨 효과를 한 번에 계산해 둔 전투 환경
+
+    - move_cost: 1칸 이동에 필요한 MOV (지형 × 날씨), 이동 가능 칸 수 = max(1, ⌊MOV / move_cost⌋) (MOV 0 이면 0)
+    - range_modifier: 원거리 스킬 사거리 증감 (지형 + 날씨)
+    - accuracy: 명중률 배율 (지형 × 날씨)
+    - skill_info: 사거리 보정을 반영한 스킬 정보 (skill_info_all 과 같은 형식)
+    """
+
+    def __init__(self, terrain: str, weather: str):
+        self.terrain = terrain
+        self.weather = weather
+        terrain_effect = environment_info_all.get("terrain", {}).get(terrain, NEUTRAL_EFFECT)
+        weather_effect = environment_info_all.get("weather", {}).get(weather, NEUTRAL_EFFECT)
+
+        self.move_cost = terrain_effect.get("move_cost", 1.0) * weather_effect.get("move_cost", 1.0)
+        self.range_modifier = terrain_effect.get("range", 0) + weather_effect.get("range", 0)
+        self.accuracy = terrain_effect.get("accuracy", 1.0) * weather_effect.get("accuracy", 1.0)
+        self.skill_info: Dict[str, Dict] = {
+            name: {**info, "range": self._adjust_range(info.get("range", 1))}
+            for name, info in skill_info_all.items()
+        }
+        # MOV → 실제 이동 가능 칸 수 (자주 쓰는 값은 미리 계산)
+        self._movement = [self._steps(mov) for mov in range(16)]
+
+    def _adjust_range(self, skill_range: int) -> int:
+        if skill_range < RANGED_SKILL_MIN_RANGE:
+            return skill_range
+        return max(1, skill_range + self.range_modifier)
+
+    def _steps(self, mov: int) -> int:
+        if mov < 1:
+            return 0
+        return max(MIN_STEPS, int(mov / self.move_cost + 1e-9))
+
+    def movement(self, mov: int) -> int:
+        """MOV로 실제 이동 가능한 칸 수"""
+        if 0 <= mov < len(self._movement):
+            return self._movement[mov]
+        return self._steps(mov)
+
+    def skill_range(self, skill: str) -> int:
+        """지형/날씨 보정을 반영한 스킬 사거리"""
+        return self.skill_info.get(skill, {}).get("range", 1)
+
+    @property
+    def is_neutral(self) -> bool:
+        return self.move_cost == 1.0 and self.range_modifier == 0 and self.accuracy == 1.0
+
+    def describe(self) -> str:
+        """프롬프트에 포함할 지형/날씨 효과 설명"""
+        if self.is_neutral:
+            return ""
+        return (f"지형/날씨 효과: 1칸 이동에 MOV {self.move_cost:g} 소모, "
+                f"원거리 스킬 사거리 {self.range_modifier:+d}, 명중률 {self.accuracy:.0%}")
+
+
+@lru_cache(maxsize=64)
+def compile_environment(terrain: str, weather: str) -> BattleEnvironment:
+    """지형/날씨 조합별 전투 환경 (전투 시작 시 한 번 계산되고 이후 턴에서는 재사용)"""
+    return BattleEnvironment(terrain or "", weather or "")
@@ -13,12 +13,17 @@ def load_status_effects(path='app/data/status_effect.json'):
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
     
+def load_environment(path='app/data/environment.json'):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+    
 # skills = load_skills()
 # traits = load_traits()
 # status_effects = load_status_effects()
 skill_info_all = load_skills()
 traits_info_all = load_traits()
 status_effects_info_all = load_status_effects()
+environment_info_all = load_environment()
 
 prompt_combat_rules = """
 당신은 턴제 RPG 게임의 AI 전투 시스템입니다.
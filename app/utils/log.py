@@ -0,0 +1,132 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+# 로그 대기열 최대 길이 (가득 차면 요청 처리를 막지 않고 버림)
+LOG_QUEUE_SIZE = 10000
+
+# 기록하지 않는 LogRecord 기본 속성
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def truncate(value: Any, limit: Optional[int] = None) -> str:
+    """긴 문자열을 limit 글자로 자르고 잘린 글자 수 표시"""
+    text = value if isinstance(value, str) else str(value)
+    limit = limit or settings.LOG_MAX_FIELD_CHARS
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}...(+{len(text) - limit})"
+
+
+def sampled(rate: float) -> bool:
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def log_state(logger: logging.Logger, message: str, state: Any, rate: Optional[float] = None) -> None:
+    """전체 상태 덤프 로그 (DEBUG 이고 표본으로 뽑힌 경우에만 직렬화)"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if not sampled(settings.LOG_STATE_SAMPLE_RATE if rate is None else rate):
+        return
+    dump = state.model_dump(mode="json") if hasattr(state, "model_dump") else state
+    # 길이 제한은 백그라운드 스레드의 JsonFormatter 에서 적용
+    logger.debug(message, extra={"state": json.dumps(dump, ensure_ascii=False, default=str)})
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 로그 (extra 로 전달한 필드 포함, 긴 값은 잘라서 기록)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": truncate(record.getMessage()),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value if isinstance(value, (int, float, bool)) or value is None else truncate(value)
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """대기열이 가득 차면 기다리지 않고 로그를 버리는 QueueHandler"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 인자만 합치고 JSON 직렬화는 백그라운드 스레드에서 수행
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """'app.ai.combat=DEBUG,sqlalchemy.engine=WARNING' → {로거 이름: 레벨}"""
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.strip().partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> QueueListener:
+    """루트 로거를 대기열 기반 비동기 핸들러로 교체 (실제 출력은 백그라운드 스레드에서 수행)
+
+    - LOG_LEVEL: 기본 레벨
+    - LOG_LEVELS: 하위 시스템별 레벨 (예: app.ai.combat=DEBUG,sqlalchemy.engine=WARNING)
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter())
+    _listener = QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in parse_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    # uvicorn 로거도 같은 대기열로 출력
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """대기열에 남은 로그를 모두 출력하고 백그라운드 스레드 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,217 @@
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.config import settings
+
+# 프로파일링 요청 헤더 (값이 PROFILE_TOKEN 과 같아야 함) / 응답 헤더
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# 스택 샘플링 간격 (초) 및 최대 스택 깊이
+SAMPLE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 64
+
+# 보관하는 프로파일 수 (오래된 것부터 삭제)
+MAX_STORED_PROFILES = 50
+
+# 이 디렉터리의 코드가 포함된 스택만 기록 (대기 중인 스레드 제외)
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class RequestProfile:
+    """한 요청의 구간(노드/DB/LLM) 시간과 스택 샘플"""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.created_at = time.time()
+        self.duration_ms: Optional[float] = None
+        self.status: Optional[int] = None
+        self.spans: List[Dict[str, Any]] = []
+        self.samples: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add_span(self, kind: str, name: str, started: float, elapsed: float, **fields: Any) -> None:
+        span = {
+            "kind": kind,
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 3),
+            "duration_ms": round(elapsed * 1000, 3),
+            **fields,
+        }
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> Dict[str, Any]:
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span["kind"]] = round(totals.get(span["kind"], 0.0) + span["duration_ms"], 3)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "created_at": self.created_at,
+            "duration_ms": self.duration_ms,
+            "span_totals_ms": totals,
+            "sample_count": sum(self.samples.values()),
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), "spans": sorted(self.spans, key=lambda s: s["start_ms"])}
+
+    def folded(self) -> str:
+        """flamegraph 도구용 folded stack 형식 ("루트;...;말단 횟수")"""
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+# 현재 요청의 프로파일 (프로파일링하지 않는 요청은 None)
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+def record_span(kind: str, name: str, started: float, elapsed: float, **fields: Any) -> None:
+    """프로파일링 중인 요청이면 구간 기록 (아니면 아무 것도 하지 않음)"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.add_span(kind, name, started, elapsed, **fields)
+
+
+@contextmanager
+def span(kind: str, name: str, **fields: Any) -> Iterator[None]:
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(kind, name, started, time.perf_counter() - started, **fields)
+
+
+class StackSampler(threading.Thread):
+    """주기적으로 모든 스레드의 스택을 읽어 앱 코드가 포함된 스택을 집계하는 샘플러
+
+    같은 시간에 처리 중인 다른 요청의 스택도 함께 기록될 수 있습니다.
+    """
+
+    def __init__(self, profile: RequestProfile, interval: float = SAMPLE_INTERVAL):
+        super().__init__(name=f"profile-{profile.id}", daemon=True)
+        self.profile = profile
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = self._stack(frame)
+                if stack:
+                    self.profile.samples[stack] += 1
+
+    @staticmethod
+    def _stack(frame) -> Optional[tuple]:
+        names = []
+        in_app = False
+        depth = 0
+        while frame is not None and depth < MAX_STACK_DEPTH:
+            code = frame.f_code
+            in_app = in_app or code.co_filename.startswith(APP_ROOT)
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+            depth += 1
+        return tuple(reversed(names)) if in_app else None
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class ProfileStore:
+    """최근 프로파일 보관소 (워커 메모리)"""
+
+    def __init__(self, max_profiles: int = MAX_STORED_PROFILES):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+
+    def add(self, profile: RequestProfile) -> None:
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> RequestProfile:
+        profile = self._profiles.get(profile_id)
+        if profile is None:
+            raise ValueError(f"프로파일이 없습니다: {profile_id}")
+        return profile
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [profile.summary() for profile in reversed(self._profiles.values())]
+
+
+# 앱 전체에서 공유하는 프로파일 보관소
+profile_store = ProfileStore()
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    """PROFILE_TOKEN 이 설정되어 있고 값이 일치하는지 확인"""
+    return bool(settings.PROFILE_TOKEN) and token is not None and hmac.compare_digest(token, settings.PROFILE_TOKEN)
+
+
+class ProfilingMiddleware:
+    """x-profile-token 헤더가 있는 요청만 프로파일링하는 ASGI 미들웨어
+
+    - 요청 동안 스택을 샘플링하고 그래프 노드/DB 쿼리/LLM 호출 구간 시간을 기록
+    - 결과는 profile_store 에 저장하고 x-profile-id 응답 헤더로 ID 전달
+    - 헤더가 없는 요청은 헤더 확인 외에 추가 비용 없음
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILE_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        token = next((value for name, value in scope["headers"] if name == PROFILE_HEADER), None)
+        if token is None or not is_authorized(token.decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER, profile.id.encode("latin-1"))
+                ]
+            await send(message)
+
+        sampler = StackSampler(profile)
+        context_token = _current_profile.set(profile)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            _current_profile.reset(context_token)
+            profile.duration_ms = round((time.perf_counter() - profile.started) * 1000, 3)
+            profile_store.add(profile)
@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.utils.metrics import CACHE_REQUESTS
+
+
+def canonical_key(*parts: Any) -> str:
+    """요청 내용을 정규화(JSON, 키 정렬)한 뒤 SHA-256 해시로 변환"""
+    normalized = [p.model_dump(mode="json") if isinstance(p, BaseModel) else p for p in parts]
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """동일한 요청의 동시 실행을 하나로 합치는 single-flight 실행기
+
+    - 같은 키의 요청이 실행 중이면 새로 실행하지 않고 진행 중인 결과를 함께 기다립니다.
+    - 성공한 결과는 ttl 초 동안 보관하여 늦게 도착한 재시도 요청에 즉시 응답합니다.
+    - 먼저 요청한 클라이언트가 연결을 끊어도 실행은 취소되지 않고 재시도 요청이 결과를 받습니다.
+    - cacheable 이 주어지면 이 함수가 True 를 반환하는 결과만 보관합니다 (폴백 결과 등 제외).
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256, name: str = "single_flight",
+                 cacheable: Optional[Callable[[Any], bool]] = None):
+        self.ttl = ttl
+        self.cacheable = cacheable
+        # 지표(cache_requests_total) 레이블
+        self.name = name
+        self.max_entries = max_entries
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._results.get(key)
+        if cached is not None:
+            expires_at, result = cached
+            if expires_at > time.monotonic():
+                self.hits += 1
+                CACHE_REQUESTS.labels(self.name, "hit").inc()
+                return result
+            del self._results[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            CACHE_REQUESTS.labels(self.name, "coalesced").inc()
+        else:
+            self.misses += 1
+            CACHE_REQUESTS.labels(self.name, "miss").inc()
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        # clear() 이후 끝난 실행의 결과는 저장하지 않음
+        if self._in_flight.get(key) is not task:
+            return
+        del self._in_flight[key]
+        # 실패한 결과는 저장하지 않음 (재시도 시 다시 실행)
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if self.cacheable is not None and not self.cacheable(result):
+            return
+        self._results[key] = (time.monotonic() + self.ttl, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        """저장된 결과와 진행 중인 요청 목록 삭제
+
+        진행 중인 실행은 이미 기다리는 요청을 위해 계속되지만, 이후 요청과 합쳐지거나 결과가 저장되지 않습니다.
+        """
+        self._results.clear()
+        self._in_flight.clear()
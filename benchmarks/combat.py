@@ -0,0 +1,325 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from openai import AsyncOpenAI
+
+from app.ai.combat import CombatAI
+from app.ai.combat.influence import InfluenceMap
+from app.ai.combat.scoring import score_actions
+from app.ai.combat.shedding import load_controller
+from app.ai.gateway import llm_gateway
+from app.ai.stub_server import LatencyModel, StubLLM, create_app as create_stub_app
+from app.api.combat import combat_service, router as combat_router
+from app.models.combat import BattleInitRequest, BattleState
+from app.utils.combat import calculate_reachable_positions, filter_usable_skills
+from app.utils.loader import skill_info_all
+
+# 전투 인원 (캐릭터 수)
+BATTLE_SIZES = [2, 4, 10, 25, 50, 100]
+
+# 대체 LLM 기본 지연 (lognormal(-1.6, 0.5) → 중앙값 약 0.2초, 초당 80토큰)
+DEFAULT_LATENCY = "lognormal:-1.6,0.5"
+DEFAULT_TOKEN_RATE = 80.0
+
+# 인원별 /battle/action 요청 수와 동시 요청 수
+DEFAULT_REQUESTS = 40
+DEFAULT_CONCURRENCY = 8
+
+# 메모리 할당 측정용 순차 요청 수 (tracemalloc 은 느리므로 별도 실행)
+ALLOCATION_REQUESTS = 5
+
+# 함수 단위 측정 반복 횟수
+MICRO_REPEAT = 200
+
+# --compare 에서 이 비율 이상 느려지면 회귀로 판단
+REGRESSION_THRESHOLD = 0.2
+
+MONSTER_TRAITS = ["신중함", "충동적", "잔인함", "호전적", "겁쟁이", "협동적"]
+ATTACK_SKILLS = [name for name, info in skill_info_all.items() if info.get("dmg_mult", 0) > 0]
+
+
+def make_battle(size: int, seed: int = 0) -> Dict[str, Any]:
+    """size 명의 전투 (몬스터/플레이어 절반씩, 겹치지 않는 무작위 위치)"""
+    rng = random.Random(seed)
+    monsters = max(1, size // 2)
+    width = max(6, math.ceil(math.sqrt(size)) * 4)
+    positions = rng.sample([(x, y) for x in range(width) for y in range(width)], size)
+
+    configs, states = [], []
+    for i in range(size):
+        is_monster = i < monsters
+        char_id = f"monster{i + 1}" if is_monster else f"player{i - monsters + 1}"
+        configs.append({
+            "id": char_id,
+            "name": char_id,
+            "type": "monster" if is_monster else "player",
+            "traits": rng.sample(MONSTER_TRAITS, 2) if is_monster else [],
+            "skills": ["타격"] + rng.sample(ATTACK_SKILLS, 3),
+            "speed": rng.randint(3, 8),
+        })
+        states.append({
+            "id": char_id,
+            "position": list(positions[i]),
+            "hp": rng.randint(20, 100),
+            "ap": 3,
+            "mov": 4,
+            "status_effects": [],
+        })
+    return {
+        "start": {"characters": configs, "terrain": "", "weather": ""},
+        "states": states,
+        "monsters": [c["id"] for c in configs if c["type"] == "monster"],
+    }
+
+
+def action_requests(battle: Dict[str, Any], count: int) -> List[Dict[str, Any]]:
+    """몬스터를 돌아가며 행동시키는 /battle/action 요청 (turn 이 달라 single-flight 로 합쳐지지 않음)"""
+    monsters = battle["monsters"]
+    return [
+        {
+            "characters": battle["states"],
+            "cycle": 1 + i // len(monsters),
+            "turn": i,
+            "current_character_id": monsters[i % len(monsters)],
+        }
+        for i in range(count)
+    ]
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"count": len(values), "mean": round(float(np.mean(values)), 3),
+            "p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3)}
+
+
+class _DecisionCollector:
+    """CombatAI 기록기 자리에서 노드별 실행 시간 수집"""
+
+    def __init__(self):
+        self.entries: List[Dict[str, Any]] = []
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        self.entries.append(entry)
+
+
+def create_bench_app() -> FastAPI:
+    """전투 라우터만 포함한 앱 (DB 연결 없이 /battle 엔드포인트만 측정)"""
+    app = FastAPI()
+    app.include_router(combat_router)
+    return app
+
+
+async def _start(client: httpx.AsyncClient, battle: Dict[str, Any], tier: str) -> _DecisionCollector:
+    response = await client.post("/battle/start", json={**battle["start"], "ai_tier": tier})
+    response.raise_for_status()
+    collector = _DecisionCollector()
+    combat_service.combat_ai.recorder = collector
+    return collector
+
+
+async def bench_size(client: httpx.AsyncClient, size: int, tier: str, requests: int,
+                     concurrency: int, seed: int) -> Dict[str, Any]:
+    """인원 size 전투의 /battle/action 지연 시간, CPU 시간, 처리량, 노드별 지연 시간"""
+    battle = make_battle(size, seed)
+    collector = await _start(client, battle, tier)
+    payloads = action_requests(battle, requests)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    async def send(payload: Dict[str, Any]) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/battle/action", json=payload)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] += 1
+
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(send(payload) for payload in payloads))
+    wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+
+    node_timings: Dict[str, List[float]] = defaultdict(list)
+    for entry in collector.entries:
+        for name, ms in entry.get("node_timings", {}).items():
+            node_timings[name].append(ms)
+
+    return {
+        "size": size,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(count for status, count in statuses.items() if status != 200),
+        "throughput_rps": round(requests / wall, 2),
+        "latency_ms": percentiles(latencies),
+        "cpu_ms_per_request": round(cpu * 1000 / requests, 3),
+        "node_latency_ms": {name: percentiles(values) for name, values in node_timings.items()},
+        "degradation": dict(Counter(entry.get("degradation") for entry in collector.entries)),
+    }
+
+
+async def bench_allocations(client: httpx.AsyncClient, size: int, tier: str, seed: int,
+                            requests: int = ALLOCATION_REQUESTS) -> Dict[str, Any]:
+    """요청당 최대/잔존 메모리 할당량 (순차 실행)"""
+    battle = make_battle(size, seed)
+    await _start(client, battle, tier)
+    payloads = action_requests(battle, requests)
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        peaks = []
+        for payload in payloads:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await client.post("/battle/action", json=payload)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kb_per_request": round(float(np.mean(peaks)) / 1024, 1),
+        "retained_kb": round((retained - baseline) / 1024, 1),
+    }
+
+
+def _time_call(fn: Callable[[], Any], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - started) * 1e6 / repeat, 2)
+
+
+def bench_functions(size: int, seed: int, repeat: int = MICRO_REPEAT) -> Dict[str, float]:
+    """app/ai/combat 및 app/utils/combat.py 핵심 함수의 호출당 시간 (마이크로초)"""
+    battle = make_battle(size, seed)
+    request = BattleInitRequest(**battle["start"])
+    ai = CombatAI({c.id: c for c in request.characters}, "", "")
+    state = BattleState(**action_requests(battle, 1)[0])
+    characters = ai._build_characters(state)
+    current = next(c for c in characters if c.id == state.current_character_id)
+    opponents = [c for c in characters if c.type != current.type]
+    target = opponents[0]
+
+    return {
+        "score_actions_us": _time_call(lambda: score_actions(current, opponents), repeat),
+        "influence_map_us": _time_call(lambda: InfluenceMap(opponents), repeat),
+        "reachable_positions_us": _time_call(lambda: calculate_reachable_positions(current.position, current.mov),
+                                             repeat),
+        "filter_usable_skills_us": _time_call(
+            lambda: filter_usable_skills(current.position, target.position, current.mov, current.skills,
+                                         skill_info_all),
+            repeat
+        ),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """기준 결과 대비 threshold 비율 이상 느려진 항목"""
+    regressions = []
+    baseline_sizes = {r["size"]: r for r in baseline.get("sizes", [])}
+    for current in results["sizes"]:
+        previous = baseline_sizes.get(current["size"])
+        if previous is None:
+            continue
+        metrics = {
+            "latency_ms.p95": (current["latency_ms"].get("p95"), previous["latency_ms"].get("p95")),
+            "cpu_ms_per_request": (current["cpu_ms_per_request"], previous["cpu_ms_per_request"]),
+        }
+        for name, value in current.get("functions", {}).items():
+            metrics[f"functions.{name}"] = (value, previous.get("functions", {}).get(name))
+        for name, (value, old) in metrics.items():
+            if value is not None and old and value > old * (1 + threshold):
+                regressions.append(f"size={current['size']} {name}: {old} → {value}")
+    return regressions
+
+
+async def run(sizes: List[int], tier: str, requests: int, concurrency: int, latency: str,
+              token_rate: float, seed: int, llm_url: Optional[str] = None,
+              load_shed_p95: float = 0.0) -> Dict[str, Any]:
+    # 실행 도중 부하 단계가 바뀌면 결과끼리 비교할 수 없으므로 기본은 부하 차단 끔 (항상 full)
+    load_controller.target_p95 = load_shed_p95
+    if llm_url:
+        llm_gateway.client = AsyncOpenAI(api_key="stub", base_url=llm_url, max_retries=0)
+    else:
+        # 대체 LLM 서버를 같은 프로세스에서 ASGI 로 직접 호출
+        stub = StubLLM(LatencyModel(latency, token_rate, seed), seed=seed)
+        stub_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_stub_app(stub)))
+        llm_gateway.client = AsyncOpenAI(api_key="stub", base_url="http://stub/v1",
+                                         http_client=stub_client, max_retries=0)
+
+    transport = httpx.ASGITransport(app=create_bench_app())
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for size in sizes:
+            result = await bench_size(client, size, tier, requests, concurrency, seed)
+            result["allocations"] = await bench_allocations(client, size, tier, seed)
+            result["functions"] = bench_functions(size, seed)
+            results.append(result)
+            print(f"size={size} p95={result['latency_ms'].get('p95')}ms "
+                  f"rps={result['throughput_rps']} cpu/req={result['cpu_ms_per_request']}ms", file=sys.stderr)
+
+    return {
+        "tier": tier,
+        "llm": llm_url or {"latency": latency, "token_rate": token_rate},
+        "seed": seed,
+        "load_shed_p95": load_shed_p95,
+        "sizes": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """전투 지연 시간 벤치마크
+
+    python -m benchmarks.combat --output bench.json [--compare baseline.json]
+    """
+    parser = argparse.ArgumentParser(description="전투 AI 지연 시간 벤치마크")
+    parser.add_argument("--sizes", default=",".join(map(str, BATTLE_SIZES)), help="전투 인원 목록 (쉼표 구분)")
+    parser.add_argument("--tier", default="full", help="AI 티어 (rule/fused/full/tactical)")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="인원별 /battle/action 요청 수")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="동시 요청 수")
+    parser.add_argument("--latency", default=DEFAULT_LATENCY, help="대체 LLM 첫 토큰 지연 분포")
+    parser.add_argument("--token-rate", type=float, default=DEFAULT_TOKEN_RATE, help="대체 LLM 초당 출력 토큰 수")
+    parser.add_argument("--llm-url", default=None, help="외부 대체 LLM 서버 주소 (없으면 같은 프로세스에서 실행)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--load-shed-p95", type=float, default=0.0,
+                        help="부하 차단 목표 p95(초), 0 이면 끔 (기본: 끔, 부하 단계 고정)")
+    parser.add_argument("--output", default=None, help="결과 JSON 파일 (없으면 표준 출력)")
+    parser.add_argument("--compare", default=None, help="기준 결과 JSON 파일 (회귀 시 종료 코드 1)")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="회귀 판단 비율")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = asyncio.run(run(sizes, args.tier, args.requests, args.concurrency, args.latency,
+                              args.token_rate, args.seed, args.llm_url, args.load_shed_p95))
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"회귀: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import json
+import os
+
+import pytest
+
+# app.config 는 import 시점에 환경 변수를 읽으므로 테스트용 기본값을 먼저 채움
+for key, value in {
+    "OPENAI_API_KEY": "sk-test",
+    "DATABASE_HOST": "localhost",
+    "DATABASE_NAME": "test",
+    "DATABASE_USER": "test",
+    "DATABASE_PORT": "5432",
+    "DATABASE_PASSWORD": "test",
+    "SECRET_KEY": "test",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+async def fake_chat(feature, prompt, **kwargs):
+    """노드별로 파싱 가능한 고정 응답을 돌려주는 LLM 대역"""
+    if feature == "strategy":
+        return json.dumps({"type": "공격 우선", "reason": "근접한 적 공격"})
+    if feature == "plan":
+        plan = {"move_to": [2, 13], "skill": "타격", "target_character_id": "player2", "reason": "공격",
+                "remaining_ap": 4, "remaining_mov": 1}
+        if '"action_plan"' in prompt[0]["content"]:
+            return json.dumps({"strategy": {"type": "처치 우선", "reason": "공격"}, "action_plan": plan})
+        return json.dumps(plan)
+    return "크르릉"
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """LLM 게이트웨이를 대역으로 바꾸고 노드가 보낸 (기능, 메시지) 목록 반환"""
+    from app.ai.gateway import llm_gateway
+
+    calls = []
+
+    async def chat(feature, prompt, **kwargs):
+        calls.append((feature, prompt))
+        return await fake_chat(feature, prompt, **kwargs)
+
+    monkeypatch.setattr(llm_gateway, "chat", chat)
+    return calls
@@ -0,0 +1,77 @@
+import json
+import logging
+import threading
+import time
+
+from app.ai.ledger import UsageLedger
+from app.utils.appender import BufferedAppender
+
+
+class Sink:
+    """write 호출마다 받은 기록을 모으고 호출을 알림"""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+        self.written = threading.Event()
+
+    def __call__(self, items):
+        if self.fail:
+            raise OSError("디스크 가득 참")
+        self.batches.append(list(items))
+        self.written.set()
+
+
+def test_flushes_when_buffer_is_full():
+    sink = Sink()
+    appender = BufferedAppender(sink, flush_every=3, flush_interval=60)
+    for i in range(3):
+        appender.append(i)
+    assert sink.written.wait(5)
+    assert sink.batches == [[0, 1, 2]]
+    appender.close()
+
+
+def test_timed_flush_writes_without_new_records():
+    sink = Sink()
+    appender = BufferedAppender(sink, flush_every=100, flush_interval=0.05)
+    appender.append("마지막 기록")
+    # 이후 기록이 없어도 flush_interval 이 지나면 쓰기 스레드가 씀
+    assert sink.written.wait(5)
+    assert sink.batches == [["마지막 기록"]]
+    appender.close()
+
+
+def test_close_writes_remaining_records():
+    sink = Sink()
+    appender = BufferedAppender(sink, flush_every=100, flush_interval=60)
+    appender.append("a")
+    appender.append("b")
+    appender.close()
+    assert sink.batches == [["a", "b"]]
+    assert appender.metrics() == {"records": 2, "flushes": 1, "errors": 0, "buffered": 0}
+
+
+def test_write_failure_is_logged(caplog):
+    appender = BufferedAppender(Sink(fail=True), flush_every=100, flush_interval=60, name="failing")
+    appender.append("a")
+    with caplog.at_level(logging.ERROR, logger="app.utils.appender"):
+        assert appender.flush() is False
+    assert appender.errors == 1
+    assert "[failing] 기록 1건 쓰기 실패" in caplog.text
+    appender.close()
+
+
+def test_ledger_writes_after_interval(tmp_path):
+    ledger = UsageLedger(str(tmp_path), flush_every=100, flush_interval=0.05)
+    ledger.record("plan", "gpt-4.1-nano", None, 12.5)
+
+    deadline = time.monotonic() + 5
+    lines = []
+    while not lines and time.monotonic() < deadline:
+        time.sleep(0.02)
+        lines = [line for path in tmp_path.glob("llm-usage-*.jsonl")
+                 for line in path.read_text(encoding="utf-8").splitlines()]
+    entry, = map(json.loads, lines)
+    assert (entry["feature"], entry["latency_ms"]) == ("plan", 12.5)
+    ledger.close()
@@ -0,0 +1,14 @@
+import pytest
+
+from app.utils.battle_map import validate_map_id
+
+
+@pytest.mark.parametrize("map_id", ["forest_clearing", "cave-2", "A1"])
+def test_valid_map_ids(map_id):
+    assert validate_map_id(map_id) == map_id
+
+
+@pytest.mark.parametrize("map_id", ["abc\n", "../x", "a/b", "", None, "맵", "abc "])
+def test_invalid_map_ids_are_rejected(map_id):
+    with pytest.raises(ValueError):
+        validate_map_id(map_id)
@@ -0,0 +1,99 @@
+import asyncio
+import copy
+
+import pytest
+from pydantic import ValidationError
+
+import app.ai.combat as combat_module
+from app.ai.combat import CombatAI
+from app.ai.combat.shedding import LOAD_MODES, load_controller
+from app.ai.gateway import llm_gateway
+from app.api.examples.combat import BATTLE_ACTION_REQUEST_EXAMPLE, BATTLE_START_REQUEST_EXAMPLE
+from app.models.combat import BattleInitRequest, BattleState
+
+
+def make_ai(tier: str = "rule") -> CombatAI:
+    request = BattleInitRequest(**BATTLE_START_REQUEST_EXAMPLE)
+    return CombatAI({c.id: c for c in request.characters}, "숲", "", ai_tier=tier, map_id="forest_clearing")
+
+
+def battle_state(cycle: int, turn: int, actor: str, player_x: int = 1) -> BattleState:
+    state = copy.deepcopy(BATTLE_ACTION_REQUEST_EXAMPLE)
+    state.update(cycle=cycle, turn=turn, current_character_id=actor)
+    state["characters"][2]["position"] = [player_x, 10]
+    return BattleState(**state)
+
+
+def decide(ai: CombatAI, state: BattleState, commit_log: bool = True):
+    return asyncio.run(ai.get_character_action(state, commit_log=commit_log))
+
+
+@pytest.fixture
+def solves(monkeypatch):
+    """assign_targets 호출 횟수"""
+    calls = []
+    assign_targets = combat_module.assign_targets
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return assign_targets(*args, **kwargs)
+
+    monkeypatch.setattr(combat_module, "assign_targets", counting)
+    return calls
+
+
+def test_targets_reassigned_every_monster_phase(solves, llm_calls):
+    ai = make_ai()
+    for cycle in range(1, 5):
+        # 플레이어 턴(3, 4)은 서버로 요청되지 않음
+        decide(ai, battle_state(cycle, 1, "monster1", player_x=cycle))
+        decide(ai, battle_state(cycle, 2, "monster2", player_x=cycle))
+    assert len(solves) == 4
+    assert set(ai.target_assignments) == {"monster1", "monster2"}
+
+
+def test_targets_reassigned_when_turns_not_consecutive(solves, llm_calls):
+    ai = make_ai()
+    decide(ai, battle_state(1, 1, "monster1"))
+    decide(ai, battle_state(1, 3, "monster2"))
+    assert len(solves) == 2
+
+
+def test_speculative_decision_does_not_change_live_state(llm_calls):
+    ai = make_ai("full")
+    decide(ai, battle_state(1, 1, "monster1"))
+    assignments, assignment_turn = dict(ai.target_assignments), ai._assignment_turn
+    strategies, logged = dict(ai.strategy_cache), len(ai.battle_log)
+
+    # 다음 사이클로 예측한 상태 - 실제로 사용되지 않으면 아무것도 바뀌지 않아야 함
+    speculative = battle_state(2, 1, "monster2", player_x=3)
+    response = decide(ai, speculative, commit_log=False)
+    assert ai.target_assignments == assignments
+    assert ai._assignment_turn == assignment_turn
+    assert ai.strategy_cache == strategies
+    assert len(ai.battle_log) == logged
+
+    ai.commit_speculation(speculative, response)
+    assert ai._assignment_turn == (2, 1)
+    assert "monster2" in ai.strategy_cache
+    assert len(ai.battle_log) == logged + 1
+
+
+@pytest.mark.parametrize("tier", ["full", "rule"])
+def test_load_mode_reported_on_fallback_and_rule_paths(monkeypatch, llm_calls, tier):
+    monkeypatch.setattr(load_controller, "level", LOAD_MODES.index("rule_based"))
+    monkeypatch.setattr(load_controller, "target_p95", 0)
+    ai = make_ai(tier)
+    assert decide(ai, battle_state(1, 1, "monster1")).load_mode == "rule_based"
+
+    # 서킷 브레이커가 열린 폴백 경로
+    monkeypatch.setattr(llm_gateway, "is_available", lambda: False)
+    response = decide(ai, battle_state(1, 2, "monster2"))
+    assert response.degradation == "fallback"
+    assert response.load_mode == "rule_based"
+
+
+@pytest.mark.parametrize("deadline", [0, -1.5])
+def test_non_positive_decision_deadline_is_rejected(deadline):
+    with pytest.raises(ValidationError):
+        BattleInitRequest(**{**BATTLE_START_REQUEST_EXAMPLE, "decision_deadline": deadline})
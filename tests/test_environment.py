@@ -0,0 +1,19 @@
+import pytest
+
+from app.utils.environment import compile_environment
+
+
+@pytest.mark.parametrize("terrain, weather, mov, steps", [
+    ("평원", "맑음", 0, 0),
+    ("평원", "맑음", 4, 4),
+    ("숲", "", 1, 1),
+    ("숲", "", 2, 1),
+    ("숲", "", 3, 2),
+    ("설원", "눈", 1, 1),
+    ("설원", "눈", 2, 1),
+    ("설원", "눈", 5, 2),
+    ("늪지", "", 20, 10),
+])
+def test_movement_keeps_at_least_one_step(terrain, weather, mov, steps):
+    # 이동 가능 칸 수 = max(1, ⌊MOV / 이동 비용⌋), MOV 0 이면 0
+    assert compile_environment(terrain, weather).movement(mov) == steps
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.ai.combat import CombatAI
+from app.ai.combat.nodes import apply_rule_decision, plan_attack
+from app.ai.combat.states import Strategy
+from app.models.combat import BattleState, CharacterConfig
+
+CONFIGS = {
+    "monster1": CharacterConfig(id="monster1", name="오우거", type="monster", traits=[], skills=["타격"], attack=20),
+    "player1": CharacterConfig(id="player1", name="궁수", type="player", traits=[], skills=["타격"], defense=5),
+    "player2": CharacterConfig(id="player2", name="전사", type="player", traits=[], skills=["타격"], defense=5),
+}
+
+
+def graph_state(strategy_type: str, weak_hp: int = 5):
+    """팀 배정 타겟은 player2, 옆의 player1 은 이번 턴 처치 가능한 HP"""
+    ai = CombatAI(CONFIGS, "", "")
+    state = BattleState(cycle=1, turn=1, current_character_id="monster1", characters=[
+        {"id": "monster1", "position": [0, 0], "hp": 80, "ap": 3, "mov": 3, "status_effects": []},
+        {"id": "player1", "position": [1, 0], "hp": weak_hp, "ap": 2, "mov": 3, "status_effects": []},
+        {"id": "player2", "position": [0, 3], "hp": 100, "ap": 2, "mov": 3, "status_effects": []},
+    ])
+    graph = ai._build_langgraph_state(state, ai.battle_log)
+    graph.assigned_target_id = "player2"
+    graph.strategy_info = Strategy(type=strategy_type, reason="테스트")
+    graph.strategy = f"{strategy_type}, 테스트"
+    return graph
+
+
+@pytest.mark.parametrize("strategy_type, weak_hp, target", [
+    ("처치 우선", 5, "player1"),
+    ("처치 우선", 60, "player2"),
+    ("공격 우선", 5, "player2"),
+])
+def test_rule_decision_kill_priority_overrides_assignment(strategy_type, weak_hp, target):
+    state = graph_state(strategy_type, weak_hp)
+    state = apply_rule_decision(state, state.strategy_info)
+    assert state.action_plan.target_character_id == target
+
+
+@pytest.mark.parametrize("strategy_type, target", [("처치 우선", "player1"), ("공격 우선", "player2")])
+def test_plan_attack_kill_priority_overrides_assignment(llm_calls, strategy_type, target):
+    asyncio.run(plan_attack(graph_state(strategy_type)))
+    (feature, messages), = llm_calls
+    assert feature == "plan"
+    assert f"현재 타겟 ID: {target}" in messages[-1]["content"]
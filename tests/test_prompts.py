@@ -0,0 +1,124 @@
+"""턴마다 바뀌는 값이 프롬프트 캐시 대상인 고정 접두부(messages[0])에 섞이지 않는지 검증"""
+import asyncio
+import copy
+
+import pytest
+
+from app.ai.combat import CombatAI
+from app.ai.combat.nodes import create_action_plan_prompt
+from app.ai.combat.prompts import FLEE_PLAN_PROMPT
+from app.ai.npc_chat import NPCChatAI
+from app.api.examples.combat import BATTLE_ACTION_REQUEST_EXAMPLE, BATTLE_START_REQUEST_EXAMPLE
+from app.config import settings
+from app.models.combat import BattleInitRequest, BattleState
+
+# 두 턴의 현재 캐릭터(monster1) HP/위치와 player2 HP
+TURNS = [
+    {"turn": 2, "hp": 20, "position": [2, 14], "target_hp": 100},
+    {"turn": 3, "hp": 13, "position": [3, 14], "target_hp": 61},
+]
+
+
+def turn_state(turn: dict) -> BattleState:
+    state = copy.deepcopy(BATTLE_ACTION_REQUEST_EXAMPLE)
+    state["turn"] = turn["turn"]
+    state["characters"][0]["hp"] = turn["hp"]
+    state["characters"][0]["position"] = turn["position"]
+    state["characters"][3]["hp"] = turn["target_hp"]
+    return BattleState(**state)
+
+
+def dynamic_values(feature: str, turn: dict) -> list:
+    """프롬프트별로 턴마다 바뀌는 값 (전략 프롬프트에는 위치가 들어가지 않음)"""
+    if feature == "strategy":
+        return [f"현재 HP: {turn['hp']}"]
+    return [f"HP {turn['hp']}", str(tuple(turn["position"]))]
+
+
+def run_turns(tier: str, calls: list) -> list:
+    """같은 전투에서 두 턴을 진행하고 턴별로 기능 -> 메시지 목록 반환"""
+    request = BattleInitRequest(**BATTLE_START_REQUEST_EXAMPLE)
+    ai = CombatAI({c.id: c for c in request.characters}, "숲", "", ai_tier=tier, map_id="forest_clearing")
+    turns = []
+    for turn in TURNS:
+        calls.clear()
+        asyncio.run(ai.get_character_action(turn_state(turn)))
+        turns.append(dict(calls))
+    return turns
+
+
+def assert_stable_prefix(feature, first, second, turns=TURNS):
+    assert first[0]["role"] == second[0]["role"] == "system"
+    assert first[0]["content"] == second[0]["content"]
+    assert first[-1]["role"] == second[-1]["role"] == "user"
+    assert first[-1]["content"] != second[-1]["content"]
+    for messages, turn in zip((first, second), turns):
+        for value in dynamic_values(feature, turn):
+            assert value in messages[-1]["content"]
+            assert value not in messages[0]["content"]
+
+
+@pytest.mark.parametrize("tier, features", [
+    ("full", ["strategy", "plan", "dialogue"]),
+    ("fused", ["plan"]),
+])
+def test_combat_prompt_prefix_is_stable_across_turns(llm_calls, tier, features):
+    first, second = run_turns(tier, llm_calls)
+    for feature in features:
+        assert feature in first and feature in second
+        if feature == "dialogue":
+            # 대사 프롬프트에는 HP/위치가 들어가지 않으므로 접두부 동일성만 확인
+            assert first[feature][0] == second[feature][0]
+            continue
+        assert_stable_prefix(feature, first[feature], second[feature])
+
+
+def test_battle_log_only_in_user_message(llm_calls, monkeypatch):
+    # 통합 프롬프트는 토큰 예산을 넘으면 전투 요약부터 줄이므로 예산을 끄고 확인
+    monkeypatch.setattr(settings, "COMBAT_PROMPT_TOKEN_BUDGET", 0)
+    first, second = run_turns("full", llm_calls)
+    summary = "누적 행동 1회"
+    assert summary not in first["strategy"][-1]["content"]
+    assert summary in second["strategy"][-1]["content"]
+    assert all(summary not in messages[0]["content"] for messages in second.values())
+
+    first, second = run_turns("fused", llm_calls)
+    assert summary in second["plan"][-1]["content"]
+    assert summary not in second["plan"][0]["content"]
+
+
+def test_flee_plan_prompt_prefix_is_stable_across_turns():
+    rendered = [
+        create_action_plan_prompt(
+            character_name="앤트", character_type="monster", position=tuple(turn["position"]),
+            hp=turn["hp"], ap=4, mov=2, strategy="생존 우선", target_id="player2",
+            target_position=(3, 12), current_distance=2, skill_descriptions=["- 타격 (AP: 0, 범위: 1): 일반 공격"],
+            prompt=FLEE_PLAN_PROMPT, environment="", threat_info=f"주요 위협: player2 (HP {turn['target_hp']})",
+            additional_threats="", safe_tiles="",
+        )
+        for turn in TURNS
+    ]
+    assert_stable_prefix("plan", *rendered)
+
+
+class FakeRetriever:
+    def __init__(self, content: str):
+        self.content = content
+
+    async def ainvoke(self, query):
+        return [type("Document", (), {"page_content": self.content})()]
+
+
+def test_npc_chat_prefix_is_stable_across_questions():
+    npc = NPCChatAI()
+    questions = [("마을 북쪽에는 무엇이 있나요?", "북쪽에는 오래된 탑이 있다."),
+                 ("대장장이는 어디 있나요?", "대장장이는 광장 옆에 있다.")]
+    rendered = [asyncio.run(npc.build_messages(question, FakeRetriever(context), "무뚝뚝한"))
+                for question, context in questions]
+
+    first, second = rendered
+    assert first[0] == second[0]
+    assert first[0]["role"] == "system"
+    for messages, (question, context) in zip(rendered, questions):
+        assert question in messages[-1]["content"] and context in messages[-1]["content"]
+        assert all(question not in m["content"] and context not in m["content"] for m in messages[:-1])
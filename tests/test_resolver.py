@@ -0,0 +1,76 @@
+import pytest
+
+from app.ai.combat import CombatAI
+from app.models.combat import BattleActionResponse, BattleState, CharacterAction, CharacterConfig
+
+CONFIGS = {
+    "monster1": CharacterConfig(id="monster1", name="오우거", type="monster", traits=[], skills=["타격", "몸통 박치기"],
+                                attack=20, defense=5, critical_rate=0.25, critical_damage=2.0),
+    "monster2": CharacterConfig(id="monster2", name="고블린", type="monster", traits=[], skills=["타격"]),
+    "player1": CharacterConfig(id="player1", name="전사", type="player", traits=[], skills=["타격"], defense=5),
+}
+UPCOMING = ["player1", "monster2", "monster1"]
+
+
+def battle_state(player_hp: int = 30) -> BattleState:
+    return BattleState(cycle=1, turn=1, current_character_id="monster1", characters=[
+        {"id": "monster1", "position": [0, 0], "hp": 40, "ap": 3, "mov": 3, "status_effects": []},
+        {"id": "monster2", "position": [5, 5], "hp": 20, "ap": 2, "mov": 3, "status_effects": []},
+        {"id": "player1", "position": [2, 0], "hp": player_hp, "ap": 2, "mov": 3, "status_effects": []},
+    ])
+
+
+def resolve(state: BattleState, skill: str = "타격", move_to=(1, 0), remaining_ap: int = 3):
+    response = BattleActionResponse(current_character_id="monster1", action=CharacterAction(
+        move_to=move_to, skill=skill, target_character_id="player1", reason="", remaining_ap=remaining_ap,
+        remaining_mov=2,
+    ))
+    return CombatAI(CONFIGS, "", "").resolve(state, response, UPCOMING)
+
+
+def test_damage_and_critical_prediction():
+    outcome = resolve(battle_state())
+
+    assert outcome.valid
+    delta, = outcome.hp_deltas
+    # 피해량 = 공격력 20 × 배율 1.0 - 방어력 5, 치명타는 × 2.0
+    assert (delta.character_id, delta.delta, delta.critical_delta) == ("player1", -15, -30)
+    assert delta.critical_chance == pytest.approx(0.25)
+    assert delta.expected_delta == pytest.approx(-(15 * 0.75 + 30 * 0.25))
+    player = next(c for c in outcome.resulting_state.characters if c.id == "player1")
+    assert player.hp == 15
+    actor = next(c for c in outcome.resulting_state.characters if c.id == "monster1")
+    assert (tuple(actor.position), actor.ap, actor.mov) == ((1, 0), 3, 2)
+
+
+def test_status_effect_applied_to_surviving_target():
+    outcome = resolve(battle_state(), skill="몸통 박치기", remaining_ap=2)
+
+    effect, = outcome.applied_effects
+    assert (effect.character_id, effect.effect, effect.refreshed) == ("player1", "속도 감소", False)
+    player = next(c for c in outcome.resulting_state.characters if c.id == "player1")
+    assert "속도 감소" in player.status_effects
+
+
+def test_next_actor_is_first_upcoming():
+    outcome = resolve(battle_state())
+
+    assert outcome.resulting_state.current_character_id == "player1"
+    assert outcome.resulting_state.turn == 2
+
+
+def test_knocked_out_character_is_skipped_as_next_actor():
+    outcome = resolve(battle_state(player_hp=10), skill="몸통 박치기", remaining_ap=2)
+
+    assert outcome.knocked_out == ["player1"]
+    assert outcome.applied_effects == []
+    assert outcome.resulting_state.current_character_id == "monster2"
+
+
+def test_dead_target_is_a_violation():
+    outcome = resolve(battle_state(player_hp=0))
+
+    assert not outcome.valid
+    assert "쓰러진 대상 player1" in outcome.violations
+    assert outcome.hp_deltas == []
+    assert outcome.resulting_state.current_character_id == "monster2"
@@ -0,0 +1,102 @@
+import pytest
+
+from app.ai.combat.shedding import LOAD_MODES, LoadController
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubScheduler:
+    def __init__(self, capacity: int = 10):
+        self.capacity = capacity
+        self.in_flight = 0
+        self.queue_depth = 0
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def controller(clock, scheduler=None, **kwargs) -> LoadController:
+    return LoadController(1.0, scheduler=scheduler, clock=clock, **kwargs)
+
+
+def mode_at(load: LoadController, clock: Clock, now: float) -> str:
+    clock.now = now
+    return load.current_mode()
+
+
+def test_disabled_controller_stays_full(clock):
+    scheduler = StubScheduler()
+    scheduler.in_flight = 100
+    load = LoadController(0, scheduler=scheduler, clock=clock)
+    assert mode_at(load, clock, 100) == "full"
+
+
+def test_queue_pressure_escalates_one_level_per_dwell(clock):
+    scheduler = StubScheduler(capacity=4)
+    scheduler.in_flight, scheduler.queue_depth = 4, 2
+    load = controller(clock, scheduler)
+
+    assert mode_at(load, clock, 1.0) == "full"          # ESCALATE_DWELL(2초) 전
+    assert mode_at(load, clock, 2.0) == "no_dialogue"
+    assert mode_at(load, clock, 3.0) == "no_dialogue"   # 단계를 바꾼 뒤 다시 dwell 대기
+    assert mode_at(load, clock, 4.0) == "cached_strategy"
+    assert mode_at(load, clock, 6.0) == "rule_based"
+    assert mode_at(load, clock, 8.0) == "rule_based"    # 가장 저렴한 단계에서 멈춤
+    assert load.pressure == pytest.approx(1.5)
+    assert load.transitions == len(LOAD_MODES) - 1
+
+
+def test_latency_escalation_needs_min_samples(clock):
+    load = controller(clock, min_samples=5)
+    for _ in range(4):
+        load.observe(3.0)
+    assert mode_at(load, clock, 5.0) == "full"
+    load.observe(3.0)
+    assert mode_at(load, clock, 5.0) == "no_dialogue"
+
+
+def test_samples_reset_on_mode_change_and_recover_after_dwell(clock):
+    load = controller(clock, min_samples=3)
+    for _ in range(3):
+        load.observe(2.0)
+    assert mode_at(load, clock, 2.0) == "no_dialogue"
+
+    # 이전 단계의 느린 표본은 버리므로 새 표본이 없으면 부하 0
+    assert mode_at(load, clock, 3.0) == "no_dialogue"
+    assert load.pressure == 0.0
+    assert load.metrics()["samples"] == 0
+
+    clock.now = 10.0
+    load.observe(0.5)
+    assert mode_at(load, clock, 16.9) == "no_dialogue"  # RECOVER_DWELL(15초) 전
+    assert mode_at(load, clock, 17.0) == "full"
+
+
+def test_hysteresis_band_holds_the_current_mode(clock):
+    scheduler = StubScheduler(capacity=10)
+    scheduler.in_flight = 12
+    load = controller(clock, scheduler)
+    assert mode_at(load, clock, 2.0) == "no_dialogue"
+
+    # 0.7 이상 1.0 이하: 올리지도 내리지도 않음
+    scheduler.in_flight = 8
+    assert mode_at(load, clock, 60.0) == "no_dialogue"
+    scheduler.in_flight = 6
+    assert mode_at(load, clock, 61.0) == "full"
+
+
+def test_old_samples_expire_from_window(clock):
+    load = controller(clock, min_samples=1, window=30.0)
+    load.observe(5.0)
+    clock.now = 31.0
+    load.observe(0.1)
+    assert mode_at(load, clock, 31.0) == "full"
+    assert load.pressure == pytest.approx(0.1)